@@ -1,18 +1,53 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException, Body, Depends
+from fastapi import APIRouter, UploadFile, File, HTTPException, Body, Depends, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from app.services.transcription import transcribe_audio
-from app.services.analysis import analyze_text
-from app.services.generation import generate_executive_suite
-from app.database import get_db
-from app.models import Session
+from app.services.analysis import analyze_text, analyze_batch, IncrementalAnalyzer
+from app.services.generation import generate_executive_suite, stream_executive_suite, generate_suite_tier
+from app.services.ingestion import AudioUpload, ingest_audio, audio_from_bytes
+from app.core import metrics, tracing
+from app.core.cache import LRUCache, SingleFlight
+from app.core.config import settings
+from app.core.log import get_logger
+from app.database import get_db, get_read_db, AsyncSessionLocal
+from app.models import Session, split_suite
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-import shutil
-import os
+from sqlalchemy import select, func, or_, and_, case
 import uuid
 import re
+import json
+import hashlib
+from contextlib import contextmanager
 from typing import List
 
 router = APIRouter()
+log = get_logger("api")
+
+# Listing pagination
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+def paginate(stmt, model, cursor: str, limit: int):
+    """
+    Keyset pagination on (created_at DESC, id DESC). The cursor is the id of
+    the last row of the previous page; its created_at is looked up in SQL so
+    timestamps are compared in their stored form.
+    """
+    if cursor:
+        anchor = select(model.created_at).where(model.id == cursor).scalar_subquery()
+        stmt = stmt.where(or_(
+            model.created_at < anchor,
+            and_(model.created_at == anchor, model.id < cursor)
+        ))
+    # Fetch one extra row to learn whether another page exists
+    return stmt.order_by(model.created_at.desc(), model.id.desc()).limit(limit + 1)
+
+def page_rows(rows, limit: int, response: Response) -> list:
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = rows[-1].id
+    return rows
 
 def generate_slug(text: str) -> str:
     # Basic slugify: lowercase, alphanumeric and hyphens
@@ -23,34 +58,81 @@ def generate_slug(text: str) -> str:
 
 @router.post("/transmute")
 async def transmute(file: UploadFile = File(...), language: str = None):
-    # Save temp file
-    temp_filename = f"temp_{uuid.uuid4()}_{file.filename}"
-    temp_file_path = f"temp_uploads/{temp_filename}"
-    
-    os.makedirs("temp_uploads", exist_ok=True)
+    audio = await ingest_audio(file)
     
     try:
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        print(f"DEBUG: Starting transcribe_audio for {temp_file_path}")
-        text = await transcribe_audio(temp_file_path, language)
-        print(f"DEBUG: Transcription complete. Length: {len(text)}")
+        log.debug("Starting transcribe_audio for %s (%d bytes)", file.filename, audio.size)
+        text = await transcribe_audio(audio, language)
+        log.debug("Transcription complete. Length: %d", len(text))
         return {"text": text}
         
     except Exception as e:
-        print(f"ERROR: Exception in transcribe endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Exception in transcribe endpoint: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        # Cleanup
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+
+@router.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
 
 @router.post("/analyze")
-async def analyze(text: str = Body(..., embed=True)):
-    return analyze_text(text)
+async def analyze(text: str = Body(..., embed=True), language: str = Body(default=None, embed=True)):
+    return analyze_text(text, language)
+
+@router.post("/analyze/batch")
+def analyze_many(texts: List[str] = Body(..., embed=True), language: str = Body(default=None, embed=True)):
+    """
+    Batch variant of /analyze. Streams one NDJSON line per input text, in
+    order, as {"index": i, "analysis": {...}} so large batches never build a
+    single giant response in memory.
+    """
+    def lines():
+        for index, result in enumerate(analyze_batch(texts, language)):
+            yield json.dumps({"index": index, "analysis": result}) + "\n"
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+def parse_live_frame(text):
+    """Returns (message, None) for a valid /analyze/live frame, else (None, reason)."""
+    if text is None:
+        return None, "Frames must be text"
+    try:
+        message = json.loads(text)
+    except ValueError:
+        return None, "Frame is not valid JSON"
+    if not isinstance(message, dict):
+        return None, "Frame must be a JSON object"
+    chunk = message.get("chunk")
+    if chunk is not None and not isinstance(chunk, str):
+        return None, "chunk must be a string"
+    return message, None
+
+@router.websocket("/analyze/live")
+async def analyze_live(websocket: WebSocket, language: str = None):
+    """
+    Live tone meter. The client sends {"chunk": "..."} as transcript text
+    arrives and receives {"type": "update", "analysis": {...}} after each one.
+    Sending {"final": true} returns the exact full-text analysis and closes.
+    A malformed frame gets {"type": "error", "detail": ...} and is skipped.
+    """
+    await websocket.accept()
+    analyzer = IncrementalAnalyzer(language)
+    try:
+        while True:
+            frame = await websocket.receive()
+            if frame["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(frame.get("code", 1000))
+            message, error = parse_live_frame(frame.get("text"))
+            if error:
+                await websocket.send_json({"type": "error", "detail": error})
+                continue
+            if message.get("final"):
+                await websocket.send_json({"type": "final", "analysis": analyzer.finish()})
+                await websocket.close()
+                return
+            analysis = analyzer.feed(message.get("chunk") or "")
+            await websocket.send_json({"type": "update", "analysis": analysis})
+    except WebSocketDisconnect:
+        pass
 
 @router.post("/generate-post")
 async def generate(
@@ -58,11 +140,21 @@ async def generate(
     analysis: dict = Body(..., embed=True),
     language: str = Body(default="English", embed=True),
     variation: bool = Body(default=False, embed=True),
+    lazy: bool = Body(default=False, embed=True),
     db: AsyncSession = Depends(get_db)
 ):
-    print(f"DEBUG: Starting generate_executive_suite for text length: {len(text)}")
-    result = await generate_executive_suite(text, language, variation)
-    print("DEBUG: Strategic Suite generation complete.")
+    return await run_generate_post(db, text, analysis, language, variation, lazy)
+
+async def run_generate_post(db: AsyncSession, text: str, analysis: dict, language: str, variation: bool, lazy: bool) -> dict:
+    if lazy:
+        # Only the free tier up front; the rest is generated on first access
+        # through /sessions/{session_id}/tiers/{tier}
+        log.debug("Starting lazy free_tier generation for text length: %d", len(text))
+        result = {"free_tier": await generate_suite_tier("free_tier", text, language, variation)}
+    else:
+        log.debug("Starting generate_executive_suite for text length: %d", len(text))
+        result = await generate_executive_suite(text, language, variation)
+    log.debug("Strategic Suite generation complete")
     
     # Persist session
     session_id = str(uuid.uuid4())
@@ -70,13 +162,125 @@ async def generate(
         id=session_id,
         text=text,
         analysis=analysis,
-        data=result
+        language=language,
+        variation=variation
     )
+    new_session.set_suite(result)
     db.add(new_session)
-    await db.commit()
+    with tracing.span("db_write"):
+        await db.commit()
     
     return {"session_id": session_id, "data": result}
 
+def sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@router.post("/generate-post/stream")
+async def generate_stream(
+    text: str = Body(..., embed=True), 
+    analysis: dict = Body(..., embed=True),
+    language: str = Body(default="English", embed=True),
+    variation: bool = Body(default=False, embed=True)
+):
+    """
+    Server-Sent Events variant of /generate-post.
+    Emits a `section` event as each of free_tier / pro_tier / social_content
+    completes, then `done` with the session id once the session is saved.
+    """
+    async def events():
+        try:
+            async for kind, payload in stream_executive_suite(text, language, variation):
+                if kind == "section":
+                    name, value = payload
+                    yield sse_event("section", {"name": name, "data": value})
+                    continue
+                
+                # Persist session once the full suite has been parsed.
+                # The request-scoped DB session is closed before streaming
+                # bodies finish, so open a dedicated one here.
+                session_id = str(uuid.uuid4())
+                async with AsyncSessionLocal() as db:
+                    new_session = Session(
+                        id=session_id,
+                        text=text,
+                        analysis=analysis,
+                        language=language,
+                        variation=variation
+                    )
+                    new_session.set_suite(payload)
+                    db.add(new_session)
+                    with tracing.span("db_write"):
+                        await db.commit()
+                yield sse_event("done", {"session_id": session_id, "data": payload})
+        except Exception as e:
+            log.exception("Exception in generate stream: %s", e)
+            yield sse_event("error", {"detail": str(e)})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+LAZY_TIERS = ("pro_tier", "social_content")
+_tier_generations = SingleFlight()
+
+async def _generate_and_store_tier(session_id: str, tier: str):
+    async with AsyncSessionLocal() as db:
+        session = await db.get(Session, session_id)
+        suite = session.suite
+        if tier in suite:
+            return suite[tier]
+        
+        # Same inputs as the free tier; sessions from before these were
+        # recorded fall back to the old request defaults.
+        language = session.language or "English"
+        variation = bool(session.variation)
+        log.debug("Lazily generating %s for session %s", tier, session_id)
+        value = await generate_suite_tier(tier, session.text, language, variation)
+        
+        # Each tier has its own column, so concurrent tiers never overwrite each other
+        if session.free_tier is None:
+            session.set_suite(suite)
+        setattr(session, tier, value)
+        with tracing.span("db_write"):
+            await db.commit()
+        return value
+
+@router.get("/sessions/{session_id}/tiers/{tier}")
+async def get_session_tier(
+    session_id: str,
+    tier: str,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Returns pro_tier or social_content for a session, generating it on first
+    access when the session was created in lazy mode, in the language and
+    variation the session was created with. Concurrent requests for the same
+    tier share a single generation.
+    """
+    if tier not in LAZY_TIERS:
+        raise HTTPException(status_code=404, detail="Unknown tier")
+    
+    session = await db.get(Session, session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    suite = session.suite
+    if tier in suite:
+        return {"session_id": session_id, "tier": tier, "data": suite[tier]}
+    
+    try:
+        value = await _tier_generations.do(
+            (session_id, tier),
+            lambda: _generate_and_store_tier(session_id, tier)
+        )
+    except Exception as e:
+        log.exception("Exception generating %s for session %s: %s", tier, session_id, e)
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    return {"session_id": session_id, "tier": tier, "data": value}
+
 @router.post("/publish/{session_id}")
 async def publish_session(session_id: str, db: AsyncSession = Depends(get_db)):
     stmt = select(Session).where(Session.id == session_id)
@@ -88,13 +292,13 @@ async def publish_session(session_id: str, db: AsyncSession = Depends(get_db)):
     
     if not session.is_public:
         # Extract title from core thesis for slug
-        core_thesis = ""
-        if isinstance(session.data, dict):
-            core_thesis = session.data.get("free_tier", {}).get("core_thesis") or session.data.get("core_thesis", "")
+        suite = session.suite
+        core_thesis = (suite.get("free_tier") or {}).get("core_thesis") or suite.get("core_thesis", "")
         
         session.is_public = True
         session.public_slug = generate_slug(core_thesis or "strategy-plan")
-        await db.commit()
+        with tracing.span("db_write"):
+            await db.commit()
     
     return {
         "isPublic": session.is_public,
@@ -102,25 +306,81 @@ async def publish_session(session_id: str, db: AsyncSession = Depends(get_db)):
         "publicUrl": f"/p/{session.public_slug}"
     }
 
+@router.delete("/publish/{session_id}")
+async def unpublish_session(session_id: str, db: AsyncSession = Depends(get_db)):
+    session = await db.get(Session, session_id)
+    
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if session.is_public:
+        session.is_public = False
+        with tracing.span("db_write"):
+            await db.commit()
+        invalidate_public_session(session.public_slug)
+    
+    return {"isPublic": False, "publicSlug": session.public_slug}
+
+# Rendered /public/{slug} payloads: slug -> (body bytes, strong ETag)
+_public_cache = LRUCache(max_entries=settings.PUBLIC_CACHE_ENTRIES, ttl=settings.PUBLIC_CACHE_TTL)
+public_cache_hits = metrics.counter("public_cache_hits_total", "Public session views served from memory")
+public_not_modified = metrics.counter("public_not_modified_total", "Public session views answered with 304")
+
+def invalidate_public_session(slug: str):
+    if slug:
+        _public_cache.pop(slug)
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (c[2:] if c.startswith("W/") else c for c in candidates)
+
+def _public_response(body: bytes, etag: str, if_none_match: str) -> Response:
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE}, s-maxage={settings.PUBLIC_CACHE_EDGE_MAX_AGE}",
+    }
+    if _etag_matches(if_none_match, etag):
+        public_not_modified.inc()
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
 @router.get("/public/{slug}")
-async def get_public_session(slug: str, db: AsyncSession = Depends(get_db)):
-    stmt = select(Session).where(Session.public_slug == slug, Session.is_public == True)
+async def get_public_session(slug: str, request: Request, db: AsyncSession = Depends(get_read_db)):
+    """
+    Published sessions are immutable, so the rendered payload is cached per
+    slug and served with a strong ETag; matching If-None-Match gets a 304.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    cached = _public_cache.get(slug)
+    if cached is not None:
+        public_cache_hits.inc()
+        body, etag = cached
+        return _public_response(body, etag, if_none_match)
+    
+    # Only the small free_tier column is loaded; pro/social sections stay in the DB
+    stmt = select(
+        Session.id,
+        Session.text,
+        Session.analysis,
+        Session.free_tier,
+        Session.created_at
+    ).where(Session.public_slug == slug, Session.is_public == True)
     result = await db.execute(stmt)
-    session = result.scalar_one_or_none()
+    session = result.one_or_none()
     
     if not session:
         raise HTTPException(status_code=404, detail="Public session not found")
     
     # Strictly return only free_tier data
-    free_data = {}
-    if isinstance(session.data, dict):
-        free_data = session.data.get("free_tier") or {
-            "core_thesis": session.data.get("core_thesis"),
-            "strategic_pillars": session.data.get("strategic_pillars"),
-            "tactical_steps": session.data.get("tactical_steps")
-        }
+    free_data = session.free_tier
+    if free_data is None:
+        # Row not yet converted by the section backfill
+        legacy = (await db.execute(select(Session.data).where(Session.id == session.id))).scalar()
+        free_data = split_suite(legacy).get("free_tier") or {}
     
-    return {
+    payload = {
         "text": session.text,
         "analysis": {
             "tone": session.analysis.get("tone") if isinstance(session.analysis, dict) else "Neutral"
@@ -130,15 +390,19 @@ async def get_public_session(slug: str, db: AsyncSession = Depends(get_db)):
         },
         "created_at": session.created_at
     }
+    
+    body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+    etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+    _public_cache.set(slug, (body, etag))
+    return _public_response(body, etag, if_none_match)
 
 
 # ===== THE INCUBATOR (Drafts System) =====
 from app.services.transcription import transcribe_audio
 from app.models import Draft
-import google.generativeai as genai
-from app.core.config import settings
+from app.services import gemini
 
-# genai configuration removed, it is centralized in config.py
+CATEGORIZE_MODEL = "gemini-2.0-flash"
 
 async def quick_categorize(transcript: str) -> dict:
     """
@@ -146,7 +410,6 @@ async def quick_categorize(transcript: str) -> dict:
     Returns: { title: "3-5 word title", tag: "🔥 RANT" | "💡 IDEA" | "⚡ TASK" }
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
         prompt = f"""Analyze this raw thought dump and provide:
 1. A catchy 3-5 word title that captures the essence
 2. A tag category: exactly one of "🔥 RANT", "💡 IDEA", or "⚡ TASK"
@@ -157,18 +420,18 @@ TRANSCRIPT:
 Respond in JSON format ONLY:
 {{"title": "...", "tag": "..."}}
 """
-        response = model.generate_content(
+        response = await gemini.generate_content(
+            CATEGORIZE_MODEL,
             prompt,
-            generation_config=genai.types.GenerationConfig(
+            generation_config=gemini.generation_config(
                 temperature=0.5,
                 response_mime_type="application/json",
             )
         )
-        import json
         result = json.loads(response.text)
         return result
     except Exception as e:
-        print(f"DEBUG: [QuickCategorize] Error: {e}")
+        log.warning("Quick categorize failed: %s", e)
         return {"title": "Untitled Thought", "tag": "💡 IDEA"}
 
 
@@ -184,70 +447,86 @@ async def save_draft(
     2. Quick categorize with Gemini Flash
     3. Save to drafts table
     """
-    temp_filename = f"temp_{uuid.uuid4()}_{file.filename}"
-    temp_file_path = f"temp_uploads/{temp_filename}"
-    
-    os.makedirs("temp_uploads", exist_ok=True)
+    audio = await ingest_audio(file)
     
     try:
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        # 1. Transcribe
-        transcript = await transcribe_audio(temp_file_path, language)
-        
-        # 2. Quick categorize
-        categorization = await quick_categorize(transcript)
-        
-        # 3. Save draft
-        draft_id = str(uuid.uuid4())
-        new_draft = Draft(
-            id=draft_id,
-            title=categorization.get("title", "Untitled Thought"),
-            tag=categorization.get("tag", "💡 IDEA"),
-            transcript=transcript
-        )
-        db.add(new_draft)
-        await db.commit()
-        
-        return {
-            "draft_id": draft_id,
-            "title": new_draft.title,
-            "tag": new_draft.tag,
-            "transcript": transcript[:200] + "..." if len(transcript) > 200 else transcript
-        }
+        return await run_save_draft(db, audio, language)
         
     except Exception as e:
-        print(f"ERROR: Exception in save_draft endpoint: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Exception in save_draft endpoint: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+
+
+async def run_save_draft(db: AsyncSession, audio: AudioUpload, language: str, progress=None) -> dict:
+    # 1. Transcribe
+    if progress:
+        await progress("transcribing")
+    transcript = await transcribe_audio(audio, language)
+    
+    # 2. Quick categorize
+    if progress:
+        await progress("categorizing")
+    categorization = await quick_categorize(transcript)
+    
+    # 3. Save draft
+    draft_id = str(uuid.uuid4())
+    new_draft = Draft(
+        id=draft_id,
+        title=categorization.get("title", "Untitled Thought"),
+        tag=categorization.get("tag", "💡 IDEA"),
+        transcript=transcript
+    )
+    db.add(new_draft)
+    with tracing.span("db_write"):
+        await db.commit()
+    
+    return {
+        "draft_id": draft_id,
+        "title": new_draft.title,
+        "tag": new_draft.tag,
+        "transcript": transcript[:200] + "..." if len(transcript) > 200 else transcript
+    }
 
 
 @router.get("/drafts")
-async def get_drafts(db: AsyncSession = Depends(get_db)):
-    """Get all drafts for the Incubator view"""
-    stmt = select(Draft).order_by(Draft.created_at.desc())
-    result = await db.execute(stmt)
-    drafts = result.scalars().all()
+async def get_drafts(
+    response: Response,
+    cursor: str = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get drafts for the Incubator view, newest first.
+    Pass the X-Next-Cursor response header back as `cursor` for the next page.
+    """
+    # Only the first 151 characters are fetched: enough to build the preview
+    # and to know whether it was truncated.
+    stmt = select(
+        Draft.id,
+        Draft.title,
+        Draft.tag,
+        func.substr(Draft.transcript, 1, 151).label("preview"),
+        Draft.created_at
+    )
+    result = await db.execute(paginate(stmt, Draft, cursor, limit))
+    drafts = page_rows(result.all(), limit, response)
     
     return [
         {
             "id": d.id,
             "title": d.title,
             "tag": d.tag,
-            "transcript": d.transcript[:150] + "..." if len(d.transcript) > 150 else d.transcript,
+            "transcript": d.preview[:150] + "..." if len(d.preview or "") > 150 else d.preview,
             "created_at": d.created_at
         }
         for d in drafts
     ]
 # ===== THE LOOP (Decision Memory) =====
-from datetime import datetime, timedelta
+from datetime import timedelta
+from app.core.clock import utcnow
 from app.models import Decision
 from app.services.generation import audit_judgment
+from app.services.scheduler import due_sweeper
 
 @router.post("/decisions/seal")
 async def seal_wager(
@@ -265,7 +544,7 @@ async def seal_wager(
         raise HTTPException(status_code=404, detail="Session not found")
     
     decision_id = str(uuid.uuid4())
-    review_date = datetime.now() + timedelta(days=days)
+    review_date = utcnow() + timedelta(days=days)
     
     new_decision = Decision(
         id=decision_id,
@@ -277,7 +556,9 @@ async def seal_wager(
     )
     
     db.add(new_decision)
-    await db.commit()
+    with tracing.span("db_write"):
+        await db.commit()
+    due_sweeper.notify()
     
     return {
         "decision_id": decision_id,
@@ -286,25 +567,33 @@ async def seal_wager(
     }
 
 @router.get("/decisions/history")
-async def get_decision_history(db: AsyncSession = Depends(get_db)):
-    """Fetch all wagers, updating statuses to DUE if review_date has passed."""
-    now = datetime.now()
-    
-    # Update PENDING to DUE if time has passed
-    # This is a lazy update on fetch
-    # Note: In a real app, this might be a background task
-    stmt_update = select(Decision).where(Decision.status == "PENDING", Decision.review_date <= now)
-    result = await db.execute(stmt_update)
-    pending_to_due = result.scalars().all()
-    for d in pending_to_due:
-        d.status = "DUE"
-    
-    if pending_to_due:
-        await db.commit()
+async def get_decision_history(
+    response: Response,
+    cursor: str = None,
+    limit: int = Query(default=DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Fetch wagers, newest first. Read-only: the DUE transition is persisted by
+    the background sweeper, but a PENDING wager already past its review_date
+    is reported as DUE in case the sweep has not run yet.
+    """
+    # Compared in SQL, so naive (SQLite) and aware (Postgres) columns both work
+    overdue = (Decision.status == "PENDING") & (Decision.review_date <= utcnow())
 
-    stmt = select(Decision).order_by(Decision.created_at.desc())
-    result = await db.execute(stmt)
-    decisions = result.scalars().all()
+    # Transcripts are never needed for the history list, so leave them in the DB
+    stmt = select(
+        Decision.id,
+        Decision.prediction,
+        Decision.review_date,
+        case((overdue, "DUE"), else_=Decision.status).label("status"),
+        Decision.accuracy_score,
+        Decision.blind_spot,
+        Decision.growth_insight,
+        Decision.created_at
+    )
+    result = await db.execute(paginate(stmt, Decision, cursor, limit))
+    decisions = page_rows(result.all(), limit, response)
     
     return [
         {
@@ -335,36 +624,149 @@ async def audit_decision(
     if not decision:
         raise HTTPException(status_code=404, detail="Decision not found")
     
+    audio = await ingest_audio(file)
+    return await run_audit(db, decision, audio, language)
+
+async def run_audit(db: AsyncSession, decision: Decision, audio: AudioUpload, language: str, progress=None) -> dict:
     # 1. Transcribe new update
-    temp_filename = f"audit_{uuid.uuid4()}_{file.filename}"
-    temp_file_path = f"temp_uploads/{temp_filename}"
-    os.makedirs("temp_uploads", exist_ok=True)
+    if progress:
+        await progress("transcribing")
+    update_transcript = await transcribe_audio(audio, language)
     
-    try:
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-            
-        update_transcript = await transcribe_audio(temp_file_path, language)
-        
-        # 2. Audit judgment with Gemini
-        audit_result = await audit_judgment(decision.original_transcript, update_transcript)
-        
-        # 3. Update decision
-        decision.update_transcript = update_transcript
-        decision.accuracy_score = audit_result.get("accuracy_score", 0)
-        decision.blind_spot = audit_result.get("blind_spot", "N/A")
-        decision.growth_insight = audit_result.get("growth_insight", "N/A")
-        decision.status = "AUDITED"
-        
+    # 2. Audit judgment with Gemini
+    if progress:
+        await progress("auditing")
+    audit_result = await audit_judgment(decision.original_transcript, update_transcript)
+    
+    # 3. Update decision
+    decision.update_transcript = update_transcript
+    decision.accuracy_score = audit_result.get("accuracy_score", 0)
+    decision.blind_spot = audit_result.get("blind_spot", "N/A")
+    decision.growth_insight = audit_result.get("growth_insight", "N/A")
+    decision.status = "AUDITED"
+    
+    with tracing.span("db_write"):
         await db.commit()
-        
-        return {
-            "status": "AUDITED",
-            "accuracy_score": decision.accuracy_score,
-            "blind_spot": decision.blind_spot,
-            "growth_insight": decision.growth_insight
-        }
-        
-    finally:
-        if os.path.exists(temp_file_path):
-            os.remove(temp_file_path)
+    
+    return {
+        "status": "AUDITED",
+        "accuracy_score": decision.accuracy_score,
+        "blind_spot": decision.blind_spot,
+        "growth_insight": decision.growth_insight
+    }
+
+
+# ===== JOBS (Background processing) =====
+from app.services.jobs import job_queue, job_handler, PRIORITY_AUDIT, PRIORITY_INTERACTIVE, PRIORITY_DRAFT
+
+
+@contextmanager
+def _job_audio(ctx):
+    """Opens the job's spooled upload (or the inline bytes of a job queued by an older release)."""
+    p = ctx.payload
+    if ctx.audio_path is None:
+        yield audio_from_bytes(ctx.audio, p["mime_type"], p.get("filename"))
+        return
+    with open(ctx.audio_path, "rb") as stream:
+        yield AudioUpload(
+            stream=stream, mime_type=p["mime_type"], size=p["size"], sha256=p["sha256"], filename=p.get("filename"),
+        )
+
+async def _read_upload(file: UploadFile) -> tuple:
+    """Validates an upload and returns its stream with the metadata a job needs to rebuild it."""
+    audio = await ingest_audio(file)
+    meta = {"mime_type": audio.mime_type, "filename": audio.filename, "size": audio.size, "sha256": audio.sha256}
+    return audio.stream, meta
+
+@job_handler("transmute")
+async def _transmute_job(ctx):
+    await ctx.progress("transcribing")
+    with _job_audio(ctx) as audio:
+        text = await transcribe_audio(audio, ctx.payload.get("language"))
+    return {"text": text}
+
+@job_handler("draft")
+async def _save_draft_job(ctx):
+    async with AsyncSessionLocal() as db:
+        with _job_audio(ctx) as audio:
+            return await run_save_draft(db, audio, ctx.payload.get("language"), ctx.progress)
+
+@job_handler("generate")
+async def _generate_job(ctx):
+    p = ctx.payload
+    await ctx.progress("generating")
+    async with AsyncSessionLocal() as db:
+        return await run_generate_post(db, p["text"], p["analysis"], p["language"], p["variation"], p["lazy"])
+
+@job_handler("audit")
+async def _audit_job(ctx):
+    async with AsyncSessionLocal() as db:
+        decision = await db.get(Decision, ctx.payload["decision_id"])
+        if not decision:
+            # No request to answer here; the message becomes the job's error
+            raise LookupError("Decision not found")
+        with _job_audio(ctx) as audio:
+            return await run_audit(db, decision, audio, ctx.payload.get("language"), ctx.progress)
+
+
+@router.post("/jobs/transmute", status_code=202)
+async def submit_transmute_job(file: UploadFile = File(...), language: str = None):
+    audio, meta = await _read_upload(file)
+    job_id = await job_queue.submit("transmute", {**meta, "language": language}, PRIORITY_INTERACTIVE, audio)
+    return {"job_id": job_id, "status": "QUEUED"}
+
+@router.post("/jobs/save_draft", status_code=202)
+async def submit_save_draft_job(file: UploadFile = File(...), language: str = None):
+    audio, meta = await _read_upload(file)
+    job_id = await job_queue.submit("draft", {**meta, "language": language}, PRIORITY_DRAFT, audio)
+    return {"job_id": job_id, "status": "QUEUED"}
+
+@router.post("/jobs/generate-post", status_code=202)
+async def submit_generate_job(
+    text: str = Body(..., embed=True), 
+    analysis: dict = Body(..., embed=True),
+    language: str = Body(default="English", embed=True),
+    variation: bool = Body(default=False, embed=True),
+    lazy: bool = Body(default=False, embed=True)
+):
+    payload = {"text": text, "analysis": analysis, "language": language, "variation": variation, "lazy": lazy}
+    job_id = await job_queue.submit("generate", payload, PRIORITY_INTERACTIVE)
+    return {"job_id": job_id, "status": "QUEUED"}
+
+@router.post("/jobs/decisions/audit/{decision_id}", status_code=202)
+async def submit_audit_job(
+    decision_id: str,
+    file: UploadFile = File(...),
+    language: str = None,
+    db: AsyncSession = Depends(get_db)
+):
+    if not await db.get(Decision, decision_id):
+        raise HTTPException(status_code=404, detail="Decision not found")
+    
+    audio, meta = await _read_upload(file)
+    payload = {**meta, "decision_id": decision_id, "language": language}
+    job_id = await job_queue.submit("audit", payload, PRIORITY_AUDIT, audio)
+    return {"job_id": job_id, "status": "QUEUED"}
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    job = await job_queue.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-Sent Events: one `job` event per status/progress change until the job finishes."""
+    if not await job_queue.get(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def events():
+        async for snapshot in job_queue.watch(job_id):
+            yield sse_event("job", snapshot)
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
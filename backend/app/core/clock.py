@@ -0,0 +1,19 @@
+"""
+Timezone-aware time. Timestamp columns are DateTime(timezone=True): Postgres
+returns aware datetimes while SQLite returns naive ones, so values are always
+written as aware UTC and read back through as_utc() before any arithmetic.
+"""
+from datetime import datetime, timezone
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    """Treats a naive datetime (SQLite) as UTC; converts aware ones to UTC."""
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
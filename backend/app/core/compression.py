@@ -0,0 +1,38 @@
+"""
+Compact JSON encoding for large stored documents.
+Each blob starts with a one-byte codec marker so rows written with different
+SESSION_COMPRESSION settings can always be read back.
+"""
+import json
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # Optional dependency
+    zstandard = None
+
+RAW = b"r"
+ZLIB = b"z"
+ZSTD = b"s"
+
+
+def encode_json(value, codec: str = "zlib") -> bytes:
+    raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    if codec == "zstd" and zstandard is not None:
+        return ZSTD + zstandard.ZstdCompressor(level=6).compress(raw)
+    if codec in ("zlib", "zstd"):
+        return ZLIB + zlib.compress(raw, 6)
+    return RAW + raw
+
+
+def decode_json(blob: bytes):
+    marker, payload = blob[:1], blob[1:]
+    if marker == ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed rows")
+        payload = zstandard.ZstdDecompressor().decompress(payload)
+    elif marker == ZLIB:
+        payload = zlib.decompress(payload)
+    elif marker != RAW:
+        raise ValueError(f"Unknown compression marker: {marker!r}")
+    return json.loads(payload.decode("utf-8"))
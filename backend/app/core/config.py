@@ -1,5 +1,6 @@
 import os
-import google.generativeai as genai
+import logging
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -11,10 +12,121 @@ class Settings:
     # Strictly use GEMINI_API_KEY
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY")
 
+    # Database. Defaults to a local SQLite file; set DATABASE_URL for Postgres
+    # (postgres:// URLs are converted to the asyncpg driver) and optionally
+    # DATABASE_READ_URL for a read replica used by GET endpoints.
+    DATABASE_URL: str = os.getenv("DATABASE_URL")
+    DATABASE_READ_URL: str = os.getenv("DATABASE_READ_URL")
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "10"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    SQLITE_BUSY_TIMEOUT_MS: int = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+    # Codec for the large Session sections: "zlib", "zstd" (needs zstandard) or "none"
+    SESSION_COMPRESSION: str = os.getenv("SESSION_COMPRESSION", "zlib")
+
+    # Transcription throughput: how many transcriptions may be in flight per
+    # worker, and how many threads serve the blocking Gemini file API calls.
+    TRANSCRIPTION_CONCURRENCY: int = int(os.getenv("TRANSCRIPTION_CONCURRENCY", "32"))
+    GEMINI_FILE_API_THREADS: int = int(os.getenv("GEMINI_FILE_API_THREADS", "16"))
+    GEMINI_FILE_READY_TIMEOUT: float = float(os.getenv("GEMINI_FILE_READY_TIMEOUT", "60"))
+
+    # Gemini quota admission: default per-model RPM/TPM, overridable per model
+    # with GEMINI_MODEL_QUOTAS="gemini-2.5-flash=1000:1000000,gemini-2.0-flash=2000:4000000"
+    GEMINI_DEFAULT_RPM: int = int(os.getenv("GEMINI_DEFAULT_RPM", "1000"))
+    GEMINI_DEFAULT_TPM: int = int(os.getenv("GEMINI_DEFAULT_TPM", "1000000"))
+    GEMINI_MODEL_QUOTAS: str = os.getenv("GEMINI_MODEL_QUOTAS", "")
+    GEMINI_MAX_ATTEMPTS: int = int(os.getenv("GEMINI_MAX_ATTEMPTS", "4"))
+    GEMINI_RETRY_BASE_DELAY: float = float(os.getenv("GEMINI_RETRY_BASE_DELAY", "1.0"))
+    # Waiting calls are released cheapest first, but each second in the queue
+    # counts as this many tokens off a call's cost, so large calls never starve
+    GEMINI_QUEUE_AGING_TOKENS_PER_SECOND: float = float(os.getenv("GEMINI_QUEUE_AGING_TOKENS_PER_SECOND", "1000"))
+
+    # Optional pre-upload normalization (needs ffmpeg): mono, AUDIO_NORMALIZE_SAMPLE_RATE,
+    # leading/trailing silence trimmed, re-encoded as AUDIO_NORMALIZE_CODEC
+    # ("opus", "mp3" or "flac"). The original is kept if the result is not smaller.
+    AUDIO_NORMALIZE: bool = os.getenv("AUDIO_NORMALIZE", "false").lower() == "true"
+    AUDIO_NORMALIZE_CODEC: str = os.getenv("AUDIO_NORMALIZE_CODEC", "opus")
+    AUDIO_NORMALIZE_SAMPLE_RATE: int = int(os.getenv("AUDIO_NORMALIZE_SAMPLE_RATE", "16000"))
+    AUDIO_NORMALIZE_BITRATE: str = os.getenv("AUDIO_NORMALIZE_BITRATE", "24k")
+    AUDIO_NORMALIZE_TRIM_SILENCE: bool = os.getenv("AUDIO_NORMALIZE_TRIM_SILENCE", "true").lower() == "true"
+    AUDIO_NORMALIZE_CONCURRENCY: int = int(os.getenv("AUDIO_NORMALIZE_CONCURRENCY", str(os.cpu_count() or 2)))
+
+    # Long recordings: above LONG_AUDIO_MIN_BYTES, audio is cut at silences into
+    # ~LONG_AUDIO_SEGMENT_SECONDS segments that are transcribed concurrently.
+    LONG_AUDIO_ENABLED: bool = os.getenv("LONG_AUDIO_ENABLED", "true").lower() == "true"
+    LONG_AUDIO_MIN_BYTES: int = int(os.getenv("LONG_AUDIO_MIN_BYTES", str(8 * 1024 * 1024)))
+    LONG_AUDIO_SEGMENT_SECONDS: float = float(os.getenv("LONG_AUDIO_SEGMENT_SECONDS", "120"))
+    LONG_AUDIO_OVERLAP_SECONDS: float = float(os.getenv("LONG_AUDIO_OVERLAP_SECONDS", "2"))
+    LONG_AUDIO_FANOUT: int = int(os.getenv("LONG_AUDIO_FANOUT", "4"))
+
+    # Worker processes for /analyze/batch (one shared pool, started on first use)
+    ANALYSIS_WORKERS: int = int(os.getenv("ANALYSIS_WORKERS", str(os.cpu_count() or 1)))
+
+    # Logging: level, "json" or "text" output, share of requests whose DEBUG
+    # records are kept, payload cap and bounded queue size (overflow is dropped)
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "json")
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+    LOG_PAYLOAD_MAX_CHARS: int = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "500"))
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+    # Per-stage latency histograms (/metrics); Server-Timing response header is opt-in
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    SERVER_TIMING_ENABLED: bool = os.getenv("SERVER_TIMING_ENABLED", "false").lower() == "true"
+
+    # /public/{slug}: in-process payload cache and HTTP caching headers.
+    # Unpublishing only clears the cache of the worker that handled it, and no
+    # CDN purge is sent: other workers keep serving the page for up to
+    # PUBLIC_CACHE_TTL, and browsers/edges for up to MAX_AGE/EDGE_MAX_AGE after
+    # their last fetch, so an unpublished page can stay visible for
+    # PUBLIC_CACHE_TTL + max(MAX_AGE, EDGE_MAX_AGE) seconds (2 minutes by default).
+    PUBLIC_CACHE_ENTRIES: int = int(os.getenv("PUBLIC_CACHE_ENTRIES", "1024"))
+    PUBLIC_CACHE_TTL: float = float(os.getenv("PUBLIC_CACHE_TTL", "60"))
+    PUBLIC_CACHE_MAX_AGE: int = int(os.getenv("PUBLIC_CACHE_MAX_AGE", "60"))
+    PUBLIC_CACHE_EDGE_MAX_AGE: int = int(os.getenv("PUBLIC_CACHE_EDGE_MAX_AGE", "60"))
+
+    # Upload size cap, enforced while the multipart body is streamed.
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(50 * 1024 * 1024)))
+
+    # Transcript cache (keyed by audio hash + language)
+    TRANSCRIPT_CACHE_TTL: float = float(os.getenv("TRANSCRIPT_CACHE_TTL", str(7 * 24 * 3600)))
+    TRANSCRIPT_CACHE_MEMORY_ENTRIES: int = int(os.getenv("TRANSCRIPT_CACHE_MEMORY_ENTRIES", "256"))
+    TRANSCRIPT_CACHE_MAX_ROWS: int = int(os.getenv("TRANSCRIPT_CACHE_MAX_ROWS", "5000"))
+
+    # Executive Suite generation: "monolithic" (one call) or "fanout" (one call per tier)
+    GENERATION_MODE: str = os.getenv("GENERATION_MODE", "monolithic")
+    GENERATION_SECTION_ATTEMPTS: int = int(os.getenv("GENERATION_SECTION_ATTEMPTS", "2"))
+
+    # Background job workers (bounds concurrent queued transcription/generation work)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    # Uploads for queued jobs are spooled here and only their path is kept on
+    # the job row; each file is deleted when its job finishes. Every process
+    # running job workers must see the same directory.
+    JOB_AUDIO_DIR: str = os.getenv("JOB_AUDIO_DIR", os.path.join(tempfile.gettempdir(), "ghostnote-jobs"))
+    # A RUNNING job whose lease lapses (its worker died) is claimed again;
+    # live workers extend the lease every third of it.
+    JOB_LEASE_SECONDS: float = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    # Job watchers re-read the row at least this often, so changes made by
+    # workers in other processes are seen too.
+    JOB_WATCH_POLL_SECONDS: float = float(os.getenv("JOB_WATCH_POLL_SECONDS", "2"))
+
+    # Gemini context caching of the static Executive Suite prompt. Prompts whose
+    # counted size is under PROMPT_CACHE_MIN_TOKENS (the model's caching minimum,
+    # 1024 for gemini-2.5-flash) are always sent inline. Off by default: the
+    # current prompt is ~4,100 characters, about 1,000 tokens, which is at or
+    # under that minimum, so there is nothing to cache until the prompt grows.
+    PROMPT_CACHE_ENABLED: bool = os.getenv("PROMPT_CACHE_ENABLED", "false").lower() == "true"
+    PROMPT_CACHE_TTL: float = float(os.getenv("PROMPT_CACHE_TTL", "3600"))
+    PROMPT_CACHE_REFRESH_MARGIN: float = float(os.getenv("PROMPT_CACHE_REFRESH_MARGIN", "300"))
+    PROMPT_CACHE_RETRY_AFTER: float = float(os.getenv("PROMPT_CACHE_RETRY_AFTER", "600"))
+    PROMPT_CACHE_MIN_TOKENS: int = int(os.getenv("PROMPT_CACHE_MIN_TOKENS", "1024"))
+
+    # Executive Suite result cache (non-variation requests only)
+    GENERATION_CACHE_TTL: float = float(os.getenv("GENERATION_CACHE_TTL", "3600"))
+    GENERATION_CACHE_ENTRIES: int = int(os.getenv("GENERATION_CACHE_ENTRIES", "256"))
+
 settings = Settings()
 
-# Centralized AI Configuration
+# The Gemini SDK itself is configured lazily by app.services.gemini.sdk()
 if not settings.GEMINI_API_KEY:
-    print("CRITICAL WARNING: No API Key found. App will crash on generation.")
-else:
-    genai.configure(api_key=settings.GEMINI_API_KEY)
+    logging.getLogger("ghostnote.config").critical("No API Key found. App will crash on generation.")
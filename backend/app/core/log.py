@@ -0,0 +1,147 @@
+"""
+Structured, non-blocking application logging.
+Loggers under the "ghostnote" namespace hand records to a bounded in-memory
+queue; a QueueListener thread formats and writes them, so request handlers
+never block on stdout. Every record carries the current correlation ID, DEBUG
+records are sampled per request, and large payloads go through truncate().
+"""
+import contextvars
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import sys
+import uuid
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core import metrics
+from app.core.config import settings
+
+ROOT_LOGGER = "ghostnote"
+REQUEST_ID_HEADER = "X-Request-ID"
+
+request_id_var = contextvars.ContextVar("request_id", default="-")
+_debug_sampled = contextvars.ContextVar("debug_sampled", default=None)
+
+dropped_records = metrics.counter("log_records_dropped_total", "Log records dropped because the log queue was full")
+
+# Attributes every LogRecord has; anything else came in through `extra=`
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+_listener = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def truncate(value, limit: int = None) -> str:
+    """Caps a payload for logging, noting how much was cut."""
+    text = value if isinstance(value, str) else repr(value)
+    limit = settings.LOG_PAYLOAD_MAX_CHARS if limit is None else limit
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [truncated, {len(text)} chars total]"
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the correlation ID and applies DEBUG sampling (runs on the caller's thread)."""
+
+    def filter(self, record):
+        record.request_id = request_id_var.get()
+        if record.levelno > logging.DEBUG:
+            return True
+        sampled = _debug_sampled.get()
+        if sampled is None:
+            sampled = random.random() < settings.LOG_DEBUG_SAMPLE_RATE
+        return sampled
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Never blocks the caller: records are dropped (and counted) when the queue is full."""
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped_records.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] [%(request_id)s] %(message)s"
+
+
+def configure_logging(sink=None):
+    """Installs the queue handler and starts a writer thread for `sink` (stdout). Idempotent."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream = logging.StreamHandler(sink or sys.stdout)
+    stream.setFormatter(JsonFormatter() if settings.LOG_FORMAT == "json" else logging.Formatter(TEXT_FORMAT))
+
+    handler = DroppingQueueHandler(queue.Queue(maxsize=settings.LOG_QUEUE_SIZE))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers[:] = [handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    root.propagate = False
+
+    _listener = logging.handlers.QueueListener(handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+
+
+def shutdown_logging():
+    """Flushes queued records and stops the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def bind_request_id(request_id: str = None):
+    """Sets the correlation ID (and DEBUG sampling decision) for the current context."""
+    request_id = request_id or uuid.uuid4().hex[:16]
+    request_id_var.set(request_id)
+    _debug_sampled.set(random.random() < settings.LOG_DEBUG_SAMPLE_RATE)
+    return request_id
+
+
+class RequestIdMiddleware:
+    """ASGI middleware: adopts or assigns X-Request-ID and echoes it on the response."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        incoming = Headers(scope=scope).get(REQUEST_ID_HEADER, "")[:64]
+        request_id = bind_request_id(incoming if incoming.isprintable() else None)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[REQUEST_ID_HEADER] = request_id
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
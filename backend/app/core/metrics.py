@@ -0,0 +1,179 @@
+"""
+Lightweight in-process metrics registry.
+Counters, gauges and histograms are created on first use, optionally with a
+fixed set of labels, and can be read back as a plain dict via snapshot() or as
+Prometheus text exposition via render_prometheus().
+"""
+import threading
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_lock = threading.Lock()
+_registry = {}
+
+
+def _label_key(labels) -> tuple:
+    return tuple(sorted((labels or {}).items()))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+class Metric:
+    type_name = "untyped"
+
+    def __init__(self, name: str, description: str = "", labels: tuple = ()):
+        self.name = name
+        self.description = description
+        self.labels = labels
+
+    @property
+    def key(self) -> str:
+        return self.name + _format_labels(self.labels)
+
+
+class Counter(Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, description: str = "", labels: tuple = ()):
+        super().__init__(name, description, labels)
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        with _lock:
+            self.value += amount
+
+    def snapshot(self):
+        return self.value
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Gauge(Metric):
+    type_name = "gauge"
+
+    def __init__(self, name: str, description: str = "", labels: tuple = ()):
+        super().__init__(name, description, labels)
+        self.value = 0
+
+    def set(self, value):
+        with _lock:
+            self.value = value
+
+    def inc(self, amount=1):
+        with _lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        with _lock:
+            self.value -= amount
+
+    def snapshot(self):
+        return self.value
+
+    def samples(self):
+        yield self.name, self.labels, self.value
+
+
+class Histogram(Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, description: str = "", buckets=DEFAULT_BUCKETS, labels: tuple = ()):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float):
+        with _lock:
+            self.count += 1
+            self.sum += value
+            self.min = value if self.min is None else min(self.min, value)
+            self.max = value if self.max is None else max(self.max, value)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def _cumulative(self):
+        cumulative, buckets = 0, []
+        for bound, count in zip(self.buckets, self.bucket_counts):
+            cumulative += count
+            buckets.append((str(bound), cumulative))
+        buckets.append(("+Inf", self.count))
+        return buckets
+
+    def snapshot(self):
+        with _lock:
+            return {
+                "count": self.count,
+                "sum": round(self.sum, 6),
+                "avg": round(self.sum / self.count, 6) if self.count else None,
+                "min": self.min,
+                "max": self.max,
+                "buckets": dict(self._cumulative()),
+            }
+
+    def samples(self):
+        with _lock:
+            buckets, count, total = self._cumulative(), self.count, self.sum
+        for bound, cumulative in buckets:
+            yield f"{self.name}_bucket", self.labels + (("le", bound),), cumulative
+        yield f"{self.name}_sum", self.labels, total
+        yield f"{self.name}_count", self.labels, count
+
+
+def _get_or_create(cls, name, labels, *args):
+    label_key = _label_key(labels)
+    with _lock:
+        metric = _registry.get((name, label_key))
+        if metric is None:
+            metric = cls(name, *args, labels=label_key)
+            _registry[(name, label_key)] = metric
+        return metric
+
+
+def counter(name: str, description: str = "", labels: dict = None) -> Counter:
+    return _get_or_create(Counter, name, labels, description)
+
+
+def gauge(name: str, description: str = "", labels: dict = None) -> Gauge:
+    return _get_or_create(Gauge, name, labels, description)
+
+
+def histogram(name: str, description: str = "", buckets=DEFAULT_BUCKETS, labels: dict = None) -> Histogram:
+    return _get_or_create(Histogram, name, labels, description, buckets)
+
+
+def snapshot() -> dict:
+    with _lock:
+        metrics = list(_registry.values())
+    return {m.key: m.snapshot() for m in metrics}
+
+
+def render_prometheus() -> str:
+    """Renders every metric in the Prometheus text exposition format (0.0.4)."""
+    with _lock:
+        metrics = sorted(_registry.values(), key=lambda m: (m.name, m.labels))
+    lines, described = [], set()
+    for metric in metrics:
+        if metric.name not in described:
+            described.add(metric.name)
+            if metric.description:
+                help_text = metric.description.replace("\\", "\\\\").replace("\n", " ")
+                lines.append(f"# HELP {metric.name} {help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+        for sample_name, labels, value in metric.samples():
+            lines.append(f"{sample_name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,141 @@
+"""
+Per-stage latency tracing for the request pipeline.
+`span(stage)` times a block into the `pipeline_stage_seconds` histogram,
+labelled with the stage, the endpoint serving the current request and
+(optionally) the Gemini model. The ASGI middleware opens a trace per request
+and can report its spans back in a `Server-Timing` header.
+With TRACING_ENABLED off, span() hands back a shared no-op context manager and
+the middleware passes requests straight through.
+"""
+import contextlib
+import contextvars
+import time
+
+from starlette.datastructures import MutableHeaders
+
+from app.core import metrics
+from app.core.config import settings
+
+STAGE_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+_NOOP = contextlib.nullcontext()
+_current = contextvars.ContextVar("trace", default=None)
+
+
+class Trace:
+    """Spans recorded while serving one request or background job."""
+
+    def __init__(self, endpoint: str, scope: dict = None):
+        self._endpoint = endpoint
+        self._scope = scope
+        self.spans = []
+
+    @property
+    def endpoint(self) -> str:
+        # Routing fills in scope["route"] after the middleware runs, so the
+        # route template (not the raw path) is resolved lazily.
+        route = self._scope.get("route") if self._scope is not None else None
+        return getattr(route, "path", None) or self._endpoint
+
+    def server_timing(self) -> str:
+        totals = {}
+        for stage, seconds in self.spans:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
+
+
+def current_endpoint() -> str:
+    trace = _current.get()
+    return trace.endpoint if trace is not None else "background"
+
+
+def start_trace(endpoint: str, scope: dict = None):
+    """Opens a trace for the current context; returns a token for end_trace()."""
+    trace = Trace(endpoint, scope)
+    return trace, _current.set(trace)
+
+
+def end_trace(token):
+    _current.reset(token)
+
+
+@contextlib.contextmanager
+def _timed(stage: str, model: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        trace = _current.get()
+        labels = {"stage": stage, "endpoint": trace.endpoint if trace is not None else "background"}
+        if model:
+            labels["model"] = model
+        metrics.histogram(
+            "pipeline_stage_seconds", "Time spent in each pipeline stage", STAGE_BUCKETS, labels
+        ).observe(elapsed)
+        if trace is not None:
+            trace.spans.append((stage, elapsed))
+
+
+def span(stage: str, model: str = None):
+    """Times the enclosed block as `stage`. Usable around awaits."""
+    if not settings.TRACING_ENABLED:
+        return _NOOP
+    return _timed(stage, model)
+
+
+def record_tokens(model: str, response):
+    """Counts prompt/response tokens from a Gemini response's usage_metadata."""
+    if not settings.TRACING_ENABLED:
+        return
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    labels = {"model": model, "endpoint": current_endpoint()}
+    prompt = getattr(usage, "prompt_token_count", 0) or 0
+    completion = getattr(usage, "candidates_token_count", 0) or 0
+    metrics.counter("gemini_prompt_tokens_total", "Prompt tokens sent to Gemini", labels).inc(prompt)
+    metrics.counter("gemini_response_tokens_total", "Response tokens returned by Gemini", labels).inc(completion)
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware: per-request trace, request latency (to response headers)
+    and optional Server-Timing. Plain ASGI rather than BaseHTTPMiddleware, so
+    response bodies stream through untouched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not settings.TRACING_ENABLED:
+            return await self.app(scope, receive, send)
+
+        trace, token = start_trace("unmatched", scope)
+        started = time.perf_counter()
+        observed = False
+
+        def observe(status: int):
+            nonlocal observed
+            observed = True
+            metrics.histogram(
+                "http_request_seconds",
+                "Time to produce response headers, per endpoint",
+                STAGE_BUCKETS,
+                {"endpoint": trace.endpoint, "method": scope["method"], "status": str(status)},
+            ).observe(time.perf_counter() - started)
+
+        async def traced_send(message):
+            if message["type"] == "http.response.start":
+                if settings.SERVER_TIMING_ENABLED and trace.spans:
+                    MutableHeaders(scope=message).append("Server-Timing", trace.server_timing())
+                observe(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, traced_send)
+        finally:
+            if not observed:
+                observe(500)
+            end_trace(token)
@@ -1,20 +1,81 @@
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+from app.core.config import settings
 
 import os
 
-# Use /tmp for SQLite on Vercel because the root filesystem is read-only
-if os.environ.get("VERCEL"):
-    DATABASE_URL = "sqlite+aiosqlite:////tmp/ghostnote.db"
-else:
-    DATABASE_URL = "sqlite+aiosqlite:///./ghostnote.db"
+def _default_database_url() -> str:
+    # Use /tmp for SQLite on Vercel because the root filesystem is read-only
+    if os.environ.get("VERCEL"):
+        return "sqlite+aiosqlite:////tmp/ghostnote.db"
+    return "sqlite+aiosqlite:///./ghostnote.db"
+
+def _async_url(url: str) -> str:
+    # Hosted Postgres providers hand out sync-style URLs
+    for prefix in ("postgres://", "postgresql://"):
+        if url.startswith(prefix):
+            return "postgresql+asyncpg://" + url[len(prefix):]
+    return url
+
+DATABASE_URL = _async_url(settings.DATABASE_URL or _default_database_url())
+DATABASE_READ_URL = _async_url(settings.DATABASE_READ_URL or DATABASE_URL)
+
+def _is_sqlite(url: str) -> bool:
+    return url.startswith("sqlite")
+
+def _engine_options(url: str) -> dict:
+    if _is_sqlite(url):
+        return {"connect_args": {"timeout": settings.SQLITE_BUSY_TIMEOUT_MS / 1000}}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": True,
+    }
+
+def _configure_sqlite(engine, read_only: bool = False):
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        # WAL lets readers proceed while a writer commits; NORMAL sync is
+        # durable across app crashes and much cheaper than FULL under WAL.
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+        if read_only:
+            cursor.execute("PRAGMA query_only=ON")
+        cursor.close()
 
-engine = create_async_engine(DATABASE_URL)
+engine = create_async_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False, class_=AsyncSession)
 
+# GET endpoints read through a separate engine: a replica when
+# DATABASE_READ_URL is set, or a query_only connection pool on SQLite.
+if DATABASE_READ_URL != DATABASE_URL or _is_sqlite(DATABASE_URL):
+    read_engine = create_async_engine(DATABASE_READ_URL, **_engine_options(DATABASE_READ_URL))
+else:
+    read_engine = engine
+ReadSessionLocal = async_sessionmaker(read_engine, expire_on_commit=False, class_=AsyncSession)
+
+if _is_sqlite(DATABASE_URL):
+    _configure_sqlite(engine)
+if read_engine is not engine and _is_sqlite(DATABASE_READ_URL):
+    _configure_sqlite(read_engine, read_only=True)
+
 class Base(DeclarativeBase):
     pass
 
 async def get_db():
     async with AsyncSessionLocal() as session:
         yield session
+
+async def get_read_db():
+    async with ReadSessionLocal() as session:
+        yield session
+
+def ensure_indexes(conn):
+    """create_all skips tables that already exist, so add any of their missing indexes."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
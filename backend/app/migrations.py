@@ -0,0 +1,140 @@
+"""
+Minimal schema migration runner.
+Migrations are registered in order with @migration(version, description) and
+run inside one transaction at startup; the highest applied version is kept in
+the schema_version table, and boots that find it current skip the DDL.
+Long data conversions run afterwards as online backfills so they never hold
+up boot.
+"""
+import asyncio
+
+from sqlalchemy import inspect, text, select, update
+
+from app.core.log import get_logger
+from app.database import Base, AsyncSessionLocal, ensure_indexes
+from app.models import Session, split_suite
+
+log = get_logger("migrations")
+
+_migrations = []
+
+
+def migration(version: int, description: str):
+    def register(fn):
+        _migrations.append((version, description, fn))
+        _migrations.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _current_version(conn) -> int:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER NOT NULL, description VARCHAR, "
+        "applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    ))
+    return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+
+
+def _apply_pending(conn) -> int:
+    current = _current_version(conn)
+    for version, description, fn in _migrations:
+        if version <= current:
+            continue
+        log.info("Applying %s: %s", version, description)
+        fn(conn)
+        conn.execute(
+            text("INSERT INTO schema_version (version, description) VALUES (:v, :d)"),
+            {"v": version, "d": description},
+        )
+        current = version
+    return current
+
+
+def _recorded_version(conn):
+    """Applied version without any DDL, or None if schema_version is missing."""
+    try:
+        return conn.execute(text("SELECT MAX(version) FROM schema_version")).scalar() or 0
+    except Exception:
+        return None
+
+
+async def run_migrations(engine) -> int:
+    """
+    Brings the schema up to date. On an already-current database this is a
+    single read of the version marker; create_all, index checks and the
+    schema_version DDL only run when something is pending.
+    """
+    latest = _migrations[-1][0]
+    async with engine.connect() as conn:
+        current = await conn.run_sync(_recorded_version)
+    if current is not None and current >= latest:
+        return current
+    async with engine.begin() as conn:
+        return await conn.run_sync(_apply_pending)
+
+
+def _add_missing_columns(conn, table_name: str, column_names):
+    existing = {c["name"] for c in inspect(conn).get_columns(table_name)}
+    table = Base.metadata.tables[table_name]
+    for name in column_names:
+        if name in existing:
+            continue
+        column = table.c[name]
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column_type}"))
+
+
+@migration(1, "Baseline schema")
+def _baseline(conn):
+    Base.metadata.create_all(conn)
+    ensure_indexes(conn)
+
+
+@migration(2, "Split Session.data into free_tier / pro_tier / social_content")
+def _split_session_sections(conn):
+    _add_missing_columns(conn, "sessions", ["free_tier", "pro_tier", "social_content"])
+
+
+@migration(3, "Record generation language/variation on sessions")
+def _session_generation_inputs(conn):
+    _add_missing_columns(conn, "sessions", ["language", "variation"])
+
+
+@migration(4, "Add lease expiry to jobs")
+def _job_leases(conn):
+    _add_missing_columns(conn, "jobs", ["lease_expires_at"])
+
+
+@migration(5, "Keep job uploads on disk, referenced by path")
+def _job_audio_paths(conn):
+    _add_missing_columns(conn, "jobs", ["audio_path"])
+
+
+async def backfill_session_sections(batch_size: int = 100, pause: float = 0.05) -> int:
+    """
+    Online backfill: moves legacy Session.data blobs into the section columns
+    in small batches, yielding between batches so live traffic is not starved.
+    """
+    converted = 0
+    while True:
+        async with AsyncSessionLocal() as db:
+            stmt = (
+                select(Session.id, Session.data)
+                .where(Session.data.is_not(None), Session.free_tier.is_(None))
+                .limit(batch_size)
+            )
+            rows = (await db.execute(stmt)).all()
+            if not rows:
+                break
+            for session_id, data in rows:
+                sections = split_suite(data)
+                values = {**sections, "data": None} if sections.get("free_tier") is not None else {"free_tier": {}}
+                await db.execute(update(Session).where(Session.id == session_id).values(**values))
+            await db.commit()
+        converted += len(rows)
+        await asyncio.sleep(pause)
+
+    if converted:
+        log.info("Backfilled sections for %d sessions", converted)
+    return converted
@@ -1,18 +1,73 @@
-from sqlalchemy import String, Boolean, JSON, Column, Integer, DateTime
+from sqlalchemy import String, Boolean, JSON, Column, Integer, Float, DateTime, LargeBinary, Index
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
+from .core.compression import encode_json, decode_json
+from .core.config import settings
 from .database import Base
 
+SUITE_SECTIONS = ("free_tier", "pro_tier", "social_content")
+
+
+class CompressedJSON(TypeDecorator):
+    """JSON stored as a compressed blob (codec chosen by SESSION_COMPRESSION)."""
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return None if value is None else encode_json(value, settings.SESSION_COMPRESSION)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else decode_json(value)
+
+
+def split_suite(suite: dict) -> dict:
+    """Maps an Executive Suite (current or legacy flat shape) onto the section columns."""
+    if not isinstance(suite, dict):
+        return {}
+    if any(section in suite for section in SUITE_SECTIONS):
+        return {section: suite.get(section) for section in SUITE_SECTIONS}
+    # Legacy flat suites: the Scribe fields became free_tier, everything else pro_tier
+    free_keys = ("core_thesis", "strategic_pillars", "tactical_steps")
+    return {
+        "free_tier": {k: suite.get(k) for k in free_keys},
+        "pro_tier": {k: v for k, v in suite.items() if k not in free_keys} or None,
+        "social_content": None,
+    }
+
 class Session(Base):
     __tablename__ = "sessions"
 
     id = Column(String, primary_key=True, index=True) # UUID
     text = Column(String)
     analysis = Column(JSON)
-    data = Column(JSON)
+    data = Column(JSON(none_as_null=True), nullable=True)  # Legacy whole-suite blob, emptied by the section backfill
+    # The suite is stored per section so public reads only load free_tier
+    free_tier = Column(JSON(none_as_null=True), nullable=True)
+    pro_tier = Column(CompressedJSON, nullable=True)
+    social_content = Column(CompressedJSON, nullable=True)
+    # Generation inputs, so lazily generated tiers match the free tier
+    language = Column(String, nullable=True)
+    variation = Column(Boolean, nullable=True)
     is_public = Column(Boolean, default=False)
     public_slug = Column(String, unique=True, index=True, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    @property
+    def suite(self) -> dict:
+        """The Executive Suite as API clients see it (only the sections generated so far)."""
+        if self.free_tier is None and isinstance(self.data, dict):
+            return self.data
+        return {
+            section: getattr(self, section)
+            for section in SUITE_SECTIONS
+            if getattr(self, section) is not None
+        }
+
+    def set_suite(self, suite: dict):
+        for section, value in split_suite(suite).items():
+            setattr(self, section, value)
+        self.data = None
+
 
 class Draft(Base):
     __tablename__ = "drafts"
@@ -23,6 +78,10 @@ class Draft(Base):
     transcript = Column(String)  # Raw transcription
     created_at = Column(DateTime(timezone=True), server_default=func.now())
 
+    __table_args__ = (
+        Index("ix_drafts_created_at_id", "created_at", "id"),  # Keyset pagination
+    )
+
 
 class Decision(Base):
     __tablename__ = "decisions"
@@ -41,3 +100,37 @@ class Decision(Base):
     status = Column(String, default="PENDING") # PENDING, DUE, AUDITED
 
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        Index("ix_decisions_created_at_id", "created_at", "id"),  # Keyset pagination
+        Index("ix_decisions_status_review_date", "status", "review_date"),  # DUE sweep
+    )
+
+
+class TranscriptCacheEntry(Base):
+    __tablename__ = "transcript_cache"
+
+    key = Column(String, primary_key=True)  # "<sha256>:<language>"
+    transcript = Column(String)
+    expires_at = Column(Float, index=True)  # Unix timestamp
+    last_used_at = Column(Float, index=True)  # Unix timestamp, drives size-based eviction
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+
+    id = Column(String, primary_key=True, index=True)  # UUID
+    kind = Column(String)  # transmute, draft, generate, audit
+    priority = Column(Integer, default=1)  # Lower runs first
+    status = Column(String, default="QUEUED", index=True)  # QUEUED, RUNNING, SUCCEEDED, FAILED
+    progress = Column(String, nullable=True)  # Current stage, e.g. "transcribing"
+    payload = Column(JSON)
+    audio = Column(LargeBinary, nullable=True)  # Legacy inline upload from older releases; new jobs use audio_path
+    audio_path = Column(String, nullable=True)  # Spooled upload under JOB_AUDIO_DIR, deleted once the job finishes
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    lease_expires_at = Column(DateTime(timezone=True), nullable=True)  # RUNNING jobs only; extended by the worker's heartbeat
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -3,77 +3,115 @@ Emotion analysis service for audio content.
 Analyzes vocal characteristics to determine emotional state.
 """
 
-# Filler words to remove from transcripts
-FILLER_WORDS = [
-    "um", "uh", "like", "you know", "basically", "actually", "literally",
-    "so", "well", "right", "okay", "I mean", "kind of", "sort of",
-    "just", "really", "very", "honestly", "seriously", "obviously"
-]
-
-
-def remove_filler_words(text: str) -> str:
-    """Remove common filler words from transcript."""
-    result = text
-    for filler in FILLER_WORDS:
-        # Case-insensitive replacement
-        import re
-        pattern = re.compile(r'\b' + re.escape(filler) + r'\b', re.IGNORECASE)
-        result = pattern.sub('', result)
+import multiprocessing
+import re
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from app.core.config import settings
+from app.services.lexicon import get_matcher, classify_emotion
+
+# Filler words to remove from transcripts, per transcript language
+FILLER_WORDS_BY_LANGUAGE = {
+    "English": [
+        "um", "uh", "like", "you know", "basically", "actually", "literally",
+        "so", "well", "right", "okay", "I mean", "kind of", "sort of",
+        "just", "really", "very", "honestly", "seriously", "obviously"
+    ],
+    "French": [
+        "euh", "bah", "ben", "genre", "du coup", "en fait", "voilà", "quoi",
+        "tu vois", "bref", "disons", "franchement", "carrément"
+    ],
+    "Spanish": [
+        "eh", "este", "pues", "o sea", "bueno", "sabes", "digamos", "en plan",
+        "la verdad", "básicamente", "literalmente"
+    ],
+    "German": [
+        "äh", "ähm", "halt", "eigentlich", "sozusagen", "quasi", "irgendwie",
+        "weißt du", "also", "ehrlich gesagt"
+    ],
+    "Portuguese": [
+        "tipo", "né", "então", "aí", "sabe", "quer dizer", "basicamente",
+        "literalmente", "na verdade"
+    ],
+}
+DEFAULT_FILLER_LANGUAGE = "English"
+FILLER_WORDS = FILLER_WORDS_BY_LANGUAGE[DEFAULT_FILLER_LANGUAGE]
+
+
+def _compile_filler_pattern(words) -> re.Pattern:
+    # One alternation per language, longest phrases first so "kind of" is
+    # matched whole rather than leaving "of" behind.
+    alternation = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+    return re.compile(r"\b(?:" + alternation + r")\b", re.IGNORECASE)
+
+
+_FILLER_PATTERNS = {
+    language: _compile_filler_pattern(words)
+    for language, words in FILLER_WORDS_BY_LANGUAGE.items()
+}
+
+
+def remove_filler_words(text: str, language: str = None, return_offsets: bool = False):
+    """
+    Remove common filler words from transcript in a single pass.
+    Unknown or missing languages fall back to the English list.
+    With return_offsets=True, returns (cleaned_text, removed) where removed is
+    a list of (start, end, word) spans in the original text.
+    """
+    pattern = _FILLER_PATTERNS.get(language or DEFAULT_FILLER_LANGUAGE, _FILLER_PATTERNS[DEFAULT_FILLER_LANGUAGE])
+
+    if return_offsets:
+        removed = []
+        pieces = []
+        last = 0
+        for match in pattern.finditer(text):
+            pieces.append(text[last:match.start()])
+            removed.append((match.start(), match.end(), match.group(0)))
+            last = match.end()
+        pieces.append(text[last:])
+        result = ''.join(pieces)
+    else:
+        result = pattern.sub('', text)
+
     # Clean up extra spaces
     result = ' '.join(result.split())
-    return result
+    return (result, removed) if return_offsets else result
 
 
-def analyze_emotion_from_text(text: str) -> str:
+def analyze_emotion_from_text(text: str, language: str = None) -> str:
     """
     Analyze emotional state from text characteristics.
     In production, this would analyze actual audio features (pitch, speed, volume).
     For now, we use text-based heuristics as a proxy.
     
-    Returns: 'angry', 'excited', or 'calm'
+    Returns: 'angry', 'excited', or 'calm' (categories come from the emotion lexicon)
     """
-    text_lower = text.lower()
     word_count = len(text.split())
     
-    # Indicators of anger/frustration
-    angry_indicators = [
-        "stop", "enough", "tired of", "sick of", "frustrated", "annoying",
-        "wrong", "problem", "issue", "terrible", "awful", "hate", "never",
-        "always", "stupid", "ridiculous", "unacceptable", "can't believe"
-    ]
-    
-    # Indicators of excitement/enthusiasm
-    excited_indicators = [
-        "amazing", "incredible", "fantastic", "can't wait", "love", 
-        "excited", "opportunity", "future", "imagine", "vision",
-        "breakthrough", "revolutionary", "game-changing", "transform"
-    ]
-    
-    # Count indicators
-    angry_count = sum(1 for indicator in angry_indicators if indicator in text_lower)
-    excited_count = sum(1 for indicator in excited_indicators if indicator in text_lower)
+    # Count indicators (whole words/phrases only) for every category in one pass
+    scores = get_matcher(language).score(text)
     
     # Short, punchy sentences suggest anger
     sentences = text.split('.')
     avg_sentence_length = word_count / max(len(sentences), 1)
     
-    # Determine emotion
-    if angry_count >= 2 or (angry_count >= 1 and avg_sentence_length < 10):
-        return "angry"
-    elif excited_count >= 2 or (excited_count >= 1 and avg_sentence_length < 12):
-        return "excited"
-    else:
-        return "calm"
+    return classify_emotion(scores, avg_sentence_length)
 
 
-def analyze_text(text: str):
+def analyze_text(text: str, language: str = None):
     """
     Analyzes text for virality and emotional characteristics.
     Returns a dict with analysis results.
     """
     word_count = len(text.split())
-    emotion = analyze_emotion_from_text(text)
-    
+    emotion = analyze_emotion_from_text(text, language)
+    return _build_analysis(word_count, emotion)
+
+
+def _build_analysis(word_count: int, emotion: str) -> dict:
     # Map emotion to display tone
     tone_map = {
         "angry": "Direct",
@@ -88,3 +126,136 @@ def analyze_text(text: str):
         "virality_score": min(100, word_count + 50),
         "suggestions": []  # No more casual suggestions
     }
+
+
+def _analyze_chunk(texts: list, language: str = None) -> list:
+    return [analyze_text(text, language) for text in texts]
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> ProcessPoolExecutor:
+    """
+    The process pool shared by every batch, created on first use. Workers are
+    spawned rather than forked: forking a server with live threads and an
+    event loop can copy locks held by other threads into the child.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.ANALYSIS_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_pool():
+    """Stops the shared pool's workers (app shutdown); the next batch starts a new one."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def analyze_batch(texts, language: str = None, workers: int = None, chunk_size: int = 256):
+    """
+    Runs analyze_text over many texts, yielding results in input order.
+    Chunks are spread over the shared process pool and at most `workers` * 2
+    are in flight at once, so arbitrarily large iterables are streamed rather
+    than materialized. Each result is identical to analyze_text(text, language).
+    """
+    iterator = iter(texts)
+    first = list(islice(iterator, chunk_size))
+    workers = workers or settings.ANALYSIS_WORKERS
+
+    # Small batches are cheaper inline than a round trip to the workers
+    if workers == 1 or len(first) < chunk_size:
+        yield from _analyze_chunk(first, language)
+        for text in iterator:
+            yield analyze_text(text, language)
+        return
+
+    pool = get_pool()
+    pending = deque([pool.submit(_analyze_chunk, first, language)])
+    try:
+        while chunk := list(islice(iterator, chunk_size)):
+            pending.append(pool.submit(_analyze_chunk, chunk, language))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+    finally:
+        # The client went away mid-stream; drop its queued chunks
+        for future in pending:
+            future.cancel()
+
+
+class IncrementalAnalyzer:
+    """
+    Live-preview analyzer that accepts transcript chunks as they arrive.
+    Each feed() costs O(chunk): word and sentence counts are updated from the
+    chunk alone, and indicator matching only re-scans a short tail window so
+    phrases split across chunks are still found. finish() returns exactly
+    what analyze_text() would return for the concatenated text.
+    """
+
+    def __init__(self, language: str = None):
+        self.language = language
+        self._matcher = get_matcher(language)
+        self._scores = self._matcher.empty_scores()
+        self._seen = set()
+        self._word_count = 0
+        self._ends_in_word = False
+        self._periods = 0
+        # Text not yet fully scanned for indicators (the last few tokens)
+        self._pending = ""
+
+    def feed(self, chunk: str) -> dict:
+        if chunk:
+            words = chunk.split()
+            self._word_count += len(words)
+            # A word split across the chunk boundary was counted twice
+            if words and self._ends_in_word and not chunk[0].isspace():
+                self._word_count -= 1
+            self._ends_in_word = not chunk[-1].isspace()
+            self._periods += chunk.count('.')
+
+            self._pending += chunk
+            self._scan(final=False)
+        return self.result()
+
+    def finish(self) -> dict:
+        self._scan(final=True)
+        return self.result()
+
+    def _scan(self, final: bool):
+        tokens = list(self._matcher.tokenize(self._pending))
+        if not final and tokens and not self._pending[tokens[-1][2]:].strip("'’-"):
+            # The trailing token may continue in the next chunk ("can" + "'t")
+            tokens.pop()
+
+        # Only phrases whose full window of tokens has arrived can be matched now
+        window = self._matcher.max_phrase_tokens
+        stop = len(tokens) if final else len(tokens) - window + 1
+        if stop <= 0:
+            return
+
+        matches = self._matcher.match_tokens(tokens, stop=stop)
+        self._matcher.accumulate(self._scores, self._seen, tokens, matches)
+
+        if final:
+            self._pending = ""
+        elif stop < len(tokens):
+            self._pending = self._pending[tokens[stop][1]:]
+        else:
+            self._pending = self._pending[tokens[-1][2]:]
+
+    def result(self) -> dict:
+        # Same sentence heuristic as analyze_emotion_from_text: len(text.split('.'))
+        avg_sentence_length = self._word_count / (self._periods + 1)
+        emotion = classify_emotion(self._scores, avg_sentence_length)
+        return _build_analysis(self._word_count, emotion)
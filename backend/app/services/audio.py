@@ -0,0 +1,135 @@
+"""
+Audio helpers backed by the ffmpeg CLI.
+Used to find silence boundaries in long recordings, cut them into
+segments that can be transcribed independently, and normalize uploads into
+compact speech-grade audio before they are sent to Gemini.
+"""
+import asyncio
+import re
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+SEGMENT_MIME_TYPE = "audio/flac"
+
+# codec name -> (ffmpeg output args, container format, mime type)
+NORMALIZED_CODECS = {
+    "opus": (["-c:a", "libopus", "-application", "voip"], "ogg", "audio/ogg"),
+    "mp3": (["-c:a", "libmp3lame"], "mp3", "audio/mp3"),
+    "flac": (["-c:a", "flac"], "flac", "audio/flac"),
+}
+LOSSLESS_CODECS = {"flac"}
+
+# Drops leading silence, then trailing silence by trimming the reversed stream
+_TRIM_FILTER = (
+    "silenceremove=start_periods=1:start_threshold={db}dB:start_silence=0.2,"
+    "areverse,"
+    "silenceremove=start_periods=1:start_threshold={db}dB:start_silence=0.2,"
+    "areverse"
+)
+
+_DURATION_PATTERN = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+# Streamed recordings (e.g. MediaRecorder WebM) report "Duration: N/A"; the
+# final progress line still says how much audio was decoded
+_PROGRESS_TIME_PATTERN = re.compile(r"time=(\d+):(\d+):(\d+(?:\.\d+)?)")
+_SILENCE_START_PATTERN = re.compile(r"silence_start:\s*(-?\d+(?:\.\d+)?)")
+_SILENCE_END_PATTERN = re.compile(r"silence_end:\s*(\d+(?:\.\d+)?)")
+
+
+def ffmpeg_available() -> bool:
+    return shutil.which("ffmpeg") is not None
+
+
+@contextmanager
+def spooled_to_disk(data: bytes, suffix: str = ""):
+    """ffmpeg needs a seekable input to cut many segments, so stage the bytes in a temp file."""
+    with tempfile.NamedTemporaryFile(suffix=suffix) as f:
+        f.write(data)
+        f.flush()
+        yield f.name
+
+
+async def _run_ffmpeg(*args) -> tuple:
+    process = await asyncio.create_subprocess_exec(
+        "ffmpeg", "-hide_banner", "-nostdin", *args,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+    )
+    stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg failed: {stderr.decode(errors='replace')[-500:]}")
+    return stdout, stderr.decode(errors="replace")
+
+
+async def detect_silences(path: str, noise_db: float = -35.0, min_silence: float = 0.4) -> tuple:
+    """Returns (duration_seconds, [(silence_start, silence_end), ...])."""
+    _, log = await _run_ffmpeg(
+        "-i", path,
+        "-af", f"silencedetect=noise={noise_db}dB:d={min_silence}",
+        "-f", "null", "-",
+    )
+
+    duration = 0.0
+    match = _DURATION_PATTERN.search(log) or next(reversed(list(_PROGRESS_TIME_PATTERN.finditer(log))), None)
+    if match:
+        hours, minutes, seconds = match.groups()
+        duration = int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+    starts = [max(0.0, float(s)) for s in _SILENCE_START_PATTERN.findall(log)]
+    ends = [float(e) for e in _SILENCE_END_PATTERN.findall(log)]
+    # A trailing silence has a start but no end
+    ends += [duration] * (len(starts) - len(ends))
+    return duration, list(zip(starts, ends))
+
+
+def plan_segments(duration: float, silences: list, target: float, overlap: float) -> list:
+    """
+    Splits [0, duration] into ~target-second segments, moving each cut to the
+    middle of the nearest silence within a quarter-segment of the ideal point.
+    Segments overlap by `overlap` seconds so words at a cut are never lost.
+    """
+    midpoints = [(start + end) / 2 for start, end in silences]
+    cuts = []
+    position = 0.0
+    while duration - position > target * 1.5:
+        ideal = position + target
+        window = target * 0.25
+        nearby = [m for m in midpoints if abs(m - ideal) <= window]
+        cut = min(nearby, key=lambda m: abs(m - ideal)) if nearby else ideal
+        cuts.append(cut)
+        position = cut
+
+    edges = [0.0] + cuts + [duration]
+    return [
+        (max(0.0, start - overlap if i else start), min(duration, end + overlap))
+        for i, (start, end) in enumerate(zip(edges, edges[1:]))
+    ]
+
+
+async def extract_segment(path: str, start: float, end: float) -> bytes:
+    """Cuts [start, end) out of the recording as 16 kHz mono FLAC."""
+    stdout, _ = await _run_ffmpeg(
+        "-ss", f"{start:.3f}",
+        "-t", f"{end - start:.3f}",
+        "-i", path,
+        "-ac", "1", "-ar", "16000",
+        "-f", "flac", "pipe:1",
+    )
+    return stdout
+
+
+async def normalize(path: str, codec: str = "opus", sample_rate: int = 16000,
+                    bitrate: str = "24k", trim_silence: bool = True, noise_db: float = -50.0) -> tuple:
+    """
+    Re-encodes a recording as mono speech audio at `sample_rate`, optionally
+    trimming leading/trailing silence. Returns (bytes, mime_type).
+    """
+    codec_args, container, mime_type = NORMALIZED_CODECS[codec]
+    args = ["-i", path, "-vn", "-ac", "1", "-ar", str(sample_rate)]
+    if trim_silence:
+        args += ["-af", _TRIM_FILTER.format(db=noise_db)]
+    args += codec_args
+    if codec not in LOSSLESS_CODECS:
+        args += ["-b:a", bitrate]
+    stdout, _ = await _run_ffmpeg(*args, "-f", container, "pipe:1")
+    return stdout, mime_type
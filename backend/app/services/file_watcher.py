@@ -0,0 +1,157 @@
+"""
+File readiness watcher for Gemini uploads.
+A single worker task polls every in-flight upload until it leaves the
+PROCESSING state, backing off exponentially (with jitter) per file.
+"""
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+
+from app.core import metrics
+
+time_to_active = metrics.histogram(
+    "gemini_file_time_to_active_seconds",
+    "Time from upload until Gemini reports the file ACTIVE",
+)
+state_checks = metrics.counter("gemini_file_state_checks_total", "get_file calls made by the watcher")
+check_errors = metrics.counter("gemini_file_state_check_errors_total", "get_file calls that raised")
+processing_timeouts = metrics.counter("gemini_file_processing_timeouts_total", "Files still PROCESSING at the deadline")
+processing_failures = metrics.counter("gemini_file_processing_failures_total", "Files that ended in FAILED")
+
+
+@dataclass
+class _Watch:
+    name: str
+    future: asyncio.Future
+    started: float
+    delay: float
+    next_check: float
+    checks: int = field(default=0)
+
+
+class FileReadinessWatcher:
+    """
+    get_file: async callable taking a file name and returning the refreshed file.
+    clock/sleep/rand are injectable so the backoff schedule can be driven by a
+    fake clock in tests.
+    """
+
+    def __init__(
+        self,
+        get_file,
+        initial_delay: float = 0.25,
+        max_delay: float = 4.0,
+        multiplier: float = 2.0,
+        jitter: float = 0.2,
+        timeout: float = 60.0,
+        clock=time.monotonic,
+        sleep=asyncio.sleep,
+        rand=random.random,
+    ):
+        self._get_file = get_file
+        self._initial_delay = initial_delay
+        self._max_delay = max_delay
+        self._multiplier = multiplier
+        self._jitter = jitter
+        self._timeout = timeout
+        self._clock = clock
+        self._sleep = sleep
+        self._rand = rand
+        self._pending = {}
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def _jittered(self, delay: float) -> float:
+        return delay * (1 - self._jitter + 2 * self._jitter * self._rand())
+
+    async def wait_until_active(self, file):
+        """Returns the file once it is no longer PROCESSING (or the timeout elapses)."""
+        if file.state.name != "PROCESSING":
+            if file.state.name == "ACTIVE":
+                time_to_active.observe(0.0)
+            return file
+
+        watch = self._pending.get(file.name)
+        if watch is None:
+            now = self._clock()
+            watch = _Watch(
+                name=file.name,
+                future=asyncio.get_running_loop().create_future(),
+                started=now,
+                delay=self._initial_delay,
+                next_check=now + self._jittered(self._initial_delay),
+            )
+            self._pending[file.name] = watch
+            self._ensure_worker()
+            self._wakeup.set()
+
+        return await asyncio.shield(watch.future)
+
+    def _ensure_worker(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while self._pending:
+            now = self._clock()
+            due = [w for w in self._pending.values() if w.next_check <= now]
+
+            if due:
+                results = await asyncio.gather(
+                    *(self._get_file(w.name) for w in due), return_exceptions=True
+                )
+                for watch, result in zip(due, results):
+                    self._settle(watch, result)
+                continue
+
+            next_check = min(w.next_check for w in self._pending.values())
+            await self._sleep_until(next_check - now)
+
+    async def _sleep_until(self, delay: float):
+        # New registrations may be due sooner than the current earliest check.
+        self._wakeup.clear()
+        sleeper = asyncio.ensure_future(self._sleep(delay))
+        waker = asyncio.ensure_future(self._wakeup.wait())
+        _, pending = await asyncio.wait({sleeper, waker}, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+
+    def _settle(self, watch: _Watch, result):
+        state_checks.inc()
+        watch.checks += 1
+        now = self._clock()
+
+        if isinstance(result, Exception):
+            check_errors.inc()
+            self._finish(watch, exception=result)
+            return
+
+        state = result.state.name
+        if state == "PROCESSING":
+            if now - watch.started >= self._timeout:
+                processing_timeouts.inc()
+                self._finish(watch, result=result)
+                return
+            watch.delay = min(watch.delay * self._multiplier, self._max_delay)
+            watch.next_check = now + self._jittered(watch.delay)
+            return
+
+        if state == "ACTIVE":
+            time_to_active.observe(now - watch.started)
+        elif state == "FAILED":
+            processing_failures.inc()
+        self._finish(watch, result=result)
+
+    def _finish(self, watch: _Watch, result=None, exception=None):
+        self._pending.pop(watch.name, None)
+        if watch.future.done():
+            return
+        if exception is not None:
+            watch.future.set_exception(exception)
+        else:
+            watch.future.set_result(result)
@@ -0,0 +1,252 @@
+"""
+Central access point for Gemini model calls.
+Reuses GenerativeModel instances through a small registry and admits calls
+through a per-model token-bucket scheduler sized to the project's RPM/TPM
+quotas, retrying rate-limit (429) and overload (503) errors with backoff.
+This module also owns the google.generativeai SDK: it is imported and
+configured once, on first use, so cold starts that never reach an LLM call
+(health checks, reads) do not pay for it.
+"""
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+
+from app.core import metrics, tracing
+from app.core.config import settings
+from app.core.log import get_logger
+
+# Rough cost of a non-text part whose size is unknown, in tokens
+NON_TEXT_PART_TOKENS = 2000
+DEFAULT_OUTPUT_TOKENS = 1024
+# Gemini bills audio at a flat 32 tokens per second. Uploads only carry a byte
+# size, so duration is estimated at a low speech bitrate (32 kbps), which errs
+# towards over-counting compressed voice notes rather than under-counting them.
+AUDIO_TOKENS_PER_SECOND = 32
+AUDIO_BYTES_PER_SECOND = 4000
+
+calls_total = metrics.counter("gemini_calls_total", "Gemini generate_content calls issued")
+retries_total = metrics.counter("gemini_retries_total", "Gemini calls retried after a 429/503")
+rate_limited_total = metrics.counter("gemini_rate_limited_total", "Gemini calls that failed after exhausting retries")
+log = get_logger("gemini")
+
+_models = {}
+_schedulers = {}
+
+_sdk = None
+_sdk_lock = threading.Lock()
+_retryable_errors = None
+
+
+def sdk():
+    """Imports and configures google.generativeai on first use."""
+    global _sdk
+    if _sdk is None:
+        with _sdk_lock:
+            if _sdk is None:
+                import google.generativeai as genai
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                _sdk = genai
+    return _sdk
+
+
+def retryable_errors() -> tuple:
+    """Rate-limit (429) and overload (503) errors worth retrying."""
+    global _retryable_errors
+    if _retryable_errors is None:
+        from google.api_core import exceptions as google_exceptions
+        _retryable_errors = (
+            google_exceptions.ResourceExhausted,  # 429
+            google_exceptions.TooManyRequests,  # 429
+            google_exceptions.ServiceUnavailable,  # 503
+        )
+    return _retryable_errors
+
+
+def generation_config(**kwargs):
+    return sdk().types.GenerationConfig(**kwargs)
+
+
+def get_model(model_name: str):
+    model = _models.get(model_name)
+    if model is None:
+        model = sdk().GenerativeModel(model_name)
+        _models[model_name] = model
+    return model
+
+
+def get_cached_model(cached_content):
+    """GenerativeModel bound to a cached-content handle (see prompt_cache)."""
+    key = ("cached", cached_content.name)
+    model = _models.get(key)
+    if model is None:
+        model = sdk().GenerativeModel.from_cached_content(cached_content=cached_content)
+        _models[key] = model
+    return model
+
+
+async def count_tokens(model_name: str, contents) -> int:
+    """Exact prompt size from the API's tokenizer (used where a threshold matters)."""
+    response = await get_model(model_name).count_tokens_async(contents)
+    return response.total_tokens
+
+
+def _parse_quotas(spec: str) -> dict:
+    """Parses "model=rpm:tpm,model=rpm:tpm" into {model: (rpm, tpm)}."""
+    quotas = {}
+    for entry in filter(None, (part.strip() for part in (spec or "").split(","))):
+        name, _, limits = entry.partition("=")
+        rpm, _, tpm = limits.partition(":")
+        quotas[name.strip()] = (int(rpm), int(tpm))
+    return quotas
+
+
+_quotas = _parse_quotas(settings.GEMINI_MODEL_QUOTAS)
+
+
+def audio_seconds(part) -> float:
+    """Estimated duration of an uploaded audio file, or 0 for anything else."""
+    mime_type = getattr(part, "mime_type", None) or ""
+    size = getattr(part, "size_bytes", None)
+    if not mime_type.startswith("audio/") or not size:
+        return 0.0
+    return size / AUDIO_BYTES_PER_SECOND
+
+
+def _part_tokens(part) -> int:
+    if isinstance(part, str):
+        return len(part) // 4
+    seconds = audio_seconds(part)
+    if seconds:
+        return int(seconds * AUDIO_TOKENS_PER_SECOND)
+    return NON_TEXT_PART_TOKENS
+
+
+def estimate_tokens(contents, expected_output: int = DEFAULT_OUTPUT_TOKENS) -> int:
+    parts = contents if isinstance(contents, (list, tuple)) else [contents]
+    return expected_output + sum(_part_tokens(part) for part in parts)
+
+
+class TokenBucket:
+    """Refills continuously up to `per_minute` units per minute."""
+
+    def __init__(self, per_minute: int, clock=time.monotonic):
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._clock = clock
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self._rate)
+        self._updated = now
+
+    def time_until(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self._rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+
+class ModelScheduler:
+    """
+    Admission control for one model. Waiting calls are released cheapest
+    first whenever both the request and token buckets can cover them, with
+    each second spent waiting taking `aging` tokens off a call's rank so an
+    expensive call eventually reaches the front however many cheap ones arrive.
+    """
+
+    def __init__(self, model_name: str, rpm: int, tpm: int, aging: float = None, clock=time.monotonic):
+        self.model_name = model_name
+        self._requests = TokenBucket(rpm, clock)
+        self._tokens = TokenBucket(tpm, clock)
+        self._aging = settings.GEMINI_QUEUE_AGING_TOKENS_PER_SECOND if aging is None else aging
+        self._clock = clock
+        self._waiters = []
+        self._seq = itertools.count()
+        self._dispatcher = None
+        self.queue_depth = metrics.gauge(
+            "gemini_queue_depth", "Calls waiting for model quota", labels={"model": model_name}
+        )
+        self.wait_seconds = metrics.histogram(
+            "gemini_queue_wait_seconds", "Time calls waited for model quota", labels={"model": model_name}
+        )
+
+    async def acquire(self, cost: int):
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # rank = cost - aging * (now - enqueued); every waiter ages at the same
+        # rate, so ordering by cost + aging * enqueued is the same and never changes
+        rank = cost + self._aging * self._clock()
+        heapq.heappush(self._waiters, (rank, next(self._seq), cost, future))
+        self.queue_depth.inc()
+        started = loop.time()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+        try:
+            await future
+        finally:
+            self.queue_depth.dec()
+            self.wait_seconds.observe(loop.time() - started)
+
+    async def _dispatch(self):
+        while self._waiters:
+            _, _, cost, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = max(self._requests.time_until(1), self._tokens.time_until(cost))
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            heapq.heappop(self._waiters)
+            self._requests.take(1)
+            self._tokens.take(cost)
+            future.set_result(None)
+
+
+def get_scheduler(model_name: str) -> ModelScheduler:
+    scheduler = _schedulers.get(model_name)
+    if scheduler is None:
+        rpm, tpm = _quotas.get(model_name, (settings.GEMINI_DEFAULT_RPM, settings.GEMINI_DEFAULT_TPM))
+        scheduler = ModelScheduler(model_name, rpm, tpm)
+        _schedulers[model_name] = scheduler
+    return scheduler
+
+
+async def generate_content(model_name: str, contents, estimated_tokens: int = None, cached_content=None, **kwargs):
+    """
+    Quota-aware replacement for GenerativeModel.generate_content_async.
+    With `cached_content`, the call goes through a model bound to that cached
+    prefix. Extra keyword arguments (generation_config, stream, ...) are passed through.
+    """
+    model = get_cached_model(cached_content) if cached_content is not None else get_model(model_name)
+    scheduler = get_scheduler(model_name)
+    cost = estimated_tokens or estimate_tokens(contents)
+    attempts = settings.GEMINI_MAX_ATTEMPTS
+
+    for attempt in range(1, attempts + 1):
+        await scheduler.acquire(cost)
+        calls_total.inc()
+        try:
+            with tracing.span("generate", model_name):
+                response = await model.generate_content_async(contents, **kwargs)
+            if not kwargs.get("stream"):
+                tracing.record_tokens(model_name, response)
+            return response
+        except retryable_errors() as e:
+            if attempt == attempts:
+                rate_limited_total.inc()
+                raise
+            retries_total.inc()
+            delay = min(settings.GEMINI_RETRY_BASE_DELAY * 2 ** (attempt - 1), 30.0) * (0.5 + random.random())
+            log.warning("%s returned %s; retrying in %.1fs (%d/%d)", model_name, type(e).__name__, delay, attempt, attempts)
+            await asyncio.sleep(delay)
@@ -1,16 +1,41 @@
-import google.generativeai as genai
+import asyncio
+import copy
+import functools
+import hashlib
 import json
 import os
+from app.core import metrics, tracing
+from app.core.cache import LRUCache, SingleFlight
 from app.core.config import settings
+from app.core.log import get_logger, truncate
+from app.services import gemini
+from app.services.prompt_cache import generate_with_cached_prefix
 
-# Configure Gemini
-# Centrally configured in app.core.config
+# The Gemini SDK is configured lazily by app.services.gemini.sdk()
+
+GENERATION_MODEL = "gemini-2.5-flash"
+AUDIT_MODEL = "gemini-2.0-flash"
+
+# Bump whenever build_system_prompt changes so cached suites are not reused
+PROMPT_VERSION = "1"
+
+suite_cache_hits = metrics.counter("generation_cache_hits_total", "Executive Suites served from cache")
+suite_cache_misses = metrics.counter("generation_cache_misses_total", "Executive Suite requests that needed Gemini")
+suite_coalesced = metrics.counter("generation_coalesced_total", "Requests that joined an identical in-flight generation")
+log = get_logger("generation")
+
+_suite_cache = LRUCache(max_entries=settings.GENERATION_CACHE_ENTRIES, ttl=settings.GENERATION_CACHE_TTL)
+_suite_calls = SingleFlight()
 
 def clean_and_parse_json(text: str):
     """
     Robustly extracts and parses JSON from AI responses, 
     stripping markdown and conversational fluff.
     """
+    with tracing.span("parse"):
+        return _clean_and_parse_json(text)
+
+def _clean_and_parse_json(text: str):
     try:
         # Remove literal markdown blocks if present
         clean_text = text.replace("```json", "").replace("```", "").strip()
@@ -24,20 +49,20 @@ def clean_and_parse_json(text: str):
         
         return json.loads(clean_text)
     except Exception as e:
-        print(f"CRITICAL: JSON Parsing Failed. Raw response:\n{text}")
+        log.error("JSON parsing failed (%d chars). Raw response: %s", len(text), truncate(text))
         raise ValueError(f"AI response was not valid JSON: {str(e)}")
 
-def build_system_prompt(language: str) -> str:
-    return f"""You are GhostNote, an elite Strategy Alchemist with "Alien Efficiency" capabilities. Transmute audio into high-value strategic assets.
+# Prompt building blocks, shared by the monolithic prompt and the per-section
+# prompts used in fan-out mode.
+
+SUITE_DIRECTIVES = """You are GhostNote, an elite Strategy Alchemist with "Alien Efficiency" capabilities. Transmute audio into high-value strategic assets.
 
 **CORE DIRECTIVES:**
 1. **Contextual Repair:** You are an EDITOR. Fix homophones based on context (e.g., "Stall" -> "Store" in retail contexts). Fix grammar seamlessly.
 2. **Zero Brevity:** No summaries. Write rich, Wall Street Journal-style paragraphs.
-3. **Tone:** Authoritative, First-Person ("I", "We").
+3. **Tone:** Authoritative, First-Person ("I", "We")."""
 
----
-
-### **TIER 1: THE SCRIBE (The Article)**
+SCRIBE_INSTRUCTIONS = """### **TIER 1: THE SCRIBE (The Article)**
 *Goal:* Turn the voice note into a comprehensive, readable strategic article.
 
 1.  **core_thesis:** A powerful 2-paragraph hook defining the strategy.
@@ -45,11 +70,9 @@ def build_system_prompt(language: str) -> str:
     * Structure this as an array of objects.
     * **title:** Compelling headline.
     * **rich_description:** A FULL PARAGRAPH (80-100 words) explaining the nuance. No bullet points.
-3.  **tactical_steps:** Clear execution commands, not just simple checklist items.
+3.  **tactical_steps:** Clear execution commands, not just simple checklist items."""
 
----
-
-### **TIER 2: THE STRATEGIST (The Critique)**
+STRATEGIST_INSTRUCTIONS = """### **TIER 2: THE STRATEGIST (The Critique)**
 *Goal:* A deep-dive executive memo analyzing the flaws and execution path.
 
 1.  **executive_judgement:**
@@ -63,11 +86,9 @@ def build_system_prompt(language: str) -> str:
     * Analyze the transcript for Time Weighting.
     * Identify the 'Stated Goal' (what the user said they wanted to talk about).
     * Measure the 'Actual Obsession' (what topic they spent the most time verbally processing).
-    * If the Actual Obsession differs from the Stated Goal, flag it.
-
----
+    * If the Actual Obsession differs from the Stated Goal, flag it."""
 
-### **TIER 3: ALIEN EFFICIENCY (The Subtraction Engine)**
+EFFICIENCY_INSTRUCTIONS = """### **TIER 3: ALIEN EFFICIENCY (The Subtraction Engine)**
 *Goal:* Identify what to STOP doing. Efficiency through elimination.
 
 1.  **the_guillotine:** (The Subtraction Engine)
@@ -89,13 +110,32 @@ def build_system_prompt(language: str) -> str:
     * Array of objects with:
         * **title:** Brief name for this protocol.
         * **platform:** 'Email' or 'Slack'.
-        * **content:** The full ready-to-send message draft.
+        * **content:** The full ready-to-send message draft."""
+
+SOCIAL_INSTRUCTIONS = """### **SOCIAL CONTENT**
+1. **linkedin_post:** High-engagement post. Hook + Spaced Paragraphs + Call to Question + 3 Hashtags.
+2. **twitter_thread:** Array of 3-5 tweets capturing the essence with authority."""
+
+
+@functools.lru_cache(maxsize=32)
+def build_system_prompt(language: str) -> str:
+    return f"""{SUITE_DIRECTIVES}
 
 ---
 
-### **SOCIAL CONTENT**
-1. **linkedin_post:** High-engagement post. Hook + Spaced Paragraphs + Call to Question + 3 Hashtags.
-2. **twitter_thread:** Array of 3-5 tweets capturing the essence with authority.
+{SCRIBE_INSTRUCTIONS}
+
+---
+
+{STRATEGIST_INSTRUCTIONS}
+
+---
+
+{EFFICIENCY_INSTRUCTIONS}
+
+---
+
+{SOCIAL_INSTRUCTIONS}
 
 ---
 
@@ -139,41 +179,348 @@ def build_system_prompt(language: str) -> str:
 }}
 """
 
+# Fan-out mode: one smaller call per tier, merged back into the suite shape.
+# Each section's JSON is merged into its target key of the final suite.
+SUITE_SECTIONS = {
+    "scribe": {
+        "target": "free_tier",
+        "instructions": SCRIBE_INSTRUCTIONS,
+        "schema": """{
+  "core_thesis": "...",
+  "strategic_pillars": [ { "title": "...", "rich_description": "..." } ],
+  "tactical_steps": [ "..." ]
+}""",
+    },
+    "strategist": {
+        "target": "pro_tier",
+        "instructions": STRATEGIST_INSTRUCTIONS,
+        "schema": """{
+  "executive_judgement": "...",
+  "risk_audit": "...",
+  "emphasis_audit": {
+    "is_aligned": true,
+    "stated_intent": "...",
+    "actual_obsession": "...",
+    "insight": "..."
+  }
+}""",
+    },
+    "efficiency": {
+        "target": "pro_tier",
+        "instructions": EFFICIENCY_INSTRUCTIONS,
+        "schema": """{
+  "the_guillotine": [
+    { "target": "...", "reason": "...", "verdict": "TERMINATE" }
+  ],
+  "pre_mortem_risks": [
+    { "risk": "...", "likelihood": "High", "mitigation": "..." }
+  ],
+  "immediate_protocols": [
+    { "title": "...", "platform": "Email", "content": "..." }
+  ],
+  "execution_assets": {
+    "email_draft": { "subject": "...", "body": "..." },
+    "action_plan": [ "..." ]
+  }
+}""",
+    },
+    "social": {
+        "target": "social_content",
+        "instructions": SOCIAL_INSTRUCTIONS,
+        "schema": """{
+  "linkedin_post": "...",
+  "twitter_thread": [ "..." ]
+}""",
+    },
+}
+
+def build_section_prompt(section: str, language: str) -> str:
+    spec = SUITE_SECTIONS[section]
+    return f"""{SUITE_DIRECTIVES}
+
+---
+
+{spec["instructions"]}
+
+---
+
+**LANGUAGE REQUIREMENT:**
+- Write ALL output in {language}.
+
+**STRICT JSON OUTPUT STRUCTURE:**
+{spec["schema"]}
+"""
+
+def _suite_cache_key(text: str, language: str, variation: bool) -> str:
+    payload = json.dumps([PROMPT_VERSION, GENERATION_MODEL, settings.GENERATION_MODE, language, variation, text])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
 async def generate_executive_suite(text: str, language: str = "English", variation: bool = False):
+    """
+    Returns the Executive Suite for a transcript.
+    Non-variation results are cached, and identical concurrent non-variation
+    requests share a single Gemini call. Variation requests always get their
+    own generation, since each is asking for a different angle.
+    """
+    key = _suite_cache_key(text, language, variation)
+    
+    if not variation:
+        cached = _suite_cache.get(key)
+        if cached is not None:
+            suite_cache_hits.inc()
+            return copy.deepcopy(cached)
+    
+    suite_cache_misses.inc()
+    if settings.GENERATION_MODE == "fanout":
+        generate = lambda: _generate_executive_suite_fanout(text, language, variation)
+    else:
+        generate = lambda: _generate_executive_suite(text, language, variation)
+    
+    if variation:
+        return await generate()
+    
+    if _suite_calls.in_flight(key):
+        suite_coalesced.inc()
+    result = await _suite_calls.do(key, generate)
+    _suite_cache.set(key, result)
+    return copy.deepcopy(result)
+
+def build_user_prompt(text: str, variation: bool = False) -> str:
+    if variation:
+        return f"Here is the executive's raw thought stream. Transmute it into the Executive Suite. IMPORTANT: Create a DIFFERENT strategic angle this time. Focus on alternative risks or opportunities:\n\n{text}"
+    return f"Here is the executive's raw thought stream. Transmute it into the Executive Suite:\n\n{text}"
+
+def _system_prompt_key(language: str) -> tuple:
+    return ("suite", language, PROMPT_VERSION)
+
+def _suite_generation_config():
+    return gemini.generation_config(
+        temperature=0.7,
+        response_mime_type="application/json",
+    )
+
+async def _generate_executive_suite(text: str, language: str, variation: bool):
     try:
-        print(f"DEBUG: [Generation] Starting generation with model: gemini-2.5-flash")
-        model = genai.GenerativeModel("gemini-2.5-flash")
-        
-        system_prompt = build_system_prompt(language)
+        log.debug("Starting generation with model: %s", GENERATION_MODEL)
+        response = await generate_with_cached_prefix(
+            GENERATION_MODEL,
+            _system_prompt_key(language),
+            build_system_prompt(language),
+            [build_user_prompt(text, variation)],
+            generation_config=_suite_generation_config()
+        )
+        log.debug("Gemini API response received")
         
-        if variation:
-            user_prompt = f"Here is the executive's raw thought stream. Transmute it into the Executive Suite. IMPORTANT: Create a DIFFERENT strategic angle this time. Focus on alternative risks or opportunities:\n\n{text}"
-        else:
-            user_prompt = f"Here is the executive's raw thought stream. Transmute it into the Executive Suite:\n\n{text}"
+        return clean_and_parse_json(response.text)
         
-        print("DEBUG: [Generation] Calling Gemini API...")
-        response = model.generate_content(
-            [system_prompt, user_prompt],
-            generation_config=genai.types.GenerationConfig(
-                temperature=0.7,
-                response_mime_type="application/json",
+    except Exception as e:
+        log.error("Generation failed: %s", e)
+        raise e
+
+async def generate_suite_section(section: str, text: str, language: str = "English", variation: bool = False) -> dict:
+    """Generates a single fan-out section, retrying it alone on failure."""
+    attempts = settings.GENERATION_SECTION_ATTEMPTS
+    for attempt in range(1, attempts + 1):
+        try:
+            response = await gemini.generate_content(
+                GENERATION_MODEL,
+                [build_section_prompt(section, language), build_user_prompt(text, variation)],
+                generation_config=_suite_generation_config()
             )
-        )
-        print("DEBUG: [Generation] Gemini API response received.")
+            return clean_and_parse_json(response.text)
+        except Exception as e:
+            log.warning("Section '%s' failed (attempt %d/%d): %s", section, attempt, attempts, e)
+            if attempt == attempts:
+                raise
+            await asyncio.sleep(0.5 * attempt)
+
+def merge_suite_sections(sections: dict) -> dict:
+    suite = {"free_tier": {}, "pro_tier": {}, "social_content": {}}
+    for name, value in sections.items():
+        suite[SUITE_SECTIONS[name]["target"]].update(value)
+    return suite
+
+async def generate_suite_tier(tier: str, text: str, language: str = "English", variation: bool = False) -> dict:
+    """
+    Generates one tier of the suite (free_tier, pro_tier or social_content)
+    from just the sections that feed it. Used for lazy, on-demand tiers.
+    """
+    names = [name for name, spec in SUITE_SECTIONS.items() if spec["target"] == tier]
+    if not names:
+        raise ValueError(f"Unknown suite tier: {tier}")
+    
+    results = await asyncio.gather(
+        *(generate_suite_section(name, text, language, variation) for name in names)
+    )
+    return merge_suite_sections(dict(zip(names, results)))[tier]
+
+async def _generate_executive_suite_fanout(text: str, language: str, variation: bool):
+    log.debug("Fan-out generation of %d sections with model: %s", len(SUITE_SECTIONS), GENERATION_MODEL)
+    names = list(SUITE_SECTIONS)
+    results = await asyncio.gather(
+        *(generate_suite_section(name, text, language, variation) for name in names),
+        return_exceptions=True
+    )
+    
+    failed = [name for name, result in zip(names, results) if isinstance(result, Exception)]
+    if failed:
+        raise RuntimeError(f"Executive Suite sections failed: {', '.join(failed)}")
+    
+    return merge_suite_sections(dict(zip(names, results)))
+
+class SectionStreamParser:
+    """
+    Incremental scanner over a streamed JSON object.
+    feed() returns (key, value) for every top-level section whose value has
+    fully arrived, so sections can be used before the whole response exists.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_key = None
+        self._value_start = None
+
+    def feed(self, chunk: str) -> list:
+        self._buffer += chunk
+        completed = []
         
-        return clean_and_parse_json(response.text)
+        for i in range(self._pos, len(self._buffer)):
+            ch = self._buffer[i]
+            
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = json.loads(self._buffer[self._string_start:i + 1])
+                continue
+            
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                self._depth += 1
+                if self._depth == 2:
+                    self._value_start = i
+            elif ch in "}]" and self._depth > 0:
+                if self._depth == 2 and self._last_key is not None:
+                    value_text = self._buffer[self._value_start:i + 1]
+                    completed.append((self._last_key, json.loads(value_text)))
+                self._depth -= 1
         
+        self._pos = len(self._buffer)
+        return completed
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+async def _stream_suite_monolithic(text: str, language: str, variation: bool):
+    log.debug("Starting streamed generation with model: %s", GENERATION_MODEL)
+    response = await generate_with_cached_prefix(
+        GENERATION_MODEL,
+        _system_prompt_key(language),
+        build_system_prompt(language),
+        [build_user_prompt(text, variation)],
+        generation_config=_suite_generation_config(),
+        stream=True,
+    )
+    
+    parser = SectionStreamParser()
+    async for chunk in response:
+        try:
+            chunk_text = chunk.text
+        except ValueError:
+            # Chunks without text parts (e.g. the final finish_reason chunk)
+            continue
+        for section in parser.feed(chunk_text):
+            yield "section", section
+    log.debug("Gemini stream finished")
+    tracing.record_tokens(GENERATION_MODEL, response)
+    
+    yield "complete", clean_and_parse_json(parser.text)
+
+async def _stream_suite_fanout(text: str, language: str, variation: bool):
+    """Fan-out generation that yields each tier as soon as all of its sections are done."""
+    log.debug("Streamed fan-out generation of %d sections with model: %s", len(SUITE_SECTIONS), GENERATION_MODEL)
+    tasks = {
+        asyncio.ensure_future(generate_suite_section(name, text, language, variation)): name
+        for name in SUITE_SECTIONS
+    }
+    remaining = {}
+    for name, spec in SUITE_SECTIONS.items():
+        remaining.setdefault(spec["target"], set()).add(name)
+    results = {}
+    pending = set(tasks)
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                name = tasks[task]
+                results[name] = task.result()
+                tier = SUITE_SECTIONS[name]["target"]
+                remaining[tier].discard(name)
+                if not remaining[tier]:
+                    tier_sections = {n: results[n] for n in SUITE_SECTIONS if SUITE_SECTIONS[n]["target"] == tier}
+                    yield "section", (tier, merge_suite_sections(tier_sections)[tier])
+    finally:
+        for task in pending:
+            task.cancel()
+    
+    yield "complete", merge_suite_sections(results)
+
+async def stream_executive_suite(text: str, language: str = "English", variation: bool = False):
+    """
+    Streaming variant of generate_executive_suite, honouring GENERATION_MODE.
+    Yields ("section", (name, value)) as each top-level section completes,
+    then ("complete", suite) with the fully parsed result.
+    """
+    key = _suite_cache_key(text, language, variation)
+    
+    if not variation:
+        cached = _suite_cache.get(key)
+        if cached is not None:
+            suite_cache_hits.inc()
+            cached = copy.deepcopy(cached)
+            for name, value in cached.items():
+                yield "section", (name, value)
+            yield "complete", cached
+            return
+    
+    suite_cache_misses.inc()
+    if settings.GENERATION_MODE == "fanout":
+        events = _stream_suite_fanout(text, language, variation)
+    else:
+        events = _stream_suite_monolithic(text, language, variation)
+    
+    result = None
+    try:
+        async for event, payload in events:
+            if event == "complete":
+                result = payload
+            else:
+                yield event, payload
     except Exception as e:
-        print(f"DEBUG: [Generation] Error: {str(e)}")
+        log.error("Stream error: %s", e)
         raise e
+    
+    if not variation:
+        _suite_cache.set(key, result)
+    yield "complete", copy.deepcopy(result)
 
 async def audit_judgment(past_transcript: str, present_transcript: str):
     """
     The Variance Engine: Compares past predictions/context with present outcomes.
     """
     try:
-        model = genai.GenerativeModel("gemini-2.0-flash")
-        
         prompt = f"""You are the GhostNote judgment Auditor. Evaluate the variance between a past strategic intent and the present outcome.
 
 ### PAST CONTEXT (The High-Level Thought):
@@ -197,16 +544,17 @@ Respond in JSON format ONLY:
   "growth_insight": "Brief sentence on judgment evolution."
 }}
 """
-        response = model.generate_content(
+        response = await gemini.generate_content(
+            AUDIT_MODEL,
             prompt,
-            generation_config=genai.types.GenerationConfig(
+            generation_config=gemini.generation_config(
                 temperature=0.5,
                 response_mime_type="application/json",
             )
         )
         return json.loads(response.text)
     except Exception as e:
-        print(f"DEBUG: [Audit] Error: {e}")
+        log.error("Audit failed: %s", e)
         return {
             "accuracy_score": 50,
             "blind_spot": "Error calculating variance.",
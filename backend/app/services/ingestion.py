@@ -0,0 +1,122 @@
+"""
+Upload ingestion for audio endpoints.
+UploadSizeLimitMiddleware caps request bodies while they are still arriving,
+before Starlette spools the multipart form; ingest_audio then validates and
+hashes the spooled file in one pass and hands it straight to Gemini without an
+intermediate disk copy.
+"""
+import hashlib
+import io
+import mimetypes
+from dataclasses import dataclass
+from typing import BinaryIO
+
+from fastapi import UploadFile, HTTPException
+from starlette.responses import JSONResponse
+from app.core import tracing
+from app.core.config import settings
+
+CHUNK_SIZE = 1024 * 1024
+# Room for multipart boundaries, part headers and small form fields on top of
+# the audio itself.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+DEFAULT_AUDIO_MIME_TYPE = "audio/webm"
+
+
+@dataclass
+class AudioUpload:
+    stream: BinaryIO
+    mime_type: str
+    size: int
+    sha256: str
+    filename: str = None
+
+
+def _resolve_mime_type(file: UploadFile) -> str:
+    # Browsers send e.g. "audio/webm;codecs=opus"; Gemini only wants the media type.
+    content_type = (file.content_type or "").split(";")[0].strip()
+    if content_type and content_type != "application/octet-stream":
+        return content_type
+    guessed, _ = mimetypes.guess_type(file.filename or "")
+    return guessed or DEFAULT_AUDIO_MIME_TYPE
+
+
+async def ingest_audio(file: UploadFile) -> AudioUpload:
+    """
+    Reads the spooled upload in chunks, checking the file part against
+    MAX_UPLOAD_BYTES and hashing it as it goes, then rewinds it so the same
+    buffer can be uploaded as-is. Oversized request bodies never get this far:
+    UploadSizeLimitMiddleware rejects them while they stream in.
+    """
+    size = 0
+    digest = hashlib.sha256()
+    with tracing.span("ingest"):
+        while chunk := await file.read(CHUNK_SIZE):
+            size += len(chunk)
+            digest.update(chunk)
+            if size > settings.MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=_too_large_detail())
+
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Empty audio file")
+
+    await file.seek(0)
+    return AudioUpload(
+        stream=file.file,
+        mime_type=_resolve_mime_type(file),
+        size=size,
+        sha256=digest.hexdigest(),
+        filename=file.filename,
+    )
+
+
+def audio_from_bytes(data: bytes, mime_type: str, filename: str = None) -> AudioUpload:
+    """Rebuilds an AudioUpload from bytes persisted earlier (e.g. by a queued job)."""
+    return AudioUpload(
+        stream=io.BytesIO(data),
+        mime_type=mime_type,
+        size=len(data),
+        sha256=hashlib.sha256(data).hexdigest(),
+        filename=filename,
+    )
+
+
+def _too_large_detail() -> str:
+    return f"Audio file exceeds the {settings.MAX_UPLOAD_BYTES // (1024 * 1024)} MB limit"
+
+
+class UploadSizeLimitMiddleware:
+    """
+    ASGI middleware that bounds request bodies to MAX_UPLOAD_BYTES plus
+    multipart overhead. A declared Content-Length over the limit is answered
+    with 413 before any of the body is read; chunked bodies are counted as
+    they arrive and cut off with 413 as soon as they cross it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        limit = settings.MAX_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > limit:
+            response = JSONResponse({"detail": _too_large_detail()}, status_code=413)
+            return await response(scope, receive, send)
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside body parsing; FastAPI re-raises HTTPExceptions
+                    # from there, so the client gets the 413.
+                    raise HTTPException(status_code=413, detail=_too_large_detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,314 @@
+"""
+Background job queue for long-running transcription and generation work.
+Jobs are persisted in the jobs table and processed by a pool of in-process
+async workers in priority order (lower number runs first). A worker claims a
+job with a conditional UPDATE and holds a lease on it that a heartbeat keeps
+extending; QUEUED jobs and RUNNING jobs whose lease has lapsed (their worker
+died) are picked up again on startup and by a periodic sweep.
+Uploaded audio is spooled to JOB_AUDIO_DIR rather than stored on the row.
+"""
+import asyncio
+import itertools
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from typing import BinaryIO
+
+from sqlalchemy import or_, select, update
+
+from app.core import metrics, tracing
+from app.core.clock import utcnow
+from app.core.config import settings
+from app.core.log import bind_request_id, get_logger
+from app.database import AsyncSessionLocal
+from app.models import Job
+
+QUEUED = "QUEUED"
+RUNNING = "RUNNING"
+SUCCEEDED = "SUCCEEDED"
+FAILED = "FAILED"
+TERMINAL_STATES = (SUCCEEDED, FAILED)
+
+# Audits are time-sensitive reckonings; drafts are stashed for later.
+PRIORITY_AUDIT = 0
+PRIORITY_INTERACTIVE = 1
+PRIORITY_DRAFT = 2
+
+jobs_submitted = metrics.counter("jobs_submitted_total", "Jobs accepted by the queue")
+jobs_succeeded = metrics.counter("jobs_succeeded_total", "Jobs that finished successfully")
+jobs_failed = metrics.counter("jobs_failed_total", "Jobs that raised")
+job_run_seconds = metrics.histogram("job_run_seconds", "Time a worker spent on a job")
+log = get_logger("jobs")
+jobs_reclaimed = metrics.counter("jobs_reclaimed_total", "RUNNING jobs picked up again after their lease lapsed")
+
+_handlers = {}
+
+
+def job_handler(kind: str):
+    """Registers an async handler `fn(ctx: JobContext) -> dict` for a job kind."""
+    def register(fn):
+        _handlers[kind] = fn
+        return fn
+    return register
+
+
+class JobContext:
+    def __init__(self, queue, job: Job):
+        self._queue = queue
+        self.job_id = job.id
+        self.payload = job.payload or {}
+        self.audio_path = job.audio_path
+        self.audio = job.audio  # Only set on jobs queued by older releases
+
+    async def progress(self, stage: str):
+        await self._queue._update(self.job_id, progress=stage)
+
+
+def _claimable(now: datetime):
+    """QUEUED jobs, and RUNNING jobs whose worker stopped renewing the lease."""
+    return or_(
+        Job.status == QUEUED,
+        (Job.status == RUNNING) & (Job.lease_expires_at.is_(None) | (Job.lease_expires_at < now)),
+    )
+
+
+def _spool_audio(directory: str, job_id: str, stream: BinaryIO) -> str:
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, job_id)
+    with open(path, "wb") as f:
+        shutil.copyfileobj(stream, f, 1024 * 1024)
+    return path
+
+
+def _discard_audio(path: str):
+    if path:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def _snapshot(job: Job) -> dict:
+    return {
+        "id": job.id,
+        "kind": job.kind,
+        "status": job.status,
+        "progress": job.progress,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+class JobQueue:
+    def __init__(self, workers: int, lease: float = None, watch_poll: float = None, audio_dir: str = None):
+        self._worker_count = workers
+        self._audio_dir = audio_dir or settings.JOB_AUDIO_DIR
+        self._lease = lease if lease is not None else settings.JOB_LEASE_SECONDS
+        self._watch_poll = watch_poll if watch_poll is not None else settings.JOB_WATCH_POLL_SECONDS
+        self._queue = None
+        self._tasks = []
+        self._seq = itertools.count()
+        self._listeners = {}
+
+    async def start(self):
+        self._queue = asyncio.PriorityQueue()
+
+        # Recover jobs interrupted by a restart. RUNNING jobs with a live
+        # lease belong to a worker in another process and are left alone.
+        recovered = await self._enqueue_claimable()
+        if recovered:
+            log.info("Recovered %d unfinished jobs", recovered)
+
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self._worker_count)]
+        self._tasks.append(asyncio.create_task(self._sweep_expired_leases()))
+
+    async def _enqueue_claimable(self, expired_only: bool = False) -> int:
+        now = utcnow()
+        condition = _claimable(now)
+        if expired_only:
+            condition = (Job.status == RUNNING) & (Job.lease_expires_at < now)
+        async with AsyncSessionLocal() as db:
+            stmt = select(Job.id, Job.priority).where(condition).order_by(Job.created_at)
+            pending = (await db.execute(stmt)).all()
+        for job_id, priority in pending:
+            self._queue.put_nowait((priority, next(self._seq), job_id))
+        return len(pending)
+
+    async def _sweep_expired_leases(self):
+        # Duplicates in the queue are harmless: only one claim can win
+        while True:
+            await asyncio.sleep(self._lease)
+            try:
+                reclaimed = await self._enqueue_claimable(expired_only=True)
+            except Exception as e:
+                log.warning("Lease sweep failed: %s", e)
+                continue
+            if reclaimed:
+                jobs_reclaimed.inc(reclaimed)
+                log.info("Re-queued %d jobs with lapsed leases", reclaimed)
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def submit(self, kind: str, payload: dict, priority: int = PRIORITY_INTERACTIVE,
+                     audio: BinaryIO = None) -> str:
+        """Queues a job; `audio` is copied to disk in chunks and only its path is stored."""
+        if kind not in _handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = str(uuid.uuid4())
+        audio_path = None
+        if audio is not None:
+            audio_path = await asyncio.to_thread(_spool_audio, self._audio_dir, job_id, audio)
+        try:
+            async with AsyncSessionLocal() as db:
+                db.add(Job(
+                    id=job_id,
+                    kind=kind,
+                    priority=priority,
+                    status=QUEUED,
+                    progress="queued",
+                    payload=payload,
+                    audio_path=audio_path,
+                ))
+                await db.commit()
+        except Exception:
+            await asyncio.to_thread(_discard_audio, audio_path)
+            raise
+
+        self._queue.put_nowait((priority, next(self._seq), job_id))
+        jobs_submitted.inc()
+        return job_id
+
+    async def get(self, job_id: str):
+        async with AsyncSessionLocal() as db:
+            job = await db.get(Job, job_id)
+            return _snapshot(job) if job else None
+
+    async def watch(self, job_id: str):
+        """Yields a job snapshot on every change until it reaches a terminal state."""
+        listener = asyncio.Queue()
+        self._listeners.setdefault(job_id, set()).add(listener)
+        try:
+            last = None
+            while True:
+                snapshot = await self.get(job_id)
+                if snapshot is None:
+                    return
+                if snapshot != last:
+                    yield snapshot
+                    last = snapshot
+                if snapshot["status"] in TERMINAL_STATES:
+                    return
+                # Notifications only come from this process; the timeout
+                # re-reads the row so other workers' progress shows up too
+                try:
+                    await asyncio.wait_for(listener.get(), timeout=self._watch_poll)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            listeners = self._listeners.get(job_id)
+            if listeners is not None:
+                listeners.discard(listener)
+                if not listeners:
+                    del self._listeners[job_id]
+
+    async def _worker(self):
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                log.exception("Worker failed on job %s: %s", job_id, e)
+            finally:
+                self._queue.task_done()
+
+    async def _claim(self, job_id: str):
+        """
+        Atomically moves a claimable job to RUNNING under a fresh lease.
+        Returns the job, or None if another worker got there first.
+        """
+        now = utcnow()
+        async with AsyncSessionLocal() as db:
+            claimed = await db.execute(
+                update(Job)
+                .where(Job.id == job_id, _claimable(now))
+                .values(status=RUNNING, progress="started", lease_expires_at=now + timedelta(seconds=self._lease))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+            if claimed.rowcount != 1:
+                return None
+            return await db.get(Job, job_id)
+
+    async def _heartbeat(self, job_id: str):
+        while True:
+            await asyncio.sleep(self._lease / 3)
+            try:
+                async with AsyncSessionLocal() as db:
+                    await db.execute(
+                        update(Job)
+                        .where(Job.id == job_id, Job.status == RUNNING)
+                        .values(lease_expires_at=utcnow() + timedelta(seconds=self._lease))
+                    )
+                    await db.commit()
+            except Exception as e:
+                log.warning("Could not extend lease on job %s: %s", job_id, e)
+
+    async def _run(self, job_id: str):
+        job = await self._claim(job_id)
+        if job is None:
+            return
+        ctx = JobContext(self, job)
+        handler = _handlers.get(job.kind)
+        self._notify(job_id)
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        # Stage spans from the handler are attributed to the job kind, and
+        # its log records carry the job id as their correlation ID
+        _, trace_token = tracing.start_trace(f"job:{job.kind}")
+        bind_request_id(job_id)
+        try:
+            if handler is None:
+                raise ValueError(f"No handler registered for job kind: {job.kind}")
+            result = await handler(ctx)
+        except Exception as e:
+            jobs_failed.inc()
+            log.warning("Job %s (%s) failed: %s", job_id, job.kind, e)
+            await self._finish(
+                job, status=FAILED, progress="failed", error=getattr(e, "detail", None) or str(e),
+            )
+            return
+        finally:
+            heartbeat.cancel()
+            tracing.end_trace(trace_token)
+            job_run_seconds.observe(loop.time() - started)
+
+        jobs_succeeded.inc()
+        await self._finish(job, status=SUCCEEDED, progress="done", result=result)
+
+    async def _finish(self, job: Job, **values):
+        """Records the outcome and drops the job's audio, which is no longer needed."""
+        await self._update(job.id, audio=None, audio_path=None, lease_expires_at=None, **values)
+        await asyncio.to_thread(_discard_audio, job.audio_path)
+
+    async def _update(self, job_id: str, **values):
+        async with AsyncSessionLocal() as db:
+            await db.execute(update(Job).where(Job.id == job_id).values(**values))
+            await db.commit()
+        self._notify(job_id)
+
+    def _notify(self, job_id: str):
+        for listener in self._listeners.get(job_id, ()):
+            listener.put_nowait(None)
+
+
+job_queue = JobQueue(workers=settings.JOB_WORKERS)
@@ -0,0 +1,174 @@
+"""
+Lexicon-driven emotion scoring.
+Indicator phrases are loaded from emotion_lexicon.json and compiled once into
+a token trie per language, so every category is scored in a single pass over
+the transcript's tokens with word-boundary-aware matching. score() finds the
+places a phrase could start with plain substring searches, keeps those a
+compiled token-boundary pattern accepts and only tokenizes there, so text with
+no indicators is skipped at string-search speed.
+"""
+import json
+import re
+from itertools import islice
+from pathlib import Path
+
+LEXICON_PATH = Path(__file__).with_name("emotion_lexicon.json")
+DEFAULT_LANGUAGE = "English"
+
+# Words, with inner apostrophes and hyphens ("can't", "game-changing") but
+# not surrounding quotes
+TOKEN_PATTERN = re.compile(r"\w+(?:['’-]\w+)*")
+# Not inside a token: TOKEN_PATTERN would have carried on through either
+_TOKEN_BOUNDARY = r"(?<!\w)(?<!\w['’-])"
+_PHRASE_END = "$"
+
+
+def _literal(token: str) -> str:
+    return re.escape(token).replace("'", "['’]")
+
+
+def _compile_phrase_starts(first_tokens, elisions) -> re.Pattern:
+    """Matches (at a given position) wherever tokenize() would yield one of `first_tokens`."""
+    starts = [_TOKEN_BOUNDARY] + [f"(?<={_TOKEN_BOUNDARY}{_literal(e)})" for e in sorted(elisions)]
+    ordered = sorted(first_tokens, key=len, reverse=True)
+    words = "|".join(_literal(t) for t in ordered if not t.endswith("'"))
+    elided = "|".join(_literal(t) for t in ordered if t.endswith("'"))
+    ends = [rf"(?:{words})(?!\w)(?!['’-]\w)"] if words else []
+    if elided:
+        ends.append(rf"(?:{elided})")
+    return re.compile(rf"\b(?:{'|'.join(starts)})(?:{'|'.join(ends) or '(?!)'})", re.IGNORECASE)
+
+
+def tokenize(text: str, elisions=(), pos: int = 0):
+    """
+    Yields (token, start, end, joined) for each word in text. Tokens are
+    lowercased, offsets index the original text, and `joined` is True when
+    only whitespace separates the token from the previous one (phrases do not
+    match across punctuation). Elided prefixes such as French "l'" are split
+    off into their own token.
+    """
+    previous_end = None
+    for match in TOKEN_PATTERN.finditer(text, pos):
+        token = match.group(0).lower().replace("’", "'")
+        start, end = match.start(), match.end()
+        joined = previous_end is not None and text[previous_end:start].isspace()
+        previous_end = end
+        head, apostrophe, rest = token.partition("'")
+        if rest and head + apostrophe in elisions:
+            split = start + len(head) + 1
+            yield head + apostrophe, start, split, joined
+            token, start, joined = rest, split, True
+        yield token, start, end, joined
+
+
+class LexiconMatcher:
+    def __init__(self, lexicon: dict, elisions=()):
+        self.categories = list(lexicon)
+        self.elisions = frozenset(elisions)
+        self.max_phrase_tokens = 1
+        self._trie = {}
+        for category, phrases in lexicon.items():
+            for phrase in phrases:
+                tokens = [token for token, _, _, _ in self.tokenize(phrase)]
+                self.max_phrase_tokens = max(self.max_phrase_tokens, len(tokens))
+                node = self._trie
+                for token in tokens:
+                    node = node.setdefault(token, {})
+                node.setdefault(_PHRASE_END, []).append((category, phrase))
+        self._first_tokens = sorted(self._trie)
+        self._phrase_starts = _compile_phrase_starts(self._first_tokens, self.elisions)
+
+    def tokenize(self, text: str, pos: int = 0):
+        return tokenize(text, self.elisions, pos)
+
+    def match_tokens(self, tokens, start: int = 0, stop: int = None):
+        """
+        Yields (category, phrase, first_index, last_index) for every phrase
+        beginning in tokens[start:stop], given a list of tokenize() tuples.
+        """
+        for i in range(start, len(tokens) if stop is None else stop):
+            node = self._trie
+            for j in range(i, min(i + self.max_phrase_tokens, len(tokens))):
+                if j > i and not tokens[j][3]:
+                    break
+                node = node.get(tokens[j][0])
+                if node is None:
+                    break
+                for category, phrase in node.get(_PHRASE_END, ()):
+                    yield category, phrase, i, j
+
+    def score(self, text: str) -> dict:
+        """
+        Scores every category in one pass.
+        Returns {category: {"matches": distinct phrases found,
+        "occurrences": total hits, "positions": [(start, end, phrase), ...]}}.
+        """
+        scores = self.empty_scores(positions=True)
+        seen = set()
+        for start in self._phrase_start_offsets(text):
+            window = list(islice(self.tokenize(text, start), self.max_phrase_tokens))
+            self.accumulate(scores, seen, window, self.match_tokens(window, stop=1))
+        return scores
+
+    def _phrase_start_offsets(self, text: str) -> list:
+        folded = text.lower().replace("’", "'")
+        if len(folded) != len(text):
+            # Lowercasing moved offsets (e.g. "İ"); fall back to a regex scan
+            return [match.start() for match in self._phrase_starts.finditer(text)]
+        starts = set()
+        for token in self._first_tokens:
+            at = folded.find(token)
+            while at != -1:
+                if self._phrase_starts.match(text, at):
+                    starts.add(at)
+                at = folded.find(token, at + 1)
+        return sorted(starts)
+
+    def empty_scores(self, positions: bool = False) -> dict:
+        scores = {c: {"matches": 0, "occurrences": 0} for c in self.categories}
+        if positions:
+            for entry in scores.values():
+                entry["positions"] = []
+        return scores
+
+    @staticmethod
+    def accumulate(scores: dict, seen: set, tokens, matches):
+        """Adds matches into scores; `seen` tracks distinct (category, phrase) pairs across calls."""
+        for category, phrase, first, last in matches:
+            entry = scores[category]
+            entry["occurrences"] += 1
+            if "positions" in entry:
+                entry["positions"].append((tokens[first][1], tokens[last][2], phrase))
+            if (category, phrase) not in seen:
+                seen.add((category, phrase))
+                entry["matches"] += 1
+
+
+def _load():
+    with open(LEXICON_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    elisions = config.get("elisions", {})
+    matchers = {
+        language: LexiconMatcher(lexicon, elisions.get(language, ()))
+        for language, lexicon in config["lexicons"].items()
+    }
+    return config["categories"], config["default_emotion"], matchers
+
+
+EMOTION_RULES, DEFAULT_EMOTION, _MATCHERS = _load()
+
+
+def get_matcher(language: str = None) -> LexiconMatcher:
+    return _MATCHERS.get(language or DEFAULT_LANGUAGE, _MATCHERS[DEFAULT_LANGUAGE])
+
+
+def classify_emotion(scores: dict, avg_sentence_length: float) -> str:
+    """
+    Picks the first category (in lexicon order) with enough indicator matches,
+    or with one match in short, punchy sentences.
+    """
+    for rule in EMOTION_RULES:
+        matches = scores.get(rule["name"], {}).get("matches", 0)
+        if matches >= rule["min_matches"] or (matches >= 1 and avg_sentence_length < rule["short_sentence_length"]):
+            return rule["name"]
+    return DEFAULT_EMOTION
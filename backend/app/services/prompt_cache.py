@@ -0,0 +1,138 @@
+"""
+Gemini context caching for large static prompt prefixes.
+PromptCache keeps one cached-content handle per (model, prompt key, prompt
+version), extends its TTL shortly before it lapses, and returns None whenever
+caching is unavailable so callers fall back to sending the prompt inline.
+The backend that talks to Gemini is injectable, so a fake can stand in for it.
+"""
+import asyncio
+import datetime
+import hashlib
+import time
+
+from app.core import metrics
+from app.core.cache import SingleFlight
+from app.core.config import settings
+from app.core.log import get_logger
+from app.services import gemini
+
+log = get_logger("prompt_cache")
+
+cache_hits = metrics.counter("prompt_cache_hits_total", "Generations that reused a cached prompt prefix")
+cache_creates = metrics.counter("prompt_cache_creates_total", "Cached-content handles created")
+cache_refreshes = metrics.counter("prompt_cache_refreshes_total", "Cached-content TTL extensions")
+cache_errors = metrics.counter("prompt_cache_errors_total", "Create/refresh failures (prompt sent inline)")
+
+
+class GeminiCacheBackend:
+    """Measures, creates and extends cached content through the Gemini SDK."""
+
+    async def count_tokens(self, model_name: str, prompt: str) -> int:
+        return await gemini.count_tokens(model_name, prompt)
+
+    def create(self, model_name: str, prompt: str, ttl: float):
+        name = model_name if model_name.startswith("models/") else f"models/{model_name}"
+        return gemini.sdk().caching.CachedContent.create(
+            model=name,
+            contents=[prompt],
+            ttl=datetime.timedelta(seconds=ttl),
+        )
+
+    def refresh(self, handle, ttl: float):
+        handle.update(ttl=datetime.timedelta(seconds=ttl))
+        return handle
+
+
+class PromptCache:
+    def __init__(self, backend, ttl: float, refresh_margin: float, retry_after: float,
+                 min_tokens: int = 0, clock=time.monotonic):
+        self.backend = backend
+        self.ttl = ttl
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self.min_tokens = min_tokens
+        self._clock = clock
+        # key -> (handle or None, expires_at); a None handle is a failure held until expires_at
+        self._entries = {}
+        # key -> prompt size in tokens, counted once by the model's tokenizer
+        self._sizes = {}
+        self._calls = SingleFlight()
+
+    def _key(self, model_name: str, prompt_key, prompt: str) -> tuple:
+        digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        return (model_name, prompt_key, digest)
+
+    async def get(self, model_name: str, prompt_key, prompt: str):
+        """Returns a live cached-content handle for `prompt`, or None to send it inline."""
+        key = self._key(model_name, prompt_key, prompt)
+        if self._sizes.get(key, self.min_tokens) < self.min_tokens:
+            return None
+        entry = self._entries.get(key)
+        now = self._clock()
+        if entry is not None:
+            handle, expires_at = entry
+            if handle is None and now < expires_at:
+                return None
+            if handle is not None and now < expires_at - self.refresh_margin:
+                cache_hits.inc()
+                return handle
+        handle = await self._calls.do(key, lambda: self._renew(key, model_name, prompt, entry))
+        if handle is not None:
+            cache_hits.inc()
+        return handle
+
+    async def _renew(self, key, model_name: str, prompt: str, entry):
+        stale = entry[0] if entry is not None and self._clock() < entry[1] else None
+        try:
+            if self.min_tokens and key not in self._sizes:
+                # The API rejects caches under the model's minimum, and a
+                # chars/4 estimate is too rough to decide near the boundary
+                self._sizes[key] = await self.backend.count_tokens(model_name, prompt)
+                if self._sizes[key] < self.min_tokens:
+                    log.info("Prompt %s is %d tokens, under the %d-token caching minimum for %s; sending it inline",
+                             key[1], self._sizes[key], self.min_tokens, model_name)
+                    return None
+            if stale is not None:
+                handle = await asyncio.to_thread(self.backend.refresh, stale, self.ttl)
+                cache_refreshes.inc()
+            else:
+                handle = await asyncio.to_thread(self.backend.create, model_name, prompt, self.ttl)
+                cache_creates.inc()
+        except Exception as e:
+            cache_errors.inc()
+            log.warning("Could not cache prompt %s for %s: %s", key[1], model_name, e)
+            self._entries[key] = (None, self._clock() + self.retry_after)
+            return None
+        self._entries[key] = (handle, self._clock() + self.ttl)
+        return handle
+
+    def invalidate(self, model_name: str, prompt_key, prompt: str):
+        """Forgets a handle the API rejected; the next call sends the prompt inline and retries later."""
+        self._entries[self._key(model_name, prompt_key, prompt)] = (None, self._clock() + self.retry_after)
+
+
+prompt_cache = PromptCache(
+    GeminiCacheBackend(),
+    ttl=settings.PROMPT_CACHE_TTL,
+    refresh_margin=settings.PROMPT_CACHE_REFRESH_MARGIN,
+    retry_after=settings.PROMPT_CACHE_RETRY_AFTER,
+    min_tokens=settings.PROMPT_CACHE_MIN_TOKENS,
+)
+
+
+async def generate_with_cached_prefix(model_name: str, prompt_key, prefix: str, parts: list, **kwargs):
+    """
+    gemini.generate_content([prefix, *parts]) that reuses a cached copy of
+    `prefix` when one is available, falling back to the inline prompt if the
+    cached handle is rejected.
+    """
+    handle = await prompt_cache.get(model_name, prompt_key, prefix) if settings.PROMPT_CACHE_ENABLED else None
+    if handle is not None:
+        try:
+            return await gemini.generate_content(model_name, parts, cached_content=handle, **kwargs)
+        except gemini.retryable_errors():
+            raise
+        except Exception as e:
+            log.warning("Cached prompt %s rejected, sending inline: %s", prompt_key, e)
+            prompt_cache.invalidate(model_name, prompt_key, prefix)
+    return await gemini.generate_content(model_name, [prefix, *parts], **kwargs)
@@ -0,0 +1,81 @@
+"""
+Background sweep that flips PENDING decisions to DUE once their review_date
+passes. One set-based UPDATE per run; between runs the task sleeps until the
+earliest pending review_date (or until woken by a newly sealed decision).
+"""
+import asyncio
+
+from sqlalchemy import select, update, func
+
+from app.core import metrics
+from app.core.clock import as_utc, utcnow
+from app.core.log import get_logger
+from app.database import AsyncSessionLocal
+from app.models import Decision
+
+decisions_marked_due = metrics.counter("decisions_marked_due_total", "Decisions flipped from PENDING to DUE")
+log = get_logger("scheduler")
+
+
+class DueSweeper:
+    def __init__(self, max_sleep: float = 3600.0, min_sleep: float = 1.0, error_backoff: float = 60.0):
+        self._max_sleep = max_sleep
+        self._min_sleep = min_sleep
+        self._error_backoff = error_backoff
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def notify(self):
+        """Re-plans the next wakeup, e.g. after a decision with an earlier review_date is sealed."""
+        self._wakeup.set()
+
+    async def sweep(self) -> int:
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                update(Decision)
+                .where(Decision.status == "PENDING", Decision.review_date <= utcnow())
+                .values(status="DUE")
+            )
+            await db.commit()
+        if result.rowcount:
+            decisions_marked_due.inc(result.rowcount)
+        return result.rowcount
+
+    async def next_due(self):
+        async with AsyncSessionLocal() as db:
+            stmt = select(func.min(Decision.review_date)).where(Decision.status == "PENDING")
+            return (await db.execute(stmt)).scalar()
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                swept = await self.sweep()
+                if swept:
+                    log.info("Marked %d decisions DUE", swept)
+                next_due = await self.next_due()
+                if next_due is None:
+                    delay = self._max_sleep
+                else:
+                    delay = (as_utc(next_due) - utcnow()).total_seconds()
+                    delay = min(max(delay, self._min_sleep), self._max_sleep)
+            except Exception as e:
+                log.exception("DUE sweep failed: %s", e)
+                delay = self._error_backoff
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+
+due_sweeper = DueSweeper()
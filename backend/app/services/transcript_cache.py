@@ -0,0 +1,77 @@
+"""
+Content-addressed transcript cache.
+Keyed by the SHA-256 of the uploaded audio plus the requested language, with
+an in-process LRU tier in front of a persistent tier in the app database.
+"""
+import time
+
+from sqlalchemy import select, delete
+
+from app.core import metrics
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.log import get_logger
+from app.database import AsyncSessionLocal
+from app.models import TranscriptCacheEntry
+
+memory_hits = metrics.counter("transcript_cache_memory_hits_total", "Transcripts served from the in-process tier")
+db_hits = metrics.counter("transcript_cache_db_hits_total", "Transcripts served from the database tier")
+misses = metrics.counter("transcript_cache_misses_total", "Transcript lookups that required Gemini")
+errors = metrics.counter("transcript_cache_errors_total", "Database tier failures (treated as misses)")
+log = get_logger("transcript_cache")
+
+_memory = LRUCache(max_entries=settings.TRANSCRIPT_CACHE_MEMORY_ENTRIES, ttl=settings.TRANSCRIPT_CACHE_TTL)
+
+
+def cache_key(sha256: str, language: str = None) -> str:
+    return f"{sha256}:{(language or '').strip().lower()}"
+
+
+async def get_cached_transcript(key: str):
+    transcript = _memory.get(key)
+    if transcript is not None:
+        memory_hits.inc()
+        return transcript
+
+    try:
+        async with AsyncSessionLocal() as db:
+            entry = await db.get(TranscriptCacheEntry, key)
+            now = time.time()
+            if entry is not None and entry.expires_at > now:
+                entry.last_used_at = now
+                await db.commit()
+                _memory.set(key, entry.transcript, ttl=entry.expires_at - now)
+                db_hits.inc()
+                return entry.transcript
+    except Exception as e:
+        errors.inc()
+        log.warning("Lookup failed: %s", e)
+
+    misses.inc()
+    return None
+
+
+async def store_transcript(key: str, transcript: str):
+    _memory.set(key, transcript)
+
+    try:
+        now = time.time()
+        async with AsyncSessionLocal() as db:
+            await db.merge(TranscriptCacheEntry(
+                key=key,
+                transcript=transcript,
+                expires_at=now + settings.TRANSCRIPT_CACHE_TTL,
+                last_used_at=now,
+            ))
+            # Evict expired rows, then anything beyond the size cap (least recently used first)
+            await db.execute(delete(TranscriptCacheEntry).where(TranscriptCacheEntry.expires_at <= now))
+            keep = (
+                select(TranscriptCacheEntry.key)
+                .order_by(TranscriptCacheEntry.last_used_at.desc())
+                .limit(settings.TRANSCRIPT_CACHE_MAX_ROWS)
+            )
+            await db.execute(delete(TranscriptCacheEntry).where(TranscriptCacheEntry.key.not_in(keep)))
+            await db.commit()
+    except Exception as e:
+        errors.inc()
+        log.warning("Store failed: %s", e)
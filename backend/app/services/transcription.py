@@ -1,55 +1,225 @@
-import google.generativeai as genai
 import asyncio
+import functools
+import mimetypes
+import re
+from concurrent.futures import ThreadPoolExecutor
+from app.core import metrics, tracing
 from app.core.config import settings
+from app.core.log import get_logger
+from app.services import gemini
+from app.services import audio as audio_tools
+from app.services.ingestion import AudioUpload, audio_from_bytes
+from app.services.file_watcher import FileReadinessWatcher
+from app.services.transcript_cache import cache_key, get_cached_transcript, store_transcript
 
-genai.configure(api_key=settings.GEMINI_API_KEY)
+TRANSCRIPTION_MODEL = "gemini-2.5-flash"
+# Output budget for a transcript: roughly 150 spoken words a minute
+TRANSCRIPT_TOKENS_PER_SECOND = 4
 
-async def transcribe_audio(file_path: str, language: str = None) -> str:
+log = get_logger("transcription")
+
+normalize_bytes_in = metrics.counter("audio_normalize_bytes_in_total", "Upload bytes before normalization")
+normalize_bytes_out = metrics.counter("audio_normalize_bytes_out_total", "Upload bytes after normalization")
+normalize_failures = metrics.counter("audio_normalize_failures_total", "Normalizations that failed (original uploaded)")
+
+# The Gemini file API (upload/get/delete) has no async variant, so those calls
+# run on a bounded thread pool instead of blocking the event loop.
+_file_api_executor = ThreadPoolExecutor(
+    max_workers=settings.GEMINI_FILE_API_THREADS,
+    thread_name_prefix="gemini-files",
+)
+
+async def _get_file(name: str):
+    return await _run_file_api(gemini.sdk().get_file, name)
+
+
+# One shared watcher polls all in-flight uploads until they become ACTIVE.
+file_watcher = FileReadinessWatcher(_get_file, timeout=settings.GEMINI_FILE_READY_TIMEOUT)
+
+# Caps the number of transcriptions in flight on this worker.
+_transcription_slots = asyncio.Semaphore(settings.TRANSCRIPTION_CONCURRENCY)
+
+# Each normalization is an ffmpeg process; cap how many run at once.
+_normalize_slots = asyncio.Semaphore(settings.AUDIO_NORMALIZE_CONCURRENCY)
+
+
+async def _run_file_api(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_file_api_executor, functools.partial(func, *args, **kwargs))
+
+
+async def transcribe_audio(audio: AudioUpload, language: str = None) -> str:
+    """
+    Transcribes an ingested audio upload using Gemini.
+    Identical audio in the same language is served from the transcript cache.
+    """
+    key = cache_key(audio.sha256, language)
+    cached = await get_cached_transcript(key)
+    if cached is not None:
+        log.debug("Cache hit")
+        return cached
+
+    if settings.LONG_AUDIO_ENABLED and audio.size >= settings.LONG_AUDIO_MIN_BYTES and audio_tools.ffmpeg_available():
+        transcript = await transcribe_long_audio(audio, language)
+    else:
+        transcript = await _transcribe_single(await normalize_upload(audio), language)
+
+    await store_transcript(key, transcript)
+    return transcript
+
+
+async def _transcribe_single(audio: AudioUpload, language: str = None) -> str:
+    async with _transcription_slots:
+        return await _transcribe(audio, language)
+
+
+async def transcribe_long_audio(audio: AudioUpload, language: str = None) -> str:
+    """
+    Long-audio mode: cuts the recording at silence boundaries into overlapping
+    segments, transcribes them concurrently (bounded by LONG_AUDIO_FANOUT) and
+    stitches the text back together, dropping words repeated in the overlaps.
     """
-    Transcribes audio file using Gemini.
+    data = audio.stream.read()
+    audio.stream.seek(0)
+    suffix = mimetypes.guess_extension(audio.mime_type) or ""
+
+    with audio_tools.spooled_to_disk(data, suffix) as path:
+        duration, silences = await audio_tools.detect_silences(path)
+        segments = audio_tools.plan_segments(
+            duration, silences,
+            target=settings.LONG_AUDIO_SEGMENT_SECONDS,
+            overlap=settings.LONG_AUDIO_OVERLAP_SECONDS,
+        )
+        if len(segments) < 2:
+            return await _transcribe_single(await normalize_upload(audio), language)
+
+        log.info("Long audio (%.0fs) split into %d segments", duration, len(segments))
+        fanout = asyncio.Semaphore(settings.LONG_AUDIO_FANOUT)
+
+        async def transcribe_segment(index, start, end):
+            async with fanout:
+                segment = await audio_tools.extract_segment(path, start, end)
+                name = f"{audio.filename or 'audio'}.part{index}.flac"
+                return await _transcribe_single(
+                    audio_from_bytes(segment, audio_tools.SEGMENT_MIME_TYPE, name), language
+                )
+
+        parts = await asyncio.gather(
+            *(transcribe_segment(i, start, end) for i, (start, end) in enumerate(segments))
+        )
+
+    return stitch_transcripts(parts)
+
+
+async def normalize_upload(audio: AudioUpload) -> AudioUpload:
+    """
+    Shrinks an upload to mono speech audio before it goes to Gemini when
+    AUDIO_NORMALIZE is on. Falls back to the original on any failure or if
+    the re-encode is not smaller.
+    """
+    if not settings.AUDIO_NORMALIZE or not audio_tools.ffmpeg_available():
+        return audio
+
+    audio.stream.seek(0)
+    data = audio.stream.read()
+    audio.stream.seek(0)
+    suffix = mimetypes.guess_extension(audio.mime_type) or ""
+    try:
+        async with _normalize_slots:
+            with tracing.span("normalize"), audio_tools.spooled_to_disk(data, suffix) as path:
+                normalized, mime_type = await audio_tools.normalize(
+                    path,
+                    codec=settings.AUDIO_NORMALIZE_CODEC,
+                    sample_rate=settings.AUDIO_NORMALIZE_SAMPLE_RATE,
+                    bitrate=settings.AUDIO_NORMALIZE_BITRATE,
+                    trim_silence=settings.AUDIO_NORMALIZE_TRIM_SILENCE,
+                )
+    except Exception as e:
+        normalize_failures.inc()
+        log.warning("Normalization failed, uploading original: %s", e)
+        return audio
+
+    normalize_bytes_in.inc(len(data))
+    if not normalized or len(normalized) >= len(data):
+        normalize_bytes_out.inc(len(data))
+        return audio
+    normalize_bytes_out.inc(len(normalized))
+    log.debug("Normalized %d -> %d bytes (%s)", len(data), len(normalized), mime_type)
+    return audio_from_bytes(normalized, mime_type, audio.filename)
+
+
+def _normalize_word(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def stitch_transcripts(parts: list, max_overlap_words: int = 40) -> str:
+    """
+    Joins segment transcripts, removing the longest run of words at the start
+    of each segment that repeats the end of the text before it.
     """
+    words = []
+    for part in parts:
+        incoming = part.split()
+        if words and incoming:
+            tail = [_normalize_word(w) for w in words[-max_overlap_words:]]
+            head = [_normalize_word(w) for w in incoming[:max_overlap_words]]
+            for size in range(min(len(tail), len(head)), 0, -1):
+                if tail[-size:] == head[:size]:
+                    incoming = incoming[size:]
+                    break
+        words.extend(incoming)
+    return " ".join(words)
+
+
+async def _transcribe(audio: AudioUpload, language: str = None) -> str:
     try:
-        print(f"DEBUG: [Transcription] Uploading file to Gemini: {file_path}")
-        # Upload the audio file
-        audio_file = genai.upload_file(file_path)
-        print(f"DEBUG: [Transcription] File uploaded. Initial state: {audio_file.state.name}")
+        log.debug("Uploading %d bytes (%s) to Gemini", audio.size, audio.mime_type)
+        # Upload the audio stream directly
+        with tracing.span("upload"):
+            audio_file = await _run_file_api(
+                gemini.sdk().upload_file,
+                audio.stream,
+                mime_type=audio.mime_type,
+                display_name=audio.filename,
+            )
+        log.debug("File uploaded. Initial state: %s", audio_file.state.name)
         
         # Wait for the file to be ready
-        max_attempts = 60
-        attempt = 0
-        while audio_file.state.name == "PROCESSING" and attempt < max_attempts:
-            print(f"DEBUG: [Transcription] File state: {audio_file.state.name}. Waiting... (Attempt {attempt+1})")
-            await asyncio.sleep(1)
-            audio_file = genai.get_file(audio_file.name)
-            attempt += 1
+        with tracing.span("wait_active"):
+            audio_file = await file_watcher.wait_until_active(audio_file)
             
         if audio_file.state.name == "FAILED":
-            print(f"DEBUG: [Transcription] Critical: Gemini Audio Processing FAILED")
+            log.error("Gemini audio processing FAILED")
             raise Exception("Gemini audio processing failed. The file format or content might be unsupported.")
 
         if audio_file.state.name != "ACTIVE":
-            print(f"DEBUG: [Transcription] Timeout: File stuck in {audio_file.state.name}")
+            log.error("Timeout: file stuck in %s", audio_file.state.name)
             raise Exception("Gemini processing timeout.")
 
-        print(f"DEBUG: [Transcription] Using gemini-2.5-flash...")
-        model = genai.GenerativeModel("gemini-2.5-flash")
+        log.debug("Using %s", TRANSCRIPTION_MODEL)
         
         prompt = "Transcribe this audio accurately. Return ONLY the transcription text, nothing else."
         if language:
             prompt = f"Transcribe this audio in {language}. Return ONLY the transcription text, nothing else."
         
-        print("DEBUG: [Transcription] Starting content generation (Sync)...")
-        # Using sync version as it's often more stable in certain environments
-        response = model.generate_content([prompt, audio_file])
-        print("DEBUG: [Transcription] Generation complete.")
+        # Long recordings cost more both ways: audio in and transcript out
+        expected_output = max(
+            gemini.DEFAULT_OUTPUT_TOKENS,
+            int(gemini.audio_seconds(audio_file) * TRANSCRIPT_TOKENS_PER_SECOND),
+        )
+        response = await gemini.generate_content(
+            TRANSCRIPTION_MODEL, [prompt, audio_file],
+            estimated_tokens=gemini.estimate_tokens([prompt, audio_file], expected_output),
+        )
+        log.debug("Generation complete")
         
         try:
-            genai.delete_file(audio_file.name)
+            await _run_file_api(gemini.sdk().delete_file, audio_file.name)
         except Exception as e:
-            print(f"DEBUG: [Transcription] Cleanup warning: {e}")
+            log.warning("Cleanup failed: %s", e)
             
         return response.text.strip()
         
     except Exception as e:
-        print(f"DEBUG: [Transcription] Error: {str(e)}")
+        log.error("Transcription failed: %s", e)
         raise e
@@ -1,24 +1,54 @@
+import asyncio
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
 from app.core.config import settings
+from app.core import metrics, tracing, log
+from app.services.ingestion import UploadSizeLimitMiddleware
 from contextlib import asynccontextmanager
-from app.database import engine, Base
+from app.database import engine
+from app.migrations import run_migrations, backfill_session_sections
 import app.models # Ensure models are registered
+from app.services.jobs import job_queue
+from app.services import analysis
+from app.services.scheduler import due_sweeper
+
+_background_tasks = set()
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Queue-backed structured logging; the writer thread is stopped on shutdown
+log.configure_logging()
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup: Initialize database
-    async with engine.begin() as conn:
-        await conn.run_sync(Base.metadata.create_all)
+    await run_migrations(engine)
+    # Online data conversion; runs alongside traffic instead of blocking boot
+    backfill = asyncio.create_task(backfill_session_sections())
+    _background_tasks.add(backfill)
+    backfill.add_done_callback(_background_tasks.discard)
+    await job_queue.start()
+    await due_sweeper.start()
     yield
-    # Shutdown (if needed)
+    # Shutdown
+    await due_sweeper.stop()
+    await job_queue.stop()
+    await asyncio.to_thread(analysis.shutdown_pool)
+    log.shutdown_logging()
 
 app = FastAPI(title=settings.PROJECT_NAME, version=settings.PROJECT_VERSION, lifespan=lifespan)
 
+# Reject oversized uploads while they stream in, before multipart spooling
+app.add_middleware(UploadSizeLimitMiddleware)
+
+# Per-request stage timings (inside CORS so preflights are not traced)
+app.add_middleware(tracing.TracingMiddleware)
+# Correlation ID for every log record of a request, echoed as X-Request-ID
+app.add_middleware(log.RequestIdMiddleware)
+
 # CORS config
 origins = [
     "http://localhost:5173",  # Vite default
@@ -32,6 +62,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Request-ID"],
 )
 
 @app.get("/")
@@ -42,5 +73,9 @@ def read_root():
 def health_check():
     return {"status": "ok"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.render_prometheus(), media_type="text/plain; version=0.0.4")
+
 from app.api.routes import router
 app.include_router(router, prefix="/api")
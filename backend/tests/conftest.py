@@ -0,0 +1,42 @@
+import os
+import tempfile
+
+# Settings are read at import time, so point the app at a throwaway database
+# (and away from any real Gemini key) before anything imports it.
+_tmpdir = tempfile.mkdtemp(prefix="ghostnote-tests-")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmpdir}/test.db"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["GEMINI_API_KEY"] = "test-key"
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import pytest
+
+from app.database import engine
+from app.migrations import run_migrations
+from app.services import gemini, generation, prompt_cache, transcript_cache
+
+from support import FakeGenAI, run
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema():
+    run(run_migrations(engine))
+
+
+@pytest.fixture(autouse=True)
+def fresh_caches():
+    transcript_cache._memory.clear()
+    generation._suite_cache.clear()
+    prompt_cache.prompt_cache._entries.clear()
+    prompt_cache.prompt_cache._sizes.clear()
+    yield
+
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    """Replaces the Gemini SDK with an in-process fake; returns it for inspection."""
+    fake = FakeGenAI()
+    monkeypatch.setattr(gemini, "_sdk", fake)
+    monkeypatch.setattr(gemini, "_models", {})
+    monkeypatch.setattr(gemini, "_schedulers", {})
+    return fake
@@ -0,0 +1,198 @@
+"""
+Test support: an in-process stand-in for the google.generativeai SDK and a
+runner for async test bodies.
+FakeGenAI is installed in place of app.services.gemini.sdk() by the
+`fake_genai` fixture. It mimics the surface the app uses (file API,
+GenerativeModel, types, caching) with configurable latency and records every
+call it serves. make_recording() synthesizes test audio with the ffmpeg CLI.
+"""
+import asyncio
+import itertools
+import subprocess
+import time
+from types import SimpleNamespace
+
+from app.database import engine, read_engine
+
+
+def run(coro):
+    """
+    Runs an async test body on a fresh event loop. Pooled DB connections are
+    disposed before the loop closes so none leak into the next test's loop.
+    """
+    async def main():
+        try:
+            return await coro
+        finally:
+            await engine.dispose()
+            if read_engine is not engine:
+                await read_engine.dispose()
+    return asyncio.run(main())
+
+
+def make_recording(seconds: float, fmt: str = "flac", pause_every: float = 10.0, pause: float = 0.6,
+                   sample_rate: int = 16000, channels: int = 1, lead_in: float = 0.0) -> bytes:
+    """
+    Speech-like test audio from ffmpeg's lavfi sources: pink noise with a
+    silent gap of `pause` seconds every `pause_every` seconds (what the
+    silence detector cuts at), and optionally `lead_in` seconds of silence.
+    """
+    gate = f"volume='if(lt(t,{lead_in})+gte(mod(t-{lead_in},{pause_every}),{pause_every - pause}),0,1)':eval=frame"
+    return subprocess.run(
+        [
+            "ffmpeg", "-hide_banner", "-nostdin", "-loglevel", "error",
+            "-f", "lavfi", "-i", f"anoisesrc=d={seconds}:c=pink:r={sample_rate}:a=0.3",
+            "-af", gate, "-ac", str(channels), "-f", fmt, "pipe:1",
+        ],
+        check=True, capture_output=True,
+    ).stdout
+
+
+class FakeState:
+    def __init__(self, name: str):
+        self.name = name
+
+
+class FakeFile:
+    def __init__(self, name: str, mime_type: str, size_bytes: int, ready_at: float):
+        self.name = name
+        self.mime_type = mime_type
+        self.size_bytes = size_bytes
+        self.ready_at = ready_at
+
+    @property
+    def state(self) -> FakeState:
+        return FakeState("ACTIVE" if time.monotonic() >= self.ready_at else "PROCESSING")
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt_tokens: int = 0, response_tokens: int = 0):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens, candidates_token_count=response_tokens
+        )
+
+
+class FakeChunk:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeStreamResponse(FakeResponse):
+    """Async-iterable response, like generate_content_async(..., stream=True)."""
+
+    def __init__(self, text: str, chunk_size: int = 16):
+        super().__init__(text)
+        self._chunks = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)]
+
+    async def __aiter__(self):
+        for chunk in self._chunks:
+            await asyncio.sleep(0)
+            yield FakeChunk(chunk)
+
+
+class FakeModel:
+    def __init__(self, sdk, model_name: str, cached_content=None):
+        self._sdk = sdk
+        self.model_name = model_name
+        self.cached_content = cached_content
+
+    async def generate_content_async(self, contents, **kwargs):
+        return await self._sdk._generate(self, contents, kwargs)
+
+    async def count_tokens_async(self, contents):
+        parts = contents if isinstance(contents, (list, tuple)) else [contents]
+        return SimpleNamespace(total_tokens=sum(self._sdk.count_tokens(p) for p in parts))
+
+
+class FakeCachedContent:
+    def __init__(self, name: str, model: str, contents, ttl):
+        self.name = name
+        self.model = model
+        self.contents = contents
+        self.ttl = ttl
+
+    def update(self, ttl=None):
+        self.ttl = ttl
+
+
+class FakeGenAI:
+    """
+    responder(model_name, contents, kwargs) -> str produces the response text;
+    it may be a coroutine function and may raise to simulate API errors.
+    Latencies are in seconds: upload is a blocking sleep (the real call runs on
+    a thread pool), processing is how long a file stays PROCESSING, and
+    generate is an async sleep per generate_content_async call.
+    """
+
+    def __init__(self, responder=None, upload_latency: float = 0.0,
+                 processing_latency: float = 0.0, generate_latency: float = 0.0):
+        self.responder = responder or (lambda model_name, contents, kwargs: "fake transcript")
+        self.upload_latency = upload_latency
+        self.processing_latency = processing_latency
+        self.generate_latency = generate_latency
+        self.uploads = []
+        self.deleted = []
+        self.generate_calls = []
+        self.cache_creates = []
+        self._ids = itertools.count(1)
+        self._files = {}
+        self.types = SimpleNamespace(GenerationConfig=lambda **kwargs: dict(kwargs))
+        self.caching = SimpleNamespace(CachedContent=SimpleNamespace(create=self._create_cache))
+        sdk = self
+
+        class GenerativeModel(FakeModel):
+            def __init__(self, model_name: str):
+                super().__init__(sdk, model_name)
+
+            @classmethod
+            def from_cached_content(cls, cached_content):
+                return FakeModel(sdk, cached_content.model, cached_content)
+
+        self.GenerativeModel = GenerativeModel
+
+    @staticmethod
+    def count_tokens(part) -> int:
+        return len(part.split()) if isinstance(part, str) else 258
+
+    # File API (blocking, like the real SDK)
+
+    def upload_file(self, stream, mime_type=None, display_name=None):
+        data = stream.read()
+        time.sleep(self.upload_latency)
+        name = f"files/fake-{next(self._ids)}"
+        file = FakeFile(name, mime_type, len(data), time.monotonic() + self.processing_latency)
+        self._files[name] = file
+        self.uploads.append(SimpleNamespace(name=name, mime_type=mime_type, data=data, display_name=display_name))
+        return file
+
+    def get_file(self, name):
+        return self._files[name]
+
+    def delete_file(self, name):
+        self.deleted.append(name)
+        self._files.pop(name, None)
+
+    # Models
+
+    async def _generate(self, model: FakeModel, contents, kwargs):
+        call = SimpleNamespace(
+            model_name=model.model_name,
+            contents=contents,
+            kwargs=kwargs,
+            cached_content=model.cached_content,
+        )
+        self.generate_calls.append(call)
+        if self.generate_latency:
+            await asyncio.sleep(self.generate_latency)
+        text = self.responder(model.model_name, contents, kwargs)
+        if asyncio.iscoroutine(text):
+            text = await text
+        if kwargs.get("stream"):
+            return FakeStreamResponse(text)
+        return FakeResponse(text)
+
+    def _create_cache(self, model, contents=None, ttl=None, **kwargs):
+        cache = FakeCachedContent(f"cachedContents/fake-{next(self._ids)}", model.split("/", 1)[-1], contents, ttl)
+        self.cache_creates.append(cache)
+        return cache
@@ -0,0 +1,108 @@
+import random
+import re
+import time
+
+import pytest
+
+from app.services import analysis
+from app.services.analysis import FILLER_WORDS, analyze_batch, analyze_text, remove_filler_words
+
+# Ordinary words, some of which contain fillers ("also", "justice", "sorting")
+# so word boundaries are exercised too.
+PLAIN_WORDS = [
+    "the", "board", "quarter", "revenue", "also", "justice", "sorting", "likely",
+    "ready", "kindness", "meaning", "summit", "strategy", "decision", "okayed",
+    "we", "I", "it", "growth", "wellness", "rights", "you", "knowledge",
+]
+PUNCTUATION = ["", "", "", ",", ".", "?", "!", " -", "'s"]
+
+
+def _remove_filler_words_reference(text: str) -> str:
+    """The original implementation: one compiled pattern per filler, applied in turn."""
+    result = text
+    for filler in FILLER_WORDS:
+        pattern = re.compile(r'\b' + re.escape(filler) + r'\b', re.IGNORECASE)
+        result = pattern.sub('', result)
+    return ' '.join(result.split())
+
+
+def _random_transcript(rng: random.Random, words: int) -> str:
+    vocabulary = PLAIN_WORDS + FILLER_WORDS
+    tokens = []
+    for _ in range(words):
+        word = rng.choice(vocabulary)
+        if rng.random() < 0.2:
+            word = word.upper() if rng.random() < 0.5 else word.capitalize()
+        tokens.append(word + rng.choice(PUNCTUATION))
+    return (rng.choice([" ", "  ", "\n"])).join(tokens)
+
+
+def test_matches_the_original_implementation_on_random_transcripts():
+    rng = random.Random(2011)
+    for _ in range(2000):
+        text = _random_transcript(rng, rng.randint(0, 60))
+        assert remove_filler_words(text) == _remove_filler_words_reference(text), text
+
+
+def test_multi_word_fillers_are_removed_whole():
+    assert remove_filler_words("It was kind of, you know, sort of fine") == "It was , , fine"
+
+
+def test_offsets_point_at_the_removed_words():
+    text = "Um, we basically shipped it"
+    cleaned, removed = remove_filler_words(text, return_offsets=True)
+
+    assert cleaned == ", we shipped it"
+    assert [text[start:end] for start, end, _ in removed] == ["Um", "basically"]
+
+
+def test_language_specific_fillers():
+    assert remove_filler_words("Euh, du coup on signe", "French") == ", on signe"
+    # Unknown languages fall back to English
+    assert remove_filler_words("um ok", "Klingon") == "ok"
+
+
+def test_batches_share_one_spawned_pool_until_shutdown():
+    rng = random.Random(13)
+    texts = [_random_transcript(rng, 20) for _ in range(40)]
+    try:
+        first = list(analyze_batch(texts, workers=2, chunk_size=8))
+        pool = analysis.get_pool()
+        second = list(analyze_batch(texts, "French", workers=2, chunk_size=8))
+
+        assert first == [analyze_text(text) for text in texts]
+        assert second == [analyze_text(text, "French") for text in texts]
+        assert analysis.get_pool() is pool
+        assert pool._mp_context.get_start_method() == "spawn"
+    finally:
+        analysis.shutdown_pool()
+    assert analysis._pool is None
+
+
+def test_abandoned_batch_cancels_its_queued_chunks():
+    texts = [f"text {i}" for i in range(64)]
+    try:
+        stream = analyze_batch(texts, workers=2, chunk_size=4)
+        next(stream)
+        stream.close()
+        # The pool stays usable for the next batch
+        assert list(analyze_batch(texts, workers=2, chunk_size=4)) == [analyze_text(t) for t in texts]
+    finally:
+        analysis.shutdown_pool()
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("words", [1_000, 100_000, 1_000_000])
+def test_benchmark_filler_removal(words):
+    text = _random_transcript(random.Random(words), words)
+    timings = {}
+    for name, fn in (("per-filler", _remove_filler_words_reference), ("single-pass", remove_filler_words)):
+        started = time.perf_counter()
+        fn(text)
+        timings[name] = time.perf_counter() - started
+
+    print(
+        f"\nremove_filler_words on {words:>9,} words: "
+        f"per-filler={timings['per-filler'] * 1000:.1f}ms single-pass={timings['single-pass'] * 1000:.1f}ms "
+        f"speedup={timings['per-filler'] / timings['single-pass']:.1f}x"
+    )
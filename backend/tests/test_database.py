@@ -0,0 +1,108 @@
+import asyncio
+import tempfile
+import time
+import uuid
+
+import pytest
+from sqlalchemy import func, select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import database
+from app.database import Base
+from app.models import Draft
+
+from support import run
+
+
+def _tuned_engines(url: str):
+    """The engines app.database builds for SQLite: a tuned writer and a query_only reader."""
+    writer = create_async_engine(url, **database._engine_options(url))
+    reader = create_async_engine(url, **database._engine_options(url))
+    database._configure_sqlite(writer)
+    database._configure_sqlite(reader, read_only=True)
+    return writer, reader
+
+
+def test_sqlite_connections_use_wal_and_a_busy_timeout():
+    url = f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/pragmas.db"
+
+    async def main():
+        writer, reader = _tuned_engines(url)
+        try:
+            async with writer.connect() as conn:
+                mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+                timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+            async with reader.connect() as conn:
+                query_only = (await conn.execute(text("PRAGMA query_only"))).scalar()
+            return mode, timeout, query_only
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    mode, timeout, query_only = run(main())
+
+    assert mode == "wal"
+    assert timeout == database.settings.SQLITE_BUSY_TIMEOUT_MS
+    assert query_only == 1
+
+
+async def _mixed_load(writer, reader, writers: int, readers: int, seconds: float) -> dict:
+    async with writer.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    counts = {"writes": 0, "reads": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+
+    async def write_loop():
+        while time.perf_counter() < deadline:
+            try:
+                async with writer.begin() as conn:
+                    await conn.execute(Draft.__table__.insert().values(
+                        id=str(uuid.uuid4()), title="t", tag="💡 IDEA", transcript="x" * 500,
+                    ))
+                counts["writes"] += 1
+            except Exception:
+                counts["errors"] += 1
+
+    async def read_loop():
+        while time.perf_counter() < deadline:
+            try:
+                async with reader.connect() as conn:
+                    await conn.execute(select(func.count()).select_from(Draft))
+                counts["reads"] += 1
+            except Exception:
+                counts["errors"] += 1
+
+    await asyncio.gather(*(write_loop() for _ in range(writers)), *(read_loop() for _ in range(readers)))
+    return counts
+
+
+@pytest.mark.benchmark
+def test_benchmark_concurrent_writes_before_and_after_tuning():
+    seconds, writers, readers = 3.0, 8, 8
+    results = {}
+
+    async def before():
+        # The original setup: one default engine for reads and writes, rollback journal
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/before.db")
+        try:
+            return await _mixed_load(engine, engine, writers, readers, seconds)
+        finally:
+            await engine.dispose()
+
+    async def after():
+        writer, reader = _tuned_engines(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/after.db")
+        try:
+            return await _mixed_load(writer, reader, writers, readers, seconds)
+        finally:
+            await writer.dispose()
+            await reader.dispose()
+
+    results["before"] = run(before())
+    results["after"] = run(after())
+
+    for name, counts in results.items():
+        print(
+            f"\n{name:>6}: {counts['writes'] / seconds:,.0f} writes/s, "
+            f"{counts['reads'] / seconds:,.0f} reads/s, {counts['errors']} errors "
+            f"({writers} writers + {readers} readers for {seconds:.0f}s)"
+        )
@@ -0,0 +1,68 @@
+import asyncio
+import uuid
+from datetime import timedelta
+
+import httpx
+
+from app.core.clock import as_utc, utcnow
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import Decision
+from app.services.scheduler import DueSweeper
+
+from support import run
+
+
+async def _insert_decision(review_in: timedelta) -> str:
+    decision_id = str(uuid.uuid4())
+    async with AsyncSessionLocal() as db:
+        db.add(Decision(
+            id=decision_id, original_session_id="s", original_transcript="t",
+            prediction="p", review_date=utcnow() + review_in, status="PENDING",
+        ))
+        await db.commit()
+    return decision_id
+
+
+async def _status(decision_id: str) -> str:
+    async with AsyncSessionLocal() as db:
+        return (await db.get(Decision, decision_id)).status
+
+
+def test_history_reports_overdue_pending_decisions_as_due():
+    async def main():
+        overdue = await _insert_decision(timedelta(hours=-1))
+        later = await _insert_decision(timedelta(days=3))
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/decisions/history", params={"limit": 100})
+        return overdue, later, response
+
+    overdue, later, response = run(main())
+
+    assert response.status_code == 200
+    statuses = {d["id"]: d["status"] for d in response.json()}
+    assert statuses[overdue] == "DUE"
+    assert statuses[later] == "PENDING"
+
+
+def test_sweeper_plans_with_timezone_aware_review_dates(monkeypatch):
+    # Postgres (asyncpg) returns aware datetimes where SQLite returns naive ones
+    original = DueSweeper.next_due
+
+    async def aware_next_due(self):
+        return as_utc(await original(self))
+
+    monkeypatch.setattr(DueSweeper, "next_due", aware_next_due)
+
+    async def main():
+        decision_id = await _insert_decision(timedelta(seconds=0.3))
+        sweeper = DueSweeper(min_sleep=0.05, error_backoff=60)
+        await sweeper.start()
+        try:
+            await asyncio.sleep(0.8)
+            return await _status(decision_id)
+        finally:
+            await sweeper.stop()
+
+    assert run(main()) == "DUE"
@@ -0,0 +1,145 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.file_watcher import FileReadinessWatcher
+
+
+class FakeClock:
+    """Time only moves when the watcher sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, delay: float):
+        self.now += delay
+        await asyncio.sleep(0)
+
+
+class StubFiles:
+    """get_file stub: each file reports PROCESSING until its ready time, then its final state."""
+
+    def __init__(self, clock: FakeClock):
+        self.clock = clock
+        self.files = {}  # name -> (ready_at, final state)
+        self.checks = []  # (time, name)
+
+    def add(self, name: str, ready_at: float = float("inf"), final: str = "ACTIVE"):
+        self.files[name] = (ready_at, final)
+        return self._file(name, "PROCESSING")
+
+    @staticmethod
+    def _file(name: str, state: str):
+        return SimpleNamespace(name=name, state=SimpleNamespace(name=state))
+
+    async def get_file(self, name: str):
+        self.checks.append((self.clock.now, name))
+        ready_at, final = self.files[name]
+        if isinstance(final, Exception):
+            raise final
+        return self._file(name, final if self.clock.now >= ready_at else "PROCESSING")
+
+    def times(self, name: str) -> list:
+        return [round(at, 6) for at, checked in self.checks if checked == name]
+
+
+def _watcher(rand=lambda: 0.5, **kwargs):
+    clock = FakeClock()
+    files = StubFiles(clock)
+    watcher = FileReadinessWatcher(files.get_file, clock=clock, sleep=clock.sleep, rand=rand, **kwargs)
+    return watcher, files
+
+
+def test_backoff_doubles_up_to_the_cap():
+    # rand=0.5 puts the jitter factor at exactly 1
+    watcher, files = _watcher(initial_delay=0.25, max_delay=4.0, multiplier=2.0)
+    upload = files.add("a", ready_at=10)
+
+    result = asyncio.run(watcher.wait_until_active(upload))
+
+    assert result.state.name == "ACTIVE"
+    # Delays 0.25, 0.5, 1, 2, 4, 4
+    assert files.times("a") == [0.25, 0.75, 1.75, 3.75, 7.75, 11.75]
+    assert watcher.in_flight == 0
+
+
+@pytest.mark.parametrize("rand, first_check", [(0.0, 0.8), (1.0, 1.2)])
+def test_jitter_spreads_checks_by_the_configured_fraction(rand, first_check):
+    watcher, files = _watcher(rand=lambda: rand, initial_delay=1.0, jitter=0.2)
+    upload = files.add("a", ready_at=0)
+
+    asyncio.run(watcher.wait_until_active(upload))
+
+    assert files.times("a") == [first_check]
+
+
+def test_concurrent_waiters_share_checks_and_due_files_are_batched():
+    watcher, files = _watcher(initial_delay=0.25)
+    a = files.add("a", ready_at=1)
+    b = files.add("b", ready_at=3)
+
+    async def main():
+        return await asyncio.gather(
+            watcher.wait_until_active(a),
+            watcher.wait_until_active(a),
+            watcher.wait_until_active(b),
+        )
+
+    first, second, other = asyncio.run(main())
+
+    assert first is second and first.state.name == "ACTIVE"
+    assert other.state.name == "ACTIVE"
+    # One poll of "a" per check despite two waiters, in the same batch as "b"
+    assert files.times("a") == [0.25, 0.75, 1.75]
+    assert files.times("b")[:3] == files.times("a")
+    assert files.times("b") == [0.25, 0.75, 1.75, 3.75]
+
+
+def test_still_processing_at_the_deadline_returns_the_processing_file():
+    watcher, files = _watcher(initial_delay=1.0, max_delay=2.0, timeout=5.0)
+    upload = files.add("slow")
+
+    result = asyncio.run(watcher.wait_until_active(upload))
+
+    assert result.state.name == "PROCESSING"
+    # Checks at 1, 3, 5; the one at 5 is past the deadline
+    assert files.times("slow") == [1.0, 3.0, 5.0]
+    assert watcher.in_flight == 0
+
+
+def test_failed_processing_is_returned_to_the_caller():
+    watcher, files = _watcher(initial_delay=0.25)
+    upload = files.add("bad", ready_at=0.5, final="FAILED")
+
+    result = asyncio.run(watcher.wait_until_active(upload))
+
+    assert result.state.name == "FAILED"
+    assert files.times("bad") == [0.25, 0.75]
+
+
+def test_get_file_errors_reach_every_waiter():
+    watcher, files = _watcher()
+    upload = files.add("broken", final=RuntimeError("quota"))
+
+    async def main():
+        return await asyncio.gather(
+            watcher.wait_until_active(upload), watcher.wait_until_active(upload), return_exceptions=True,
+        )
+
+    results = asyncio.run(main())
+
+    assert [type(r) for r in results] == [RuntimeError, RuntimeError]
+    assert len(files.checks) == 1
+    assert watcher.in_flight == 0
+
+
+def test_files_that_are_not_processing_return_without_polling():
+    watcher, files = _watcher()
+    ready = StubFiles._file("ready", "ACTIVE")
+
+    assert asyncio.run(watcher.wait_until_active(ready)) is ready
+    assert files.checks == []
@@ -0,0 +1,59 @@
+import asyncio
+
+import pytest
+
+from app.services import gemini
+from app.services.gemini import ModelScheduler, estimate_tokens
+
+from support import FakeFile, run
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _exhaust(bucket):
+    bucket.time_until(0)  # refill up to the current clock first
+    bucket.take(bucket.tokens)
+
+
+async def _release_order(aging: float) -> list:
+    """An expensive call queues at t=0 and a cheap one at t=10s while quota is exhausted."""
+    clock = FakeClock()
+    scheduler = ModelScheduler("test-model", rpm=60_000, tpm=10_000_000, aging=aging, clock=clock)
+    _exhaust(scheduler._requests)
+    released = []
+
+    async def call(name, cost):
+        await scheduler.acquire(cost)
+        released.append(name)
+
+    expensive = asyncio.create_task(call("expensive", 5000))
+    await asyncio.sleep(0.01)
+    clock.now = 10.0
+    _exhaust(scheduler._requests)
+    cheap = asyncio.create_task(call("cheap", 10))
+    await asyncio.sleep(0.01)
+    # Quota comes back; both are admissible and go in rank order
+    clock.now = 100.0
+    await asyncio.gather(expensive, cheap)
+    return released
+
+
+@pytest.mark.parametrize("aging, first", [(0, "cheap"), (1000, "expensive")])
+def test_waiting_expensive_call_outranks_newer_cheap_ones_once_aged(aging, first):
+    assert run(_release_order(aging))[0] == first
+
+
+def test_audio_estimate_scales_with_recording_length():
+    minute = FakeFile("a", "audio/webm", size_bytes=gemini.AUDIO_BYTES_PER_SECOND * 60, ready_at=0)
+    hour = FakeFile("b", "audio/webm", size_bytes=gemini.AUDIO_BYTES_PER_SECOND * 3600, ready_at=0)
+
+    assert estimate_tokens([minute], expected_output=0) == 60 * gemini.AUDIO_TOKENS_PER_SECOND
+    assert estimate_tokens([hour], expected_output=0) == 3600 * gemini.AUDIO_TOKENS_PER_SECOND
+    # Parts with no size to go on keep the flat guess
+    assert estimate_tokens([object()], expected_output=0) == gemini.NON_TEXT_PART_TOKENS
@@ -0,0 +1,157 @@
+import asyncio
+import itertools
+import json
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services.generation import (
+    SUITE_SECTIONS,
+    build_section_prompt,
+    generate_executive_suite,
+    stream_executive_suite,
+)
+
+from support import run
+
+
+def _numbered_suites(fake_genai):
+    counter = itertools.count(1)
+    fake_genai.responder = lambda model_name, contents, kwargs: json.dumps({"free_tier": {"n": next(counter)}})
+
+
+def test_identical_concurrent_requests_share_one_generation(fake_genai):
+    _numbered_suites(fake_genai)
+    fake_genai.generate_latency = 0.1
+
+    async def main():
+        return await asyncio.gather(*(generate_executive_suite("same text", "English") for _ in range(3)))
+
+    results = run(main())
+
+    assert len(fake_genai.generate_calls) == 1
+    assert all(result == results[0] for result in results)
+
+
+def test_concurrent_variation_requests_each_get_their_own_generation(fake_genai):
+    _numbered_suites(fake_genai)
+    fake_genai.generate_latency = 0.1
+
+    async def main():
+        return await asyncio.gather(
+            *(generate_executive_suite("same text", "English", variation=True) for _ in range(3))
+        )
+
+    results = run(main())
+
+    assert len(fake_genai.generate_calls) == 3
+    assert sorted(result["free_tier"]["n"] for result in results) == [1, 2, 3]
+
+
+def test_variation_results_are_not_cached(fake_genai):
+    _numbered_suites(fake_genai)
+
+    run(generate_executive_suite("text", "English", variation=True))
+    run(generate_executive_suite("text", "English", variation=True))
+    run(generate_executive_suite("text", "English"))
+    run(generate_executive_suite("text", "English"))
+
+    assert len(fake_genai.generate_calls) == 3
+
+
+def _collect(agen):
+    async def main():
+        return [event async for event in agen]
+    return run(main())
+
+
+def test_stream_yields_sections_then_complete_and_fills_the_cache(fake_genai):
+    suite = {"free_tier": {"a": 1}, "pro_tier": {"b": [1, 2]}, "social_content": {"c": "x"}}
+    fake_genai.responder = lambda model_name, contents, kwargs: json.dumps(suite)
+
+    events = _collect(stream_executive_suite("text", "English"))
+    again = run(generate_executive_suite("text", "English"))
+
+    assert [payload[0] for event, payload in events if event == "section"] == list(suite)
+    assert events[-1] == ("complete", suite)
+    assert again == suite
+    assert len(fake_genai.generate_calls) == 1
+
+
+def test_stream_honours_fanout_mode(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_MODE", "fanout")
+    counter = itertools.count(1)
+    fake_genai.responder = lambda model_name, contents, kwargs: json.dumps({f"s{next(counter)}": True})
+
+    events = _collect(stream_executive_suite("text", "English"))
+    cached = run(generate_executive_suite("text", "English"))
+
+    sections = [payload for event, payload in events if event == "section"]
+    complete = events[-1][1]
+    assert not any(call.kwargs.get("stream") for call in fake_genai.generate_calls)
+    assert len(fake_genai.generate_calls) == len(SUITE_SECTIONS)
+    assert sorted(name for name, _ in sections) == sorted(complete)
+    assert sum(len(value) for value in complete.values()) == len(SUITE_SECTIONS)
+    # The fan-out cache entry holds the fan-out result
+    assert cached == complete
+    assert len(fake_genai.generate_calls) == len(SUITE_SECTIONS)
+
+
+def _section_of(contents, language="English"):
+    for name in SUITE_SECTIONS:
+        if contents[0] == build_section_prompt(name, language):
+            return name
+    return None
+
+
+def test_failing_section_is_retried_on_its_own(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "GENERATION_MODE", "fanout")
+    flaky = list(SUITE_SECTIONS)[1]
+    failures = []
+
+    def responder(model_name, contents, kwargs):
+        section = _section_of(contents)
+        if section == flaky and not failures:
+            failures.append(section)
+            return "not json"
+        return json.dumps({section: True})
+
+    fake_genai.responder = responder
+
+    suite = run(generate_executive_suite("text", "English"))
+
+    calls = [_section_of(call.contents) for call in fake_genai.generate_calls]
+    assert calls.count(flaky) == 2
+    assert all(calls.count(name) == 1 for name in SUITE_SECTIONS if name != flaky)
+    assert suite[SUITE_SECTIONS[flaky]["target"]][flaky] is True
+
+
+@pytest.mark.benchmark
+def test_benchmark_monolithic_vs_fanout_wall_clock(fake_genai, monkeypatch):
+    # Simulated model: a fixed time to first token plus time proportional to
+    # how many sections the prompt asks for.
+    first_token, per_section = 0.3, 0.4
+
+    async def responder(model_name, contents, kwargs):
+        section = _section_of(contents)
+        if section is None:
+            await asyncio.sleep(first_token + per_section * len(SUITE_SECTIONS))
+            return json.dumps({name: True for name in SUITE_SECTIONS})
+        await asyncio.sleep(first_token + per_section)
+        return json.dumps({section: True})
+
+    fake_genai.responder = responder
+    timings = {}
+    for mode in ("monolithic", "fanout"):
+        monkeypatch.setattr(settings, "GENERATION_MODE", mode)
+        started = time.perf_counter()
+        run(generate_executive_suite(f"benchmark {mode}", "English"))
+        timings[mode] = time.perf_counter() - started
+
+    print(
+        f"\nExecutive Suite wall clock ({len(SUITE_SECTIONS)} sections): "
+        f"monolithic={timings['monolithic']:.2f}s fanout={timings['fanout']:.2f}s "
+        f"speedup={timings['monolithic'] / timings['fanout']:.1f}x"
+    )
+    assert timings["fanout"] < timings["monolithic"]
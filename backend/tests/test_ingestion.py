@@ -0,0 +1,78 @@
+import httpx
+
+from app.core.config import settings
+from app.main import app
+from app.services import ingestion
+
+from support import run
+
+LIMIT = 64 * 1024
+
+
+async def _post(**kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.post("/api/transmute", **kwargs)
+
+
+def test_oversized_content_length_is_rejected_before_the_body_is_read(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", LIMIT)
+    sent = []
+
+    async def body():
+        for _ in range(64):
+            sent.append(1)
+            yield b"x" * 8192
+
+    size = 64 * 8192
+    response = run(_post(content=body(), headers={
+        "content-type": "multipart/form-data; boundary=abc",
+        "content-length": str(size),
+    }))
+
+    assert response.status_code == 413
+    assert len(sent) <= 1
+    assert fake_genai.uploads == []
+
+
+def test_chunked_body_is_cut_off_once_it_crosses_the_limit(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", LIMIT)
+    sent = []
+
+    async def body():
+        yield (
+            b"--abc\r\n"
+            b'Content-Disposition: form-data; name="file"; filename="note.webm"\r\n'
+            b"Content-Type: audio/webm\r\n\r\n"
+        )
+        for _ in range(1000):
+            sent.append(1)
+            yield b"x" * 8192
+
+    response = run(_post(content=body(), headers={"content-type": "multipart/form-data; boundary=abc"}))
+
+    assert response.status_code == 413
+    limit_chunks = (LIMIT + ingestion.MULTIPART_OVERHEAD_BYTES) // 8192
+    assert len(sent) <= limit_chunks + 2
+    assert fake_genai.uploads == []
+
+
+def test_upload_within_limit_is_transcribed(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", LIMIT)
+
+    response = run(_post(files={"file": ("note.webm", b"a" * 1000, "audio/webm")}))
+
+    assert response.status_code == 200
+    assert response.json() == {"text": "fake transcript"}
+    assert fake_genai.uploads[0].data == b"a" * 1000
+
+
+def test_file_part_over_the_cap_is_rejected_by_ingest(fake_genai, monkeypatch):
+    # Small enough to pass the body limit (which allows multipart overhead),
+    # but the audio itself is over MAX_UPLOAD_BYTES.
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", LIMIT)
+
+    response = run(_post(files={"file": ("note.webm", b"a" * (LIMIT + 10), "audio/webm")}))
+
+    assert response.status_code == 413
+    assert fake_genai.uploads == []
@@ -0,0 +1,178 @@
+import asyncio
+import io
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from sqlalchemy import update
+
+from app.api import routes
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import Job
+from app.services.jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, JobQueue, job_handler
+
+from support import run
+
+_hold = {}
+
+
+@job_handler("test-hold")
+async def _hold_handler(ctx):
+    await asyncio.sleep(_hold.get(ctx.job_id, 0))
+    return {"ok": True}
+
+
+async def _insert(status=QUEUED, lease_in: float = None, kind="test-hold", payload=None) -> str:
+    job_id = str(uuid.uuid4())
+    lease = datetime.now(timezone.utc) + timedelta(seconds=lease_in) if lease_in is not None else None
+    async with AsyncSessionLocal() as db:
+        db.add(Job(id=job_id, kind=kind, priority=1, status=status, payload=payload or {}, lease_expires_at=lease))
+        await db.commit()
+    return job_id
+
+
+async def _row(job_id: str) -> Job:
+    async with AsyncSessionLocal() as db:
+        return await db.get(Job, job_id)
+
+
+def _queued_ids(queue: JobQueue) -> set:
+    return {job_id for _, _, job_id in queue._queue._queue}
+
+
+def test_only_one_of_two_workers_claims_a_job():
+    async def main():
+        job_id = await _insert()
+        first, second = JobQueue(workers=0), JobQueue(workers=0)
+        return await asyncio.gather(first._claim(job_id), second._claim(job_id))
+
+    claims = run(main())
+
+    assert sum(job is not None for job in claims) == 1
+
+
+def test_start_leaves_live_leases_alone_and_recovers_lapsed_ones():
+    async def main():
+        live = await _insert(RUNNING, lease_in=60)
+        lapsed = await _insert(RUNNING, lease_in=-1)
+        queued = await _insert()
+        queue = JobQueue(workers=0)
+        await queue.start()
+        await queue.stop()
+        return live, lapsed, queued, _queued_ids(queue)
+
+    live, lapsed, queued, recovered = run(main())
+
+    assert lapsed in recovered and queued in recovered
+    assert live not in recovered
+
+
+def test_heartbeat_keeps_a_long_job_from_being_claimed_twice():
+    async def main():
+        job_id = await _insert()
+        _hold[job_id] = 0.6
+        owner, rival = JobQueue(workers=0, lease=0.2), JobQueue(workers=0, lease=0.2)
+        running = asyncio.create_task(owner._run(job_id))
+        steals = []
+        for _ in range(5):
+            await asyncio.sleep(0.1)
+            steals.append(await rival._claim(job_id))
+        await running
+        return steals, await owner.get(job_id)
+
+    steals, snapshot = run(main())
+
+    assert steals == [None] * 5
+    assert snapshot["status"] == SUCCEEDED
+
+
+def test_watch_sees_changes_made_outside_this_process():
+    async def main():
+        job_id = await _insert()
+        queue = JobQueue(workers=0, watch_poll=0.05)
+
+        async def other_process_finishes_it():
+            await asyncio.sleep(0.1)
+            # No _notify: only the watcher's re-poll can see this
+            async with AsyncSessionLocal() as db:
+                await db.execute(update(Job).where(Job.id == job_id).values(status=SUCCEEDED, progress="done"))
+                await db.commit()
+
+        writer = asyncio.create_task(other_process_finishes_it())
+        snapshots = await asyncio.wait_for(_collect(queue.watch(job_id)), timeout=2)
+        await writer
+        return snapshots
+
+    snapshots = run(main())
+
+    assert [s["status"] for s in snapshots] == [QUEUED, SUCCEEDED]
+
+
+async def _collect(agen):
+    return [item async for item in agen]
+
+
+def test_uploaded_audio_is_spooled_to_disk_and_removed_when_the_job_ends(fake_genai):
+    audio_dir = tempfile.mkdtemp()
+
+    async def main():
+        queue = JobQueue(workers=0, audio_dir=audio_dir)
+        await queue.start()
+        try:
+            job_id = await queue.submit("transmute", {
+                "mime_type": "audio/webm", "filename": "note.webm", "size": 5000, "sha256": "abc",
+            }, audio=io.BytesIO(b"a" * 5000))
+            queued = await _row(job_id)
+            on_disk = open(queued.audio_path, "rb").read()
+            await queue._run(job_id)
+            return queued, on_disk, await _row(job_id)
+        finally:
+            await queue.stop()
+
+    queued, on_disk, finished = run(main())
+
+    assert queued.audio is None
+    assert os.path.dirname(queued.audio_path) == audio_dir and on_disk == b"a" * 5000
+    assert fake_genai.uploads[0].data == b"a" * 5000
+    assert finished.status == SUCCEEDED and finished.result == {"text": "fake transcript"}
+    assert finished.audio_path is None and os.listdir(audio_dir) == []
+
+
+def test_job_endpoint_queues_a_reference_not_the_upload(monkeypatch):
+    audio_dir = tempfile.mkdtemp()
+
+    async def main():
+        queue = JobQueue(workers=0, audio_dir=audio_dir)
+        await queue.start()
+        monkeypatch.setattr(routes, "job_queue", queue)
+        try:
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.post(
+                    "/api/jobs/transmute", files={"file": ("note.webm", b"b" * 1000, "audio/webm")},
+                )
+            return await _row(response.json()["job_id"])
+        finally:
+            await queue.stop()
+
+    job = run(main())
+
+    assert job.audio is None
+    assert os.path.dirname(job.audio_path) == audio_dir
+    assert open(job.audio_path, "rb").read() == b"b" * 1000
+    assert job.payload["size"] == 1000 and job.payload["mime_type"] == "audio/webm"
+
+
+def test_audit_job_for_a_missing_decision_fails_with_an_error():
+    async def main():
+        job_id = await _insert(kind="audit", payload={"decision_id": "missing", "mime_type": "audio/webm"})
+        await JobQueue(workers=0)._run(job_id)
+        return await _row(job_id)
+
+    job = run(main())
+
+    assert job.status == FAILED
+    assert job.error == "Decision not found"
@@ -0,0 +1,161 @@
+import json
+import random
+import time
+
+import pytest
+
+from app.services.analysis import IncrementalAnalyzer, analyze_emotion_from_text, analyze_text
+from app.services.lexicon import LEXICON_PATH, get_matcher
+
+with open(LEXICON_PATH, encoding="utf-8") as f:
+    LEXICONS = json.load(f)["lexicons"]
+
+ENGLISH = get_matcher("English")
+FRENCH = get_matcher("French")
+
+
+def _found(matcher, text) -> dict:
+    scores = matcher.score(text)
+    return {category: sorted(phrase for _, _, phrase in entry["positions"]) for category, entry in scores.items()}
+
+
+def _score_every_token(matcher, text) -> dict:
+    """score() without the regex skip: the trie walked from every token."""
+    tokens = list(matcher.tokenize(text))
+    scores = matcher.empty_scores(positions=True)
+    matcher.accumulate(scores, set(), tokens, matcher.match_tokens(tokens))
+    return scores
+
+
+# (language, text, {category: phrases that must be found, in sorted order})
+CORPUS = [
+    # Substrings of longer words are not indicators
+    ("English", "She dropped a glove in the snow.", {"angry": [], "excited": []}),
+    ("English", "Nevertheless, the plan holds.", {"angry": [], "excited": []}),
+    ("English", "Lovely weather; the issuer signed.", {"angry": [], "excited": []}),
+    ("English", "I love it but never again.", {"angry": ["never"], "excited": ["love"]}),
+    # Multi-word phrases, including apostrophes and hyphens
+    ("English", "I'm sick of this and I can't believe it.", {"angry": ["can't believe", "sick of"], "excited": []}),
+    ("English", "I can’t wait for this game-changing launch", {"angry": [], "excited": ["can't wait", "game-changing"]}),
+    ("English", "sick, of course", {"angry": [], "excited": []}),
+    ("English", "STOP. Enough!", {"angry": ["enough", "stop"], "excited": []}),
+    ("English", "Call it 'love' or \"vision\"", {"angry": [], "excited": ["love", "vision"]}),
+    # French, with accents
+    ("French", "J'en ai marre, c'est inacceptable.", {"angry": ["inacceptable", "marre"], "excited": []}),
+    ("French", "Ce n'est pas croyable, vraiment.", {"angry": ["pas croyable"], "excited": []}),
+    ("French", "Une percée révolutionnaire pour l'avenir", {"angry": [], "excited": ["avenir", "percée", "révolutionnaire"]}),
+    ("French", "Les problèmes de toujours", {"angry": ["toujours"], "excited": []}),
+    ("French", "J'adore l'opportunité, c'est génial", {"angry": [], "excited": ["adore", "génial", "opportunité"]}),
+]
+
+
+@pytest.mark.parametrize("language, text, expected", CORPUS)
+def test_corpus(language, text, expected):
+    assert _found(get_matcher(language), text) == expected
+    assert get_matcher(language).score(text) == _score_every_token(get_matcher(language), text)
+
+
+@pytest.mark.parametrize("language", ["English", "French"])
+def test_regex_skip_agrees_with_walking_every_token(language):
+    matcher = get_matcher(language)
+    rng = random.Random(language)
+    pieces = [phrase for phrases in LEXICONS[language].values() for phrase in phrases]
+    pieces += ["glove", "nevertheless", "l'", "qu'", "'", "-", ",", ".", "’", "the", "équipe", "d'"]
+    for _ in range(500):
+        words = [rng.choice(pieces) for _ in range(rng.randint(0, 30))]
+        text = "".join(
+            (word.upper() if rng.random() < 0.1 else word) + rng.choice(["", " ", " ", "  ", "\n", ", "])
+            for word in words
+        )
+        assert matcher.score(text) == _score_every_token(matcher, text), text
+
+
+def test_positions_index_the_original_text():
+    text = "Honestly, I CAN'T believe how AMAZING this is"
+    scores = ENGLISH.score(text)
+
+    spans = [(text[start:end], phrase) for start, end, phrase in scores["angry"]["positions"] + scores["excited"]["positions"]]
+    assert spans == [("CAN'T believe", "can't believe"), ("AMAZING", "amazing")]
+
+
+@pytest.mark.parametrize("language, text, expected", CORPUS)
+def test_live_analyzer_agrees_with_analyze_text_on_the_corpus(language, text, expected):
+    whole = {
+        category: {"matches": entry["matches"], "occurrences": entry["occurrences"]}
+        for category, entry in get_matcher(language).score(text).items()
+    }
+    for size in range(1, 6):
+        analyzer = IncrementalAnalyzer(language)
+        for i in range(0, len(text), size):
+            analyzer.feed(text[i:i + size])
+        assert analyzer.finish() == analyze_text(text, language), size
+        assert analyzer._scores == whole, size
+
+
+def test_repeated_phrase_counts_once_as_a_match():
+    scores = ENGLISH.score("terrible, terrible, terrible")
+
+    assert scores["angry"]["matches"] == 1
+    assert scores["angry"]["occurrences"] == 3
+
+
+@pytest.mark.parametrize("text, language, emotion", [
+    ("The glove and the nevertheless clause were reviewed in detail by the whole team today.", "English", "calm"),
+    ("This is wrong and it is a problem for the whole team and every single one of us here.", "English", "angry"),
+    ("Imagine the future we can build together with this opportunity over the next decade.", "English", "excited"),
+    ("C'est faux et c'est un problème pour toute l'équipe et pour chacun d'entre nous.", "French", "angry"),
+    ("Unknown languages fall back to English so this issue is a problem for everyone today.", "Klingon", "angry"),
+])
+def test_classification(text, language, emotion):
+    assert analyze_emotion_from_text(text, language) == emotion
+
+
+def _substring_counts(text: str) -> tuple:
+    """The original substring scan the matcher replaced."""
+    text_lower = text.lower()
+    angry = sum(1 for indicator in ENGLISH_INDICATORS["angry"] if indicator in text_lower)
+    excited = sum(1 for indicator in ENGLISH_INDICATORS["excited"] if indicator in text_lower)
+    return angry, excited
+
+
+ENGLISH_INDICATORS = {
+    "angry": [
+        "stop", "enough", "tired of", "sick of", "frustrated", "annoying",
+        "wrong", "problem", "issue", "terrible", "awful", "hate", "never",
+        "always", "stupid", "ridiculous", "unacceptable", "can't believe"
+    ],
+    "excited": [
+        "amazing", "incredible", "fantastic", "can't wait", "love",
+        "excited", "opportunity", "future", "imagine", "vision",
+        "breakthrough", "revolutionary", "game-changing", "transform"
+    ],
+}
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("words", [1_000, 100_000, 1_000_000])
+def test_benchmark_lexicon_scoring(words):
+    # Transcript-like text: about 2% of words are indicators
+    rng = random.Random(words)
+    plain = (
+        "the board met this quarter and we reviewed revenue growth, hiring plans and the product roadmap. "
+        "nevertheless the team agreed to keep the glove factory deal on hold until the audit is done."
+    ).split()
+    indicators = ENGLISH_INDICATORS["angry"] + ENGLISH_INDICATORS["excited"]
+    text = " ".join(rng.choice(indicators) if rng.random() < 0.02 else rng.choice(plain) for _ in range(words))
+
+    timings = {}
+    for name, fn in (
+        ("substring", _substring_counts),
+        ("every-token", lambda t: _score_every_token(ENGLISH, t)),
+        ("lexicon", ENGLISH.score),
+    ):
+        started = time.perf_counter()
+        fn(text)
+        timings[name] = time.perf_counter() - started
+
+    # The substring scan stops at the first hit per indicator and records
+    # nothing else; the matcher finds every whole-word occurrence and its position.
+    print(f"\nemotion scoring on {words:>9,} words: " + " ".join(
+        f"{name}={seconds * 1000:.1f}ms" for name, seconds in timings.items()
+    ))
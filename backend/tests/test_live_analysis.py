@@ -0,0 +1,27 @@
+from starlette.testclient import TestClient
+
+from app.main import app
+from app.services.analysis import analyze_text
+
+
+def test_malformed_frames_get_an_error_and_the_session_continues():
+    client = TestClient(app)
+    with client.websocket_connect("/api/analyze/live") as ws:
+        ws.send_text("not json")
+        assert ws.receive_json() == {"type": "error", "detail": "Frame is not valid JSON"}
+        ws.send_text('["a list"]')
+        assert ws.receive_json() == {"type": "error", "detail": "Frame must be a JSON object"}
+        ws.send_json({"chunk": 42})
+        assert ws.receive_json() == {"type": "error", "detail": "chunk must be a string"}
+        ws.send_bytes(b'{"chunk": "x"}')
+        assert ws.receive_json() == {"type": "error", "detail": "Frames must be text"}
+
+        ws.send_json({"chunk": "This is amazing. "})
+        assert ws.receive_json()["type"] == "update"
+        ws.send_json({"chunk": "I love the vision."})
+        ws.receive_json()
+        ws.send_json({"final": True})
+        assert ws.receive_json() == {
+            "type": "final",
+            "analysis": analyze_text("This is amazing. I love the vision."),
+        }
@@ -0,0 +1,98 @@
+import asyncio
+import io
+import json
+import logging
+import time
+
+import httpx
+import pytest
+
+from app.core import log
+from app.core.config import settings
+from app.main import app
+
+from support import run
+
+
+class SlowSink(io.StringIO):
+    """A log destination that blocks on every write, like a backed-up stdout pipe."""
+
+    def __init__(self, delay: float):
+        super().__init__()
+        self.delay = delay
+
+    def write(self, text):
+        time.sleep(self.delay)
+        return super().write(text)
+
+
+@pytest.fixture
+def debug_logging(monkeypatch):
+    """DEBUG for every request; the app's normal logging is restored afterwards."""
+    monkeypatch.setattr(settings, "LOG_LEVEL", "DEBUG")
+    monkeypatch.setattr(settings, "LOG_DEBUG_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(settings, "LOG_FORMAT", "json")
+    log.shutdown_logging()
+    yield
+    log.shutdown_logging()
+    monkeypatch.undo()
+    log.configure_logging()
+
+
+async def _transmute(client, i: int):
+    files = {"file": (f"n{i}.webm", i.to_bytes(4, "big") * 64, "audio/webm")}
+    return await client.post("/api/transmute", files=files, headers={"X-Request-ID": f"req-{i}"})
+
+
+def test_records_carry_the_request_id(fake_genai, debug_logging):
+    sink = io.StringIO()
+    log.configure_logging(sink)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await _transmute(client, 1)
+
+    response = run(main())
+    log.shutdown_logging()
+
+    assert response.headers["X-Request-ID"] == "req-1"
+    records = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert records and all(r["request_id"] == "req-1" for r in records)
+
+
+@pytest.mark.benchmark
+def test_benchmark_throughput_with_debug_logging_to_a_slow_sink(fake_genai, debug_logging):
+    requests, concurrency, write_delay = 200, 16, 0.002
+
+    async def load() -> float:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            slots = asyncio.Semaphore(concurrency)
+
+            async def one(i):
+                async with slots:
+                    assert (await _transmute(client, i)).status_code == 200
+
+            started = time.perf_counter()
+            await asyncio.gather(*(one(i) for i in range(requests)))
+            return time.perf_counter() - started
+
+    # Before: records formatted and written on the request's own thread
+    root = logging.getLogger(log.ROOT_LOGGER)
+    blocking = logging.StreamHandler(SlowSink(write_delay))
+    blocking.setFormatter(log.JsonFormatter())
+    blocking.addFilter(log.ContextFilter())
+    root.handlers[:] = [blocking]
+    root.setLevel(logging.DEBUG)
+    before = run(load())
+
+    # After: the queue handler, with the writer thread draining to the same sink
+    log.configure_logging(SlowSink(write_delay))
+    after = run(load())
+    log.shutdown_logging()
+
+    print(
+        f"\n{requests} /api/transmute requests, DEBUG logs to a sink taking {write_delay * 1000:.0f}ms per write: "
+        f"blocking handler {requests / before:.0f} req/s, queue handler {requests / after:.0f} req/s"
+    )
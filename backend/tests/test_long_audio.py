@@ -0,0 +1,109 @@
+import asyncio
+import re
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import audio as audio_tools
+from app.services.ingestion import audio_from_bytes
+from app.services.transcription import stitch_transcripts, transcribe_audio
+
+from support import make_recording, run
+
+needs_ffmpeg = pytest.mark.skipif(not audio_tools.ffmpeg_available(), reason="ffmpeg is not installed")
+
+
+def _covers(segments, duration):
+    assert segments[0][0] == 0.0 and segments[-1][1] == duration
+    assert all(later[0] <= earlier[1] for earlier, later in zip(segments, segments[1:]))
+
+
+def test_short_recording_is_one_segment():
+    assert audio_tools.plan_segments(150, [], target=120, overlap=2) == [(0.0, 150)]
+
+
+def test_cuts_snap_to_the_nearest_silence_within_a_quarter_segment():
+    silences = [(50.0, 51.0), (113.0, 115.0), (127.0, 128.0), (300.0, 301.0)]
+
+    segments = audio_tools.plan_segments(400, silences, target=120, overlap=2)
+
+    # 114 is the silence nearest the ideal 120. The next ideal point (234) has
+    # no silence within 30s, so the cut stays there, and the 166s that remain
+    # are under 1.5 segments, so they are not split again.
+    assert segments == [(0.0, 116.0), (112.0, 236.0), (232.0, 400)]
+    _covers(segments, 400)
+
+
+def test_without_silences_segments_are_target_length_and_overlap():
+    segments = audio_tools.plan_segments(600, [], target=120, overlap=3)
+
+    assert segments == [(0.0, 123.0), (117.0, 243.0), (237.0, 363.0), (357.0, 483.0), (477.0, 600)]
+    _covers(segments, 600)
+
+
+def test_stitch_drops_words_repeated_across_the_overlap():
+    parts = ["We met the board today and", "And agreed on the plan. Next,", "next, we hire."]
+
+    assert stitch_transcripts(parts) == "We met the board today and agreed on the plan. Next, we hire."
+
+
+def test_stitch_keeps_parts_without_overlap_and_skips_empty_ones():
+    assert stitch_transcripts(["one two", "", "three four"]) == "one two three four"
+    assert stitch_transcripts(["", "one"]) == "one"
+
+
+def test_stitch_only_looks_back_max_overlap_words():
+    assert stitch_transcripts(["a b c", "b c d"], max_overlap_words=1) == "a b c b c d"
+
+
+def _part_index(display_name):
+    match = re.search(r"\.part(\d+)\.flac$", display_name or "")
+    return int(match.group(1)) if match else None
+
+
+@needs_ffmpeg
+def test_long_recording_is_split_transcribed_and_stitched(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "LONG_AUDIO_MIN_BYTES", 0)
+    monkeypatch.setattr(settings, "LONG_AUDIO_SEGMENT_SECONDS", 20)
+    words = ["alpha", "beta", "gamma", "delta", "epsilon"]
+
+    def responder(model_name, contents, kwargs):
+        upload = next(u for u in fake_genai.uploads if u.name == contents[1].name)
+        index = _part_index(upload.display_name)
+        return f"{words[index]} {words[index + 1]}"
+
+    fake_genai.responder = responder
+    recording = audio_from_bytes(make_recording(60), "audio/flac", "long.flac")
+
+    transcript = run(transcribe_audio(recording, "English"))
+
+    assert len(fake_genai.uploads) == 3
+    assert all(u.mime_type == audio_tools.SEGMENT_MIME_TYPE for u in fake_genai.uploads)
+    assert transcript == "alpha beta gamma delta"
+
+
+@pytest.mark.benchmark
+@needs_ffmpeg
+@pytest.mark.parametrize("segments", [1, 2, 4, 8])
+def test_benchmark_long_audio_speedup_by_segment_count(fake_genai, monkeypatch, segments):
+    # Simulated model: 0.3s to first token plus 10ms per second of audio,
+    # with the audio's length read off the uploaded FLAC's size
+    seconds = 240
+    data = make_recording(seconds)
+    bytes_per_second = len(data) / seconds
+
+    async def responder(model_name, contents, kwargs):
+        await asyncio.sleep(0.3 + 0.01 * contents[1].size_bytes / bytes_per_second)
+        return "words"
+
+    fake_genai.responder = responder
+    monkeypatch.setattr(settings, "LONG_AUDIO_MIN_BYTES", 0)
+    monkeypatch.setattr(settings, "LONG_AUDIO_SEGMENT_SECONDS", seconds / segments)
+    monkeypatch.setattr(settings, "LONG_AUDIO_FANOUT", 8)
+
+    started = time.perf_counter()
+    run(transcribe_audio(audio_from_bytes(data, "audio/flac", "long.flac"), f"bench-{segments}"))
+    elapsed = time.perf_counter() - started
+
+    print(f"\n{seconds}s recording, {segments} segment(s): {elapsed:.2f}s ({len(fake_genai.uploads)} uploads)")
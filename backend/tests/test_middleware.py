@@ -0,0 +1,62 @@
+import json
+
+import httpx
+
+from app.core import metrics
+from app.core.config import settings
+from app.main import app
+
+from support import run
+
+
+async def _request(method, path, **kwargs):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, path, **kwargs)
+
+
+def test_request_id_is_assigned_or_adopted():
+    assigned = run(_request("GET", "/health"))
+    adopted = run(_request("GET", "/health", headers={"X-Request-ID": "abc-123"}))
+
+    assert len(assigned.headers["X-Request-ID"]) == 16
+    assert adopted.headers["X-Request-ID"] == "abc-123"
+
+
+def test_streamed_responses_keep_their_headers_and_body():
+    texts = [f"text {i}" for i in range(5)]
+
+    response = run(_request("POST", "/api/analyze/batch", json={"texts": texts}))
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "X-Request-ID" in response.headers
+    assert [json.loads(line)["index"] for line in response.text.splitlines()] == [0, 1, 2, 3, 4]
+
+
+def test_request_latency_is_recorded_per_route_template():
+    run(_request("GET", "/api/sessions/missing/tiers/pro_tier"))
+
+    rendered = metrics.render_prometheus().splitlines()
+    assert any(
+        line.startswith("http_request_seconds_count") and '/tiers/{tier}"' in line and 'status="404"' in line
+        for line in rendered
+    )
+
+
+def test_server_timing_reports_spans_when_enabled(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+
+    response = run(_request("POST", "/api/transmute", files={"file": ("n.webm", b"a" * 100, "audio/webm")}))
+
+    assert response.status_code == 200
+    assert "upload;dur=" in response.headers["Server-Timing"]
+
+
+def test_disabled_tracing_passes_requests_straight_through(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "TRACING_ENABLED", False)
+    monkeypatch.setattr(settings, "SERVER_TIMING_ENABLED", True)
+
+    response = run(_request("POST", "/api/transmute", files={"file": ("n.webm", b"b" * 100, "audio/webm")}))
+
+    assert response.status_code == 200
+    assert "Server-Timing" not in response.headers
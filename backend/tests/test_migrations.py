@@ -0,0 +1,202 @@
+import json
+import tempfile
+
+import pytest
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app import migrations
+from app.core import compression
+from app.core.config import settings
+from app.models import Session
+
+from support import run
+
+# The tables as the baseline release created them: no schema_version, the
+# whole suite in sessions.data and no jobs table.
+LEGACY_DDL = [
+    "CREATE TABLE sessions (id VARCHAR PRIMARY KEY, text VARCHAR, analysis JSON, data JSON, "
+    "is_public BOOLEAN, public_slug VARCHAR UNIQUE, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)",
+    "CREATE TABLE drafts (id VARCHAR PRIMARY KEY, title VARCHAR, tag VARCHAR, transcript VARCHAR, "
+    "created_at DATETIME DEFAULT CURRENT_TIMESTAMP)",
+    "CREATE TABLE decisions (id VARCHAR PRIMARY KEY, original_session_id VARCHAR, original_transcript VARCHAR, "
+    "prediction VARCHAR, review_date DATETIME, update_transcript VARCHAR, accuracy_score INTEGER, "
+    "blind_spot VARCHAR, growth_insight VARCHAR, status VARCHAR, created_at DATETIME DEFAULT CURRENT_TIMESTAMP)",
+]
+# The jobs table as it was when v1 was stamped, before job leases
+V1_JOBS_DDL = (
+    "CREATE TABLE jobs (id VARCHAR PRIMARY KEY, kind VARCHAR, priority INTEGER, status VARCHAR, progress VARCHAR, "
+    "payload JSON, audio BLOB, result JSON, error VARCHAR, created_at DATETIME, updated_at DATETIME)"
+)
+
+NESTED = {
+    "free_tier": {"core_thesis": "nested thesis"},
+    "pro_tier": {"risks": ["r1", "r2"]},
+    "social_content": {"linkedin": "post"},
+}
+FLAT = {
+    "core_thesis": "flat thesis",
+    "strategic_pillars": ["p1"],
+    "tactical_steps": ["t1"],
+    "risk_audit": "the rest",
+}
+LEGACY_ROWS = {"nested": NESTED, "flat": FLAT, "unparseable": "just a string", "empty": None}
+
+
+async def _legacy_database(version: int):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/legacy.db")
+    async with engine.begin() as conn:
+        for statement in LEGACY_DDL:
+            await conn.execute(text(statement))
+        if version >= 1:
+            # v1: the baseline migration's create_all and indexes, then the stamp
+            await conn.execute(text(V1_JOBS_DDL))
+            await conn.run_sync(migrations._baseline)
+            await conn.run_sync(migrations._current_version)
+            await conn.execute(text("INSERT INTO schema_version (version, description) VALUES (1, 'Baseline schema')"))
+        for session_id, data in LEGACY_ROWS.items():
+            await conn.execute(
+                text("INSERT INTO sessions (id, text, data, is_public) VALUES (:id, 'transcript', :data, 0)"),
+                {"id": session_id, "data": None if data is None else json.dumps(data)},
+            )
+    return engine
+
+
+def _schema(conn) -> dict:
+    inspector = inspect(conn)
+    return {
+        table: {
+            "columns": {c["name"] for c in inspector.get_columns(table)},
+            "indexes": {i["name"] for i in inspector.get_indexes(table)},
+        }
+        for table in inspector.get_table_names()
+    }
+
+
+def _upgrade(version: int, monkeypatch):
+    async def main():
+        engine = await _legacy_database(version)
+        monkeypatch.setattr(migrations, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+        try:
+            applied = await migrations.run_migrations(engine)
+            converted = await migrations.backfill_session_sections(batch_size=2, pause=0)
+            again = await migrations.backfill_session_sections(pause=0)
+            async with engine.connect() as conn:
+                schema = await conn.run_sync(_schema)
+                blobs = dict((await conn.execute(text("SELECT id, pro_tier FROM sessions"))).all())
+            async with migrations.AsyncSessionLocal() as db:
+                sessions = {session_id: await db.get(Session, session_id) for session_id in LEGACY_ROWS}
+            return applied, converted, again, schema, blobs, sessions
+        finally:
+            await engine.dispose()
+
+    return run(main())
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_legacy_database_is_migrated_to_the_latest_schema(monkeypatch, version):
+    applied, _, _, schema, _, _ = _upgrade(version, monkeypatch)
+
+    assert applied == migrations._migrations[-1][0]
+    assert {"free_tier", "pro_tier", "social_content", "language", "variation"} <= schema["sessions"]["columns"]
+    assert {"lease_expires_at", "audio_path"} <= schema["jobs"]["columns"]
+    assert "transcript_cache" in schema
+    # Indexes the models declare are added to tables that already existed
+    assert "ix_drafts_created_at_id" in schema["drafts"]["indexes"]
+    assert "ix_decisions_status_review_date" in schema["decisions"]["indexes"]
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_backfill_splits_nested_and_flat_suites(monkeypatch, version):
+    _, converted, again, _, blobs, sessions = _upgrade(version, monkeypatch)
+
+    assert converted == 3 and again == 0
+    nested, flat = sessions["nested"], sessions["flat"]
+    assert nested.data is None and nested.suite == NESTED
+    assert flat.data is None
+    assert flat.free_tier == {"core_thesis": "flat thesis", "strategic_pillars": ["p1"], "tactical_steps": ["t1"]}
+    assert flat.pro_tier == {"risk_audit": "the rest"}
+    assert flat.social_content is None
+    # The large sections are stored compressed with a codec marker
+    assert blobs["nested"][:1] == compression.ZLIB
+    # Rows that cannot be split keep their data, marked so they are not retried
+    assert sessions["unparseable"].data == "just a string" and sessions["unparseable"].free_tier == {}
+    assert sessions["empty"].free_tier is None
+
+
+def test_migrating_twice_is_a_no_op(monkeypatch):
+    async def main():
+        engine = await _legacy_database(0)
+        try:
+            first = await migrations.run_migrations(engine)
+            second = await migrations.run_migrations(engine)
+            async with engine.connect() as conn:
+                rows = (await conn.execute(text("SELECT COUNT(*) FROM schema_version"))).scalar()
+            return first, second, rows
+        finally:
+            await engine.dispose()
+
+    first, second, rows = run(main())
+
+    assert first == second == migrations._migrations[-1][0]
+    assert rows == len(migrations._migrations)
+
+
+SUITE = {"risks": ["über", "naïve"] * 50, "score": 7, "nested": {"ok": True, "none": None}}
+
+
+@pytest.mark.parametrize("codec, marker", [("zlib", compression.ZLIB), ("none", compression.RAW)])
+def test_codecs_round_trip(codec, marker):
+    blob = compression.encode_json(SUITE, codec)
+
+    assert blob[:1] == marker
+    assert compression.decode_json(blob) == SUITE
+
+
+def test_zstd_round_trips_when_installed():
+    pytest.importorskip("zstandard")
+    blob = compression.encode_json(SUITE, "zstd")
+
+    assert blob[:1] == compression.ZSTD
+    assert compression.decode_json(blob) == SUITE
+
+
+def test_zstd_falls_back_to_zlib_without_zstandard(monkeypatch):
+    monkeypatch.setattr(compression, "zstandard", None)
+
+    blob = compression.encode_json(SUITE, "zstd")
+
+    assert blob[:1] == compression.ZLIB
+    assert compression.decode_json(blob) == SUITE
+    with pytest.raises(RuntimeError):
+        compression.decode_json(compression.ZSTD + b"payload")
+
+
+def test_unknown_marker_is_rejected():
+    with pytest.raises(ValueError):
+        compression.decode_json(b"?{}")
+
+
+def test_rows_written_under_different_codecs_stay_readable(monkeypatch):
+    async def write(session_id, codec):
+        monkeypatch.setattr(settings, "SESSION_COMPRESSION", codec)
+        async with migrations.AsyncSessionLocal() as db:
+            db.add(Session(id=session_id, text="t", free_tier={}, pro_tier=SUITE, social_content=None))
+            await db.commit()
+
+    async def main():
+        await write("codec-zlib", "zlib")
+        await write("codec-none", "none")
+        monkeypatch.setattr(settings, "SESSION_COMPRESSION", "zlib")
+        async with migrations.AsyncSessionLocal() as db:
+            raw = dict((await db.execute(
+                text("SELECT id, pro_tier FROM sessions WHERE id IN ('codec-zlib', 'codec-none')")
+            )).all())
+            decoded = [(await db.get(Session, session_id)).pro_tier for session_id in ("codec-zlib", "codec-none")]
+        return raw, decoded
+
+    raw, decoded = run(main())
+
+    assert raw["codec-zlib"][:1] == compression.ZLIB and raw["codec-none"][:1] == compression.RAW
+    assert len(raw["codec-zlib"]) < len(raw["codec-none"])
+    assert decoded == [SUITE, SUITE]
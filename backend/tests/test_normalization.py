@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.services import audio as audio_tools
+from app.services.ingestion import audio_from_bytes
+from app.services.transcription import normalize_upload, transcribe_audio
+
+from support import make_recording, run
+
+needs_ffmpeg = pytest.mark.skipif(not audio_tools.ffmpeg_available(), reason="ffmpeg is not installed")
+
+
+def _duration(data: bytes, suffix: str) -> float:
+    async def main():
+        with audio_tools.spooled_to_disk(data, suffix) as path:
+            duration, _ = await audio_tools.detect_silences(path)
+        return duration
+    return run(main())
+
+
+def _wav_upload(seconds: float, lead_in: float = 0.0):
+    # What a desktop recorder hands us: 44.1 kHz stereo PCM
+    data = make_recording(seconds, fmt="wav", sample_rate=44100, channels=2, lead_in=lead_in)
+    return audio_from_bytes(data, "audio/wav", "note.wav")
+
+
+def test_normalization_is_off_by_default():
+    audio = audio_from_bytes(b"x" * 1000, "audio/wav", "note.wav")
+
+    assert settings.AUDIO_NORMALIZE is False
+    assert run(normalize_upload(audio)) is audio
+
+
+@needs_ffmpeg
+@pytest.mark.parametrize("codec, mime_type", [("opus", "audio/ogg"), ("mp3", "audio/mp3"), ("flac", "audio/flac")])
+def test_normalize_upload_shrinks_and_trims_a_wav(monkeypatch, codec, mime_type):
+    monkeypatch.setattr(settings, "AUDIO_NORMALIZE", True)
+    monkeypatch.setattr(settings, "AUDIO_NORMALIZE_CODEC", codec)
+    audio = _wav_upload(12, lead_in=3)
+    original = audio.stream.getvalue()
+
+    normalized = run(normalize_upload(audio))
+
+    data = normalized.stream.read()
+    assert normalized.mime_type == mime_type
+    assert len(data) < len(original) / 4
+    # The 3s of leading silence is gone
+    assert _duration(data, "." + mime_type.split("/")[1]) == pytest.approx(12 - 3, abs=0.5)
+
+
+@needs_ffmpeg
+def test_transcription_uploads_the_normalized_audio(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_NORMALIZE", True)
+    audio = _wav_upload(5)
+    size = len(audio.stream.getvalue())
+
+    run(transcribe_audio(audio, "English"))
+
+    upload = fake_genai.uploads[0]
+    assert upload.mime_type == "audio/ogg"
+    assert len(upload.data) < size / 10
+
+
+@needs_ffmpeg
+def test_undecodable_upload_is_sent_as_is(monkeypatch):
+    monkeypatch.setattr(settings, "AUDIO_NORMALIZE", True)
+    audio = audio_from_bytes(b"not audio" * 100, "audio/wav", "note.wav")
+
+    assert run(normalize_upload(audio)) is audio
+
+
+@pytest.mark.benchmark
+@needs_ffmpeg
+@pytest.mark.parametrize("seconds", [60, 600])
+def test_benchmark_bytes_saved_and_latency_per_codec(monkeypatch, seconds):
+    monkeypatch.setattr(settings, "AUDIO_NORMALIZE", True)
+    inputs = {
+        "wav 44.1k stereo": (make_recording(seconds, fmt="wav", sample_rate=44100, channels=2, lead_in=2), "audio/wav"),
+        "flac 48k mono": (make_recording(seconds, fmt="flac", sample_rate=48000, lead_in=2), "audio/flac"),
+    }
+    print()
+    for label, (data, mime_type) in inputs.items():
+        for codec in audio_tools.NORMALIZED_CODECS:
+            monkeypatch.setattr(settings, "AUDIO_NORMALIZE_CODEC", codec)
+            started = time.perf_counter()
+            normalized = run(normalize_upload(audio_from_bytes(data, mime_type, "note")))
+            elapsed = time.perf_counter() - started
+            size = len(normalized.stream.getvalue())
+            print(
+                f"{seconds:>4}s {label:<17} -> {codec:<4}: {len(data) / 1e6:7.2f}MB -> {size / 1e6:6.2f}MB "
+                f"({100 * (1 - size / len(data)):5.1f}% saved) in {elapsed * 1000:6.0f}ms"
+            )
@@ -0,0 +1,111 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.api.routes import MAX_PAGE_SIZE, NEXT_CURSOR_HEADER
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import Decision, Draft
+
+from support import run
+
+# Far enough ahead that the seeded rows sort before anything other tests insert
+FUTURE = datetime(2100, 1, 1, tzinfo=timezone.utc)
+
+
+def _draft(created_at):
+    return Draft(id=str(uuid.uuid4()), title="t", tag="💡 IDEA", transcript="x", created_at=created_at)
+
+
+def _decision(created_at):
+    return Decision(
+        id=str(uuid.uuid4()), original_session_id="s", original_transcript="t", prediction="p",
+        review_date=FUTURE, status="PENDING", created_at=created_at,
+    )
+
+
+async def _seed(make, timestamps: int = 3, per_timestamp: int = 5) -> list:
+    """Rows sharing created_at in groups; returns their ids in expected listing order."""
+    rows = [
+        make(FUTURE + timedelta(minutes=minute))
+        for minute in range(timestamps) for _ in range(per_timestamp)
+    ]
+    async with AsyncSessionLocal() as db:
+        db.add_all(rows)
+        await db.commit()
+    return [row.id for row in sorted(rows, key=lambda row: (row.created_at, row.id), reverse=True)]
+
+
+async def _count(model) -> int:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(select(func.count()).select_from(model))
+
+
+async def _get(path: str, **params):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, params=params)
+
+
+async def _all_pages(path: str, limit: int) -> list:
+    ids, cursor = [], None
+    while True:
+        params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+        response = await _get(path, **params)
+        assert response.status_code == 200
+        page = [row["id"] for row in response.json()]
+        assert len(page) <= limit
+        ids += page
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return ids
+        assert cursor == page[-1]
+
+
+@pytest.mark.parametrize("path, model, make", [
+    ("/api/drafts", Draft, _draft),
+    ("/api/decisions/history", Decision, _decision),
+])
+def test_paging_to_the_end_returns_every_row_once_in_order(path, model, make):
+    async def main():
+        seeded = await _seed(make)
+        # 4 does not divide the groups of 5, so pages split rows that share created_at
+        return seeded, await _all_pages(path, limit=4), await _count(model)
+
+    seeded, ids, total = run(main())
+
+    assert len(ids) == len(set(ids)) == total
+    assert ids[:len(seeded)] == seeded
+
+
+def test_last_full_page_has_no_next_cursor():
+    async def main():
+        await _seed(_draft, timestamps=1, per_timestamp=2)
+        return await _get("/api/drafts", limit=await _count(Draft))
+
+    response = run(main())
+
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.parametrize("path", ["/api/drafts", "/api/decisions/history"])
+def test_unknown_cursor_returns_an_empty_page(path):
+    response = run(_get(path, cursor="no-such-row"))
+
+    assert response.status_code == 200
+    assert response.json() == []
+    assert NEXT_CURSOR_HEADER not in response.headers
+
+
+@pytest.mark.parametrize("limit", [0, -1, MAX_PAGE_SIZE + 1])
+@pytest.mark.parametrize("path", ["/api/drafts", "/api/decisions/history"])
+def test_limit_out_of_bounds_is_rejected(path, limit):
+    assert run(_get(path, limit=limit)).status_code == 422
+
+
+def test_limit_at_the_bounds_is_accepted():
+    assert run(_get("/api/drafts", limit=1)).status_code == 200
+    assert run(_get("/api/drafts", limit=MAX_PAGE_SIZE)).status_code == 200
@@ -0,0 +1,95 @@
+import json
+
+from app.core.config import settings
+from app.services import prompt_cache
+from app.services.generation import GENERATION_MODEL, build_system_prompt, generate_executive_suite
+
+from support import run
+
+
+def _suite(fake_genai):
+    fake_genai.responder = lambda model_name, contents, kwargs: json.dumps({"free_tier": {"ok": True}})
+
+
+def _sized(fake_genai, tokens):
+    """Makes the fake tokenizer report `tokens` for the system prompt."""
+    prompt = build_system_prompt("English")
+    count = fake_genai.count_tokens
+    fake_genai.count_tokens = lambda part: tokens if part == prompt else count(part)
+
+
+def test_caching_is_off_by_default(fake_genai):
+    _suite(fake_genai)
+
+    run(generate_executive_suite("text", "English"))
+
+    assert settings.PROMPT_CACHE_ENABLED is False
+    assert fake_genai.cache_creates == []
+    assert fake_genai.generate_calls[0].contents[0] == build_system_prompt("English")
+
+
+def test_prompt_under_the_counted_minimum_is_sent_inline(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_CACHE_ENABLED", True)
+    _suite(fake_genai)
+    _sized(fake_genai, settings.PROMPT_CACHE_MIN_TOKENS - 1)
+
+    run(generate_executive_suite("one", "English"))
+    run(generate_executive_suite("two", "English"))
+
+    assert fake_genai.cache_creates == []
+    assert [call.cached_content for call in fake_genai.generate_calls] == [None, None]
+
+
+def test_prompt_over_the_minimum_is_cached_once_and_reused(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_CACHE_ENABLED", True)
+    _suite(fake_genai)
+    # chars/4 puts this prompt just under 1024; the tokenizer decides
+    _sized(fake_genai, settings.PROMPT_CACHE_MIN_TOKENS)
+
+    for text in ("one", "two", "three"):
+        run(generate_executive_suite(text, "English"))
+
+    assert len(fake_genai.cache_creates) == 1
+    cache = fake_genai.cache_creates[0]
+    assert cache.model == GENERATION_MODEL and cache.contents == [build_system_prompt("English")]
+    assert [call.cached_content for call in fake_genai.generate_calls] == [cache] * 3
+    # The cached prefix is not sent again
+    assert all(build_system_prompt("English") not in call.contents for call in fake_genai.generate_calls)
+
+
+def test_rejected_handle_falls_back_inline_and_is_not_reused(fake_genai, monkeypatch):
+    monkeypatch.setattr(settings, "PROMPT_CACHE_ENABLED", True)
+    _sized(fake_genai, 5000)
+
+    def responder(model_name, contents, kwargs):
+        if fake_genai.generate_calls[-1].cached_content is not None:
+            raise ValueError("cached content expired")
+        return json.dumps({"free_tier": {"ok": True}})
+
+    fake_genai.responder = responder
+
+    run(generate_executive_suite("one", "English"))
+    run(generate_executive_suite("two", "English"))
+
+    used_cache = [call.cached_content is not None for call in fake_genai.generate_calls]
+    assert used_cache == [True, False, False]
+    assert len(fake_genai.cache_creates) == 1
+
+
+def test_token_count_is_taken_once_per_prompt(fake_genai):
+    counted = []
+    _sized(fake_genai, 5000)
+    count = fake_genai.count_tokens
+    fake_genai.count_tokens = lambda part: counted.append(part) or count(part)
+    cache = prompt_cache.PromptCache(
+        prompt_cache.GeminiCacheBackend(), ttl=3600, refresh_margin=300, retry_after=600, min_tokens=1024,
+    )
+
+    async def main():
+        for _ in range(3):
+            await cache.get(GENERATION_MODEL, "suite", build_system_prompt("English"))
+
+    run(main())
+
+    assert counted == [build_system_prompt("English")]
+    assert len(fake_genai.cache_creates) == 1
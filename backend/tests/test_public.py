@@ -0,0 +1,153 @@
+import uuid
+
+import httpx
+import pytest
+
+from app.api import routes
+from app.core.config import settings
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import Session
+
+from support import run
+
+SUITE = {
+    "free_tier": {"core_thesis": "Ship the public page"},
+    "pro_tier": {"risks": ["secret"]},
+    "social_content": {"linkedin": "post"},
+}
+
+
+@pytest.fixture(autouse=True)
+def empty_public_cache():
+    routes._public_cache.clear()
+
+
+async def _create_session(**columns) -> str:
+    session_id = str(uuid.uuid4())
+    async with AsyncSessionLocal() as db:
+        session = Session(id=session_id, text="transcript", analysis={"tone": "Calm"}, **columns)
+        if "data" not in columns:
+            session.set_suite(SUITE)
+        db.add(session)
+        await db.commit()
+    return session_id
+
+
+async def _set_text(session_id: str, value: str):
+    async with AsyncSessionLocal() as db:
+        (await db.get(Session, session_id)).text = value
+        await db.commit()
+
+
+def _client():
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+
+def test_public_view_has_a_strong_etag_and_cache_headers():
+    async def main():
+        session_id = await _create_session()
+        async with _client() as client:
+            slug = (await client.post(f"/api/publish/{session_id}")).json()["publicSlug"]
+            return await client.get(f"/api/public/{slug}")
+
+    response = run(main())
+
+    assert response.status_code == 200
+    assert response.headers["etag"].startswith('"') and not response.headers["etag"].startswith("W/")
+    assert response.headers["cache-control"] == (
+        f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE}, s-maxage={settings.PUBLIC_CACHE_EDGE_MAX_AGE}"
+    )
+    assert response.json()["data"] == {"free_tier": SUITE["free_tier"]}
+    assert response.json()["analysis"] == {"tone": "Calm"}
+
+
+@pytest.mark.parametrize("if_none_match, status", [
+    ("{etag}", 304),
+    ("W/{etag}", 304),
+    ('"other", {etag}', 304),
+    ("*", 304),
+    ('"other"', 200),
+])
+def test_if_none_match(if_none_match, status):
+    async def main():
+        session_id = await _create_session()
+        async with _client() as client:
+            slug = (await client.post(f"/api/publish/{session_id}")).json()["publicSlug"]
+            first = await client.get(f"/api/public/{slug}")
+            etag = first.headers["etag"]
+            again = await client.get(f"/api/public/{slug}", headers={"If-None-Match": if_none_match.format(etag=etag)})
+            return etag, again
+
+    etag, response = run(main())
+
+    assert response.status_code == status
+    assert response.headers["etag"] == etag
+    if status == 304:
+        assert response.content == b""
+
+
+def test_repeat_views_are_served_from_memory():
+    async def main():
+        session_id = await _create_session()
+        async with _client() as client:
+            slug = (await client.post(f"/api/publish/{session_id}")).json()["publicSlug"]
+            first = await client.get(f"/api/public/{slug}")
+            await _set_text(session_id, "edited underneath the cache")
+            second = await client.get(f"/api/public/{slug}")
+            return first, second
+
+    first, second = run(main())
+
+    assert second.content == first.content
+    assert second.headers["etag"] == first.headers["etag"]
+
+
+def test_unpublish_invalidates_and_republish_serves_fresh_content():
+    async def main():
+        session_id = await _create_session()
+        async with _client() as client:
+            old_slug = (await client.post(f"/api/publish/{session_id}")).json()["publicSlug"]
+            before = await client.get(f"/api/public/{old_slug}")
+            await client.delete(f"/api/publish/{session_id}")
+            after_unpublish = await client.get(f"/api/public/{old_slug}")
+            await _set_text(session_id, "revised")
+            new_slug = (await client.post(f"/api/publish/{session_id}")).json()["publicSlug"]
+            republished = await client.get(f"/api/public/{new_slug}")
+            old_after_republish = await client.get(f"/api/public/{old_slug}")
+            revalidated = await client.get(
+                f"/api/public/{new_slug}", headers={"If-None-Match": before.headers["etag"]}
+            )
+            return before, after_unpublish, old_slug, new_slug, republished, old_after_republish, revalidated
+
+    before, after_unpublish, old_slug, new_slug, republished, old_after_republish, revalidated = run(main())
+
+    assert before.status_code == 200
+    assert after_unpublish.status_code == 404
+    assert new_slug != old_slug
+    assert republished.status_code == 200 and republished.json()["text"] == "revised"
+    assert old_after_republish.status_code == 404
+    # The old ETag no longer matches the new content
+    assert revalidated.status_code == 200
+    assert republished.headers["etag"] != before.headers["etag"]
+
+
+def test_legacy_row_serves_only_the_free_tier():
+    async def main():
+        session_id = await _create_session(data=SUITE)
+        async with _client() as client:
+            slug = (await client.post(f"/api/publish/{session_id}")).json()["publicSlug"]
+            return await client.get(f"/api/public/{slug}")
+
+    response = run(main())
+
+    assert response.status_code == 200
+    assert response.json()["data"] == {"free_tier": SUITE["free_tier"]}
+
+
+def test_unknown_slug_is_not_found():
+    async def main():
+        async with _client() as client:
+            return await client.get("/api/public/no-such-slug")
+
+    assert run(main()).status_code == 404
@@ -0,0 +1,70 @@
+import json
+
+import httpx
+
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import Session
+from app.services.generation import SUITE_SECTIONS, build_section_prompt
+
+from support import run
+
+
+def _respond_per_section(language):
+    def responder(model_name, contents, kwargs):
+        for name in SUITE_SECTIONS:
+            if contents[0] == build_section_prompt(name, language):
+                return json.dumps({name: True})
+        raise AssertionError(f"prompt was not a {language} section prompt")
+    return responder
+
+
+def test_lazy_tier_uses_the_language_the_session_was_created_with(fake_genai):
+    fake_genai.responder = _respond_per_section("French")
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            created = await client.post("/api/generate-post", json={
+                "text": "une note", "analysis": {}, "language": "French", "lazy": True,
+            })
+            session_id = created.json()["session_id"]
+            # No language on the tier request; the session remembers it
+            return await client.get(f"/api/sessions/{session_id}/tiers/pro_tier")
+
+    response = run(main())
+
+    assert response.status_code == 200
+    pro_sections = [name for name, spec in SUITE_SECTIONS.items() if spec["target"] == "pro_tier"]
+    assert all(response.json()["data"][name] is True for name in pro_sections)
+
+
+def test_streamed_session_remembers_its_language_for_lazy_tiers(fake_genai):
+    section_responder = _respond_per_section("French")
+
+    def responder(model_name, contents, kwargs):
+        if kwargs.get("stream"):
+            # The streamed suite comes back without its social section
+            return json.dumps({"free_tier": {"core_thesis": "x"}, "pro_tier": {"risks": []}})
+        return section_responder(model_name, contents, kwargs)
+
+    fake_genai.responder = responder
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            streamed = await client.post("/api/generate-post/stream", json={
+                "text": "une note", "analysis": {}, "language": "French", "variation": True,
+            })
+            session_id = json.loads(streamed.text.split("event: done\ndata: ", 1)[1].split("\n", 1)[0])["session_id"]
+            async with AsyncSessionLocal() as db:
+                session = await db.get(Session, session_id)
+            tier = await client.get(f"/api/sessions/{session_id}/tiers/social_content")
+            return session, tier
+
+    session, response = run(main())
+
+    assert (session.language, session.variation) == ("French", True)
+    assert response.status_code == 200
+    social_sections = [name for name, spec in SUITE_SECTIONS.items() if spec["target"] == "social_content"]
+    assert all(response.json()["data"][name] is True for name in social_sections)
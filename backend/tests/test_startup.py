@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+from app.database import engine
+from app.migrations import run_migrations
+
+from support import run
+
+BACKEND = Path(__file__).resolve().parent.parent
+
+# Cold start in a fresh interpreter: import the app, run its startup hooks,
+# serve one /health request and report timings and whether the SDK loaded.
+COLD_START = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+import httpx
+from app.main import app
+imported = time.perf_counter()
+
+async def main():
+    async with app.router.lifespan_context(app):
+        booted = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/health")
+        return booted, response.status_code
+
+booted, status = asyncio.run(main())
+print(json.dumps({
+    "import": imported - started,
+    "boot": booted - imported,
+    "first_response": time.perf_counter() - started,
+    "status": status,
+    "sdk_loaded": "google.generativeai" in sys.modules,
+}))
+"""
+
+
+def _python(*args, database: str = None):
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite+aiosqlite:///{database or tempfile.mkdtemp() + '/cold.db'}",
+        "GEMINI_API_KEY": "test-key",
+        "LOG_LEVEL": "WARNING",
+    })
+    env.pop("DATABASE_READ_URL", None)
+    return subprocess.run(
+        [sys.executable, *args], cwd=BACKEND, env=env, capture_output=True, text=True, check=True,
+    )
+
+
+@pytest.mark.parametrize("module", ["app.main", "main"])
+def test_importing_the_app_does_not_load_the_gemini_sdk(module):
+    result = _python("-c", f"import sys, {module}; print('google.generativeai' in sys.modules)")
+
+    assert result.stdout.strip() == "False"
+
+
+def test_cold_start_serves_health_without_the_sdk():
+    database = tempfile.mkdtemp() + "/cold.db"
+    _python("-c", COLD_START, database=database)  # first boot creates the schema
+
+    report = json.loads(_python("-c", COLD_START, database=database).stdout)
+
+    assert report["status"] == 200
+    assert report["sdk_loaded"] is False
+
+
+def test_current_schema_boots_without_ddl():
+    run(run_migrations(engine))
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        run(run_migrations(engine))
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+    assert [s for s in statements if not s.lstrip().upper().startswith(("SELECT", "PRAGMA"))] == []
+
+
+@pytest.mark.benchmark
+def test_benchmark_import_time_and_time_to_first_response():
+    importtime = _python("-X", "importtime", "-c", "import app.main").stderr
+    # "import time: self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in importtime.splitlines():
+        match = re.match(r"import time:\s+\d+ \|\s+(\d+) \|(\s*)(\S+)", line)
+        if match:
+            cumulative[match.group(3)] = int(match.group(1))
+
+    database = tempfile.mkdtemp() + "/cold.db"
+    _python("-c", COLD_START, database=database)
+    reports = [json.loads(_python("-c", COLD_START, database=database).stdout) for _ in range(3)]
+    best = min(reports, key=lambda r: r["first_response"])
+
+    heaviest = sorted(
+        ((name, us) for name, us in cumulative.items() if "." not in name), key=lambda item: -item[1]
+    )[:5]
+    print(
+        f"\nimport app.main: {cumulative.get('app.main', 0) / 1000:.0f}ms cumulative; heaviest top-level imports: "
+        + ", ".join(f"{name}={us / 1000:.0f}ms" for name, us in heaviest)
+        + f"\ncold start (best of 3): import={best['import'] * 1000:.0f}ms boot={best['boot'] * 1000:.0f}ms "
+        f"first /health response={best['first_response'] * 1000:.0f}ms, SDK loaded: {best['sdk_loaded']}"
+    )
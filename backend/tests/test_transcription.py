@@ -0,0 +1,89 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.main import app
+from app.services.ingestion import audio_from_bytes
+from app.services.transcription import transcribe_audio
+
+from support import run
+
+
+def _audio(seed: int, size: int = 4096):
+    return audio_from_bytes(bytes([seed % 256]) * size, "audio/webm", f"note-{seed}.webm")
+
+
+def _percentile(samples, pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def _health_latencies_during(transcriptions: int, probes: int = 40) -> tuple:
+    """Fires `transcriptions` concurrent transcribe_audio calls and probes /health meanwhile."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        jobs = [asyncio.create_task(transcribe_audio(_audio(i), "English")) for i in range(transcriptions)]
+        await asyncio.sleep(0.05)
+        latencies = []
+        for _ in range(probes):
+            started = time.perf_counter()
+            response = await client.get("/health")
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 200
+            await asyncio.sleep(0.01)
+        in_flight_at_end = sum(not job.done() for job in jobs)
+        transcripts = await asyncio.gather(*jobs)
+    return latencies, in_flight_at_end, transcripts
+
+
+def test_transcribe_audio_uploads_waits_and_cleans_up(fake_genai):
+    fake_genai.processing_latency = 0.3
+    fake_genai.responder = lambda model_name, contents, kwargs: "  hello world \n"
+
+    text = run(transcribe_audio(_audio(1), "English"))
+
+    assert text == "hello world"
+    assert len(fake_genai.uploads) == 1
+    assert fake_genai.uploads[0].mime_type == "audio/webm"
+    assert fake_genai.deleted == [fake_genai.uploads[0].name]
+    prompt, audio_file = fake_genai.generate_calls[0].contents
+    assert "English" in prompt and audio_file.name == fake_genai.uploads[0].name
+
+
+def test_transcribe_audio_serves_repeats_from_cache(fake_genai):
+    run(transcribe_audio(_audio(2), "English"))
+    run(transcribe_audio(_audio(2), "English"))
+    run(transcribe_audio(_audio(2), "French"))
+
+    assert len(fake_genai.uploads) == 2
+
+
+def test_health_stays_responsive_while_transcriptions_are_in_flight(fake_genai):
+    # Each transcription blocks a file-API thread for the upload, stays
+    # PROCESSING for a while and then waits on generation.
+    fake_genai.upload_latency = 0.4
+    fake_genai.processing_latency = 0.4
+    fake_genai.generate_latency = 0.4
+
+    latencies, in_flight_at_end, transcripts = run(_health_latencies_during(transcriptions=16))
+
+    assert len(transcripts) == 16
+    assert in_flight_at_end > 0, "probes should overlap the transcriptions"
+    assert _percentile(latencies, 0.99) < 0.1
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("transcriptions", [0, 8, 32])
+def test_benchmark_health_latency_under_transcription_load(fake_genai, transcriptions):
+    fake_genai.upload_latency = 0.5
+    fake_genai.processing_latency = 0.5
+    fake_genai.generate_latency = 1.0
+
+    latencies, _, _ = run(_health_latencies_during(transcriptions, probes=100))
+
+    print(
+        f"\n/health with {transcriptions:>2} transcriptions in flight: "
+        f"p50={_percentile(latencies, 0.5) * 1000:.1f}ms p99={_percentile(latencies, 0.99) * 1000:.1f}ms"
+    )